@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Alert Page Parser
+Reads alert rows and the login form out of eBird HTML without a browser,
+using the standard library's html.parser and a small XPath subset
+"""
+
+import re
+from html.parser import HTMLParser
+
+
+# Elements that never have children or an end tag
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+}
+
+# Elements whose text is never shown
+HIDDEN_ELEMENTS = {'script', 'style', 'template', 'noscript'}
+
+# Elements that start a new line of text (so their words do not run together)
+BLOCK_ELEMENTS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol',
+    'p', 'section', 'table', 'td', 'th', 'tr', 'ul',
+}
+
+# Supported XPath steps: //tag or .//tag, optionally [contains(@class, 'x')]
+_XPATH_STEP = re.compile(r"^\.?//([\w-]+|\*)(?:\[contains\(@class,\s*'([^']*)'\)\])?$")
+
+
+class Node:
+    """Minimal element tree node"""
+
+    __slots__ = ('tag', 'attrs', 'parent', 'children')
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+
+    def iter(self):
+        """This node and its descendant elements in document order"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed([child for child in node.children if isinstance(child, Node)]))
+
+    def text(self):
+        """Visible text of the node, whitespace collapsed (like a browser's innerText)"""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag in BLOCK_ELEMENTS:
+                stack.extend([' '] + list(reversed(node.children)) + [' '])
+            elif node.tag not in HIDDEN_ELEMENTS:
+                stack.extend(reversed(node.children))
+        return ' '.join(''.join(parts).split())
+
+
+class _TreeBuilder(HTMLParser):
+    """Builds a Node tree, tolerating unclosed and stray end tags like a browser"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', {}, None)
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or '' for name, value in attrs}, self._current)
+        self._current.children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self._current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self._current.children.append(Node(tag, {name: value or '' for name, value in attrs}, self._current))
+
+    def handle_endtag(self, tag):
+        node = self._current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self._current = node.parent
+
+    def handle_data(self, data):
+        self._current.children.append(data)
+
+
+def build_tree(html):
+    """Parse HTML into a Node tree (standard library parser)"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _compile_xpath(xpath):
+    """Matchers (tag, class substring) for each branch of a supported XPath union"""
+    matchers = []
+    for branch in xpath.split('|'):
+        match = _XPATH_STEP.match(branch.strip())
+        if not match:
+            raise ValueError(f"Unsupported XPath: {branch.strip()!r}")
+        matchers.append((match.group(1), match.group(2)))
+    return matchers
+
+
+def _matches(node, matchers):
+    for tag, class_part in matchers:
+        if (tag == '*' or node.tag == tag) and (class_part is None or class_part in node.attrs.get('class', '')):
+            return True
+    return False
+
+
+def extract_rows(html, selectors, fields):
+    """
+    Find alert rows and read their fields, like the scraper's in-browser script
+
+    Args:
+        html: Page source
+        selectors: XPaths tried in order; the first one matching anything gives the rows
+                   (//tag or .//tag steps with an optional [contains(@class, 'x')], '|' unions)
+        fields: Field name -> XPath relative to a row (first match is used)
+
+    Returns:
+        dict: {'selector': ..., 'rows': [{'fields': {...}, 'raw_text': ...}]},
+              or None if no selector matched
+    """
+    document = build_tree(html)
+    field_matchers = {name: _compile_xpath(xpath) for name, xpath in fields.items()}
+    for selector in selectors:
+        matchers = _compile_xpath(selector)
+        elements = [node for node in document.iter() if node is not document and _matches(node, matchers)]
+        if not elements:
+            continue
+        rows = []
+        for element in elements:
+            values = {}
+            for name, field_matcher in field_matchers.items():
+                found = next((node for node in element.iter()
+                              if node is not element and _matches(node, field_matcher)), None)
+                values[name] = found.text() if found is not None else ''
+            rows.append({'fields': values, 'raw_text': element.text()})
+        return {'selector': selector, 'rows': rows}
+    return None
+
+
+def parse_login_form(html, username_id='input_username', password_id='input_password'):
+    """
+    Read the login form around the username field
+
+    Args:
+        html: Login page source
+        username_id: id of the username input (default: input_username)
+        password_id: id of the password input (default: input_password)
+
+    Returns:
+        dict: 'action' (may be relative or empty), 'fields' (name -> value of every
+              named input, hidden ones included), 'username' and 'password' (input names),
+              or None if the page has no such form
+    """
+    document = build_tree(html)
+    username = next((node for node in document.iter() if node.attrs.get('id') == username_id), None)
+    if username is None:
+        return None
+
+    form = username.parent
+    while form is not None and form.tag != 'form':
+        form = form.parent
+    if form is None:
+        return None
+
+    fields = {}
+    password_name = None
+    for node in form.iter():
+        name = node.attrs.get('name')
+        if node.tag != 'input' or not name:
+            continue
+        if node.attrs.get('type', '').lower() in ('checkbox', 'radio') and 'checked' not in node.attrs:
+            continue
+        fields[name] = node.attrs.get('value', '')
+        if node.attrs.get('id') == password_id:
+            password_name = name
+
+    return {
+        'action': form.attrs.get('action', ''),
+        'fields': fields,
+        'username': username.attrs.get('name', 'username'),
+        'password': password_name or 'password',
+    }
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Async Multi-Region Fetcher
+Fetches eBird observations for many regions/hotspots concurrently on top of EBirdAPIClient
+"""
+
+import asyncio
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ebird_api_client import EBirdAPIClient
+
+
+# All 62 New York State counties (FIPS codes are the odd numbers 001-123)
+NY_COUNTY_CODES = [f"US-NY-{fips:03d}" for fips in range(1, 124, 2)]
+
+
+class TokenBucket:
+    """Asyncio token-bucket rate limiter"""
+
+    def __init__(self, rate, capacity=None):
+        """
+        Initialize the token bucket
+
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Maximum burst size (default: same as rate)
+
+        Raises:
+            ValueError: If rate is not positive or capacity is below one token
+        """
+        if not rate > 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        if capacity is not None and not capacity >= 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity!r}")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, then consume it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncEBirdFetcher:
+    """Concurrent, rate-limited fetcher over many eBird regions or hotspots"""
+
+    def __init__(self, client, max_concurrency=8, requests_per_second=5, burst=None):
+        """
+        Initialize the fetcher
+
+        Args:
+            client: EBirdAPIClient used for the actual requests (its connection pool is shared)
+            max_concurrency: Maximum number of requests in flight at once (default: 8)
+            requests_per_second: Sustained request rate sent to eBird (default: 5)
+            burst: Maximum burst of requests above the sustained rate (default: requests_per_second)
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        # key -> exception for every region or hotspot whose request failed
+        self.failed_regions = {}
+
+    async def _iter_fetch(self, fetch, keys, **kwargs):
+        """
+        Run fetch(key, **kwargs) for every key with bounded concurrency and rate limiting
+
+        A key whose fetch raises is recorded in failed_regions and yields nothing, so a
+        failed request is never mistaken for an empty region.
+
+        Yields:
+            list: Each successful key's observations, in completion order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        bucket = TokenBucket(self.requests_per_second, self.burst)
+        loop = asyncio.get_running_loop()
+
+        # The client is blocking; run it on a dedicated pool sized to the
+        # concurrency limit so the pooled session serves requests in parallel
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            async def run(key):
+                async with semaphore:
+                    await bucket.acquire()
+                    try:
+                        return await loop.run_in_executor(executor, functools.partial(fetch, key, **kwargs))
+                    except Exception as e:
+                        self.failed_regions[key] = e
+                        print(f"Warning: request for {key} failed: {e}")
+                        return None
+
+            for batch in asyncio.as_completed([run(key) for key in keys]):
+                batch = await batch
+                if batch is not None:
+                    yield batch
+
+    async def _fetch_all(self, fetch, keys, **kwargs):
+        """
+        Fetch every key and merge the results
+
+        Returns:
+            list: Merged observations, deduplicated by (subId, speciesCode)
+        """
+        return merge_observations([batch async for batch in self._iter_fetch(fetch, keys, **kwargs)])
+
+    async def stream_recent_observations(self, region_codes, days_back=14, notable_only=False, max_results=100):
+        """
+        Yield observations as each region's response arrives, skipping duplicates
+
+        Args:
+            region_codes: Iterable of region codes (e.g., NY_COUNTY_CODES)
+            days_back: Number of days back to search (1-30, default: 14)
+            notable_only: Only return notable/rare observations (default: False)
+            max_results: Maximum number of results per region (default: 100)
+
+        Yields:
+            dict: Observation dictionaries, each (subId, speciesCode) at most once
+        """
+        seen = set()
+        batches = self._iter_fetch(
+            self.client.get_recent_observations, region_codes,
+            days_back=days_back, notable_only=notable_only, max_results=max_results, raise_errors=True
+        )
+        async for batch in batches:
+            for obs in batch:
+                key = (obs.get('subId'), obs.get('speciesCode'))
+                if key not in seen:
+                    seen.add(key)
+                    yield obs
+
+    async def get_recent_observations(self, region_codes, days_back=14, notable_only=False, max_results=100):
+        """
+        Get recent observations for several regions concurrently
+
+        Args:
+            region_codes: Iterable of region codes (e.g., NY_COUNTY_CODES)
+            days_back: Number of days back to search (1-30, default: 14)
+            notable_only: Only return notable/rare observations (default: False)
+            max_results: Maximum number of results per region (default: 100)
+
+        Returns:
+            list: Merged list of observation dictionaries
+        """
+        return await self._fetch_all(
+            self.client.get_recent_observations, region_codes,
+            days_back=days_back, notable_only=notable_only, max_results=max_results, raise_errors=True
+        )
+
+    async def get_notable_observations(self, region_codes, days_back=14, max_results=100):
+        """
+        Get notable (rare/unusual) observations for several regions concurrently
+
+        Args:
+            region_codes: Iterable of region codes (e.g., NY_COUNTY_CODES)
+            days_back: Number of days back to search (1-30, default: 14)
+            max_results: Maximum number of results per region (default: 100)
+
+        Returns:
+            list: Merged list of notable observation dictionaries
+        """
+        return await self.get_recent_observations(region_codes, days_back, notable_only=True, max_results=max_results)
+
+    async def get_recent_observations_hotspot(self, location_ids, days_back=14, max_results=100):
+        """
+        Get recent observations from several hotspots concurrently
+
+        Args:
+            location_ids: Iterable of hotspot location IDs (e.g., ['L99381'])
+            days_back: Number of days back to search (1-30, default: 14)
+            max_results: Maximum number of results per hotspot (default: 100)
+
+        Returns:
+            list: Merged list of observation dictionaries
+        """
+        return await self._fetch_all(
+            self.client.get_recent_observations_hotspot, location_ids,
+            days_back=days_back, max_results=max_results, raise_errors=True
+        )
+
+
+def merge_observations(batches):
+    """
+    Merge observation lists, dropping duplicates reported by overlapping regions
+
+    Args:
+        batches: Iterable of observation lists
+
+    Returns:
+        list: Observations sorted newest first, unique by (subId, speciesCode)
+    """
+    merged = {}
+    for batch in batches:
+        for obs in batch:
+            merged[(obs.get('subId'), obs.get('speciesCode'))] = obs
+
+    return sorted(merged.values(), key=lambda obs: obs.get('obsDt', ''), reverse=True)
+
+
+def fetch_ny_county_sweep(client, days_back=7, max_results=100, notable_only=True, hotspots=None, **fetcher_options):
+    """
+    Blocking helper: fetch every NY county (plus optional hotspots) concurrently
+
+    Args:
+        client: EBirdAPIClient instance
+        days_back: Number of days back to search (1-30, default: 7)
+        max_results: Maximum number of results per region (default: 100)
+        notable_only: Only return notable/rare observations (default: True)
+        hotspots: Optional list of hotspot location IDs to include
+        **fetcher_options: Passed to AsyncEBirdFetcher (max_concurrency, requests_per_second, burst)
+
+    Returns:
+        list: Merged list of observation dictionaries
+
+    Raises:
+        RuntimeError: If every request failed
+    """
+    fetcher = AsyncEBirdFetcher(client, **fetcher_options)
+
+    async def sweep():
+        batches = [await fetcher.get_recent_observations(
+            NY_COUNTY_CODES, days_back, notable_only=notable_only, max_results=max_results
+        )]
+        if hotspots:
+            batches.append(await fetcher.get_recent_observations_hotspot(hotspots, days_back, max_results))
+        return merge_observations(batches)
+
+    observations = asyncio.run(sweep())
+    _report_failures(fetcher, len(NY_COUNTY_CODES) + len(hotspots or []))
+    return observations
+
+
+def stream_ny_county_sweep(client, writer, days_back=7, max_results=100, notable_only=True, **fetcher_options):
+    """
+    Blocking helper: sweep every NY county, writing observations as each county responds
+
+    Args:
+        client: EBirdAPIClient instance
+        writer: ObservationWriter (e.g. from client.open_writer('sweep.ndjson'))
+        days_back: Number of days back to search (1-30, default: 7)
+        max_results: Maximum number of results per region (default: 100)
+        notable_only: Only return notable/rare observations (default: True)
+        **fetcher_options: Passed to AsyncEBirdFetcher (max_concurrency, requests_per_second, burst)
+
+    Returns:
+        int: Number of unique observations written
+
+    Raises:
+        RuntimeError: If every request failed
+    """
+    fetcher = AsyncEBirdFetcher(client, **fetcher_options)
+
+    async def sweep():
+        stream = fetcher.stream_recent_observations(
+            NY_COUNTY_CODES, days_back, notable_only=notable_only, max_results=max_results
+        )
+        async for obs in stream:
+            writer.write(obs)
+        return writer.count
+
+    count = asyncio.run(sweep())
+    _report_failures(fetcher, len(NY_COUNTY_CODES))
+    return count
+
+
+def _report_failures(fetcher, total):
+    """Warn about regions a sweep could not fetch; raise if none could be fetched"""
+    if not fetcher.failed_regions:
+        return
+    if len(fetcher.failed_regions) >= total:
+        raise RuntimeError(f"All {total} requests failed; eBird may be unreachable")
+    print(f"Warning: {len(fetcher.failed_regions)} of {total} regions could not be fetched and are missing "
+          f"from the sweep: {', '.join(sorted(fetcher.failed_regions))}")
+
+
+def main():
+    """Sweep all New York counties for notable observations"""
+    try:
+        with open('config.json', 'r') as f:
+            api_key = json.load(f).get('ebird_api_key')
+    except Exception:
+        api_key = os.getenv('EBIRD_API_KEY')
+
+    if not api_key:
+        print("Error: No API key found in config.json")
+        return 1
+
+    start = time.monotonic()
+    with EBirdAPIClient(api_key, pool_size=16) as client:
+        observations = fetch_ny_county_sweep(client, max_concurrency=16)
+
+    print(f"\nFetched {len(observations)} unique observations from {len(NY_COUNTY_CODES)} counties "
+          f"in {time.monotonic() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
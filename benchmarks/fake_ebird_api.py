@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Fake eBird API
+Local stand-in for api.ebird.org that serves synthetic or recorded observations with
+configurable latency, response size and 429 rate limiting, for benchmarks
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import http.server
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+
+
+SPECIES = [
+    ('snogoo', 'Snow Goose', 'Anser caerulescens'),
+    ('barswa', 'Barn Swallow', 'Hirundo rustica'),
+    ('amewoo', 'American Woodcock', 'Scolopax minor'),
+    ('paibun', 'Painted Bunting', 'Passerina ciris'),
+    ('snoowl1', 'Snowy Owl', 'Bubo scandiacus'),
+    ('kinrai4', 'King Rail', 'Rallus elegans'),
+    ('redkno', 'Red Knot', 'Calidris canutus'),
+    ('wilpha', "Wilson's Phalarope", 'Phalaropus tricolor'),
+]
+
+
+def synthetic_observations(count, seed=0):
+    """
+    Generate realistic-looking observation dictionaries around New York
+
+    Args:
+        count: Number of observations
+        seed: Random seed, so runs are comparable (default: 0)
+
+    Returns:
+        list: Raw observation dictionaries, newest first
+    """
+    rng = random.Random(seed)
+    now = datetime(2026, 5, 15, 18, 0)
+    observations = []
+    for i in range(count):
+        code, com_name, sci_name = rng.choice(SPECIES)
+        observations.append({
+            'speciesCode': code,
+            'comName': com_name,
+            'sciName': sci_name,
+            'locId': f"L{rng.randint(100000, 999999)}",
+            'locName': f"Hotspot {rng.randint(1, 500)}",
+            'obsDt': (now - timedelta(minutes=17 * i)).strftime('%Y-%m-%d %H:%M'),
+            'howMany': rng.randint(1, 12),
+            'lat': round(40.5 + rng.random() * 0.4, 6),
+            'lng': round(-74.25 + rng.random() * 0.55, 6),
+            'obsValid': rng.random() > 0.05,
+            'obsReviewed': rng.random() > 0.5,
+            'locationPrivate': rng.random() > 0.8,
+            'subId': f"S{200000000 + i}",
+            'subnational2Name': rng.choice(['New York', 'Kings', 'Queens', 'Bronx', 'Richmond']),
+        })
+    return observations
+
+
+class FakeEBirdAPI(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server answering /v2/data/obs/... like the eBird API"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, server_address, observations, latency=0.0, jitter=0.0, rate_limit_every=0,
+                 retry_after=0):
+        """
+        Start serving (call serve_forever, or use start())
+
+        Args:
+            server_address: (host, port); port 0 picks a free port
+            observations: Observation dictionaries to serve (sliced to maxResults)
+            latency: Seconds to wait before every response (default: 0)
+            jitter: Random extra latency of up to this many seconds (default: 0)
+            rate_limit_every: Answer every Nth request with 429, 0 to disable (default: 0)
+            retry_after: Retry-After value sent with 429 responses (default: 0)
+        """
+        super().__init__(server_address, FakeEBirdHandler)
+        self.observations = observations
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._bodies = {}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+    def start(self):
+        """Serve on a background thread; returns self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def body_for(self, max_results):
+        """Encoded response body and ETag for a maxResults value (cached)"""
+        body = self._bodies.get(max_results)
+        if body is None:
+            data = json.dumps(self.observations[:max_results]).encode('utf-8')
+            body = self._bodies[max_results] = (data, '"' + hashlib.sha1(data).hexdigest() + '"')
+        return body
+
+
+class FakeEBirdHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server._lock:
+            server.requests += 1
+            limited = server.rate_limit_every and server.requests % server.rate_limit_every == 0
+            if limited:
+                server.rate_limited += 1
+
+        delay = server.latency + (random.random() * server.jitter if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if limited:
+            self.send_response(429)
+            self.send_header('Retry-After', str(server.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        parsed = urlparse(self.path)
+        if not parsed.path.startswith('/v2/data/obs/'):
+            self.send_error(404)
+            return
+
+        query = parse_qs(parsed.query)
+        try:
+            max_results = int(query.get('maxResults', ['10000'])[0])
+        except ValueError:
+            max_results = 10000
+
+        data, etag = server.body_for(max_results)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def load_observations(replay=None, rows=1000, seed=0):
+    """Observations from a recorded JSON dump (e.g. ny_rare_birds_*.json), or synthetic ones"""
+    if replay:
+        with open(replay, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return synthetic_observations(rows, seed)
+
+
+def main():
+    """Run the fake API in the foreground"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the eBird API")
+    parser.add_argument('--port', type=int, default=8766, help="Port to listen on (default: 8766)")
+    parser.add_argument('--rows', type=int, default=1000, help="Synthetic observations to serve (default: 1000)")
+    parser.add_argument('--replay', help="Serve a recorded JSON dump instead of synthetic rows")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds per response (default: 0.05)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra latency in seconds (default: 0)")
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="Send 429 on every Nth request (default: off)")
+    args = parser.parse_args()
+
+    server = FakeEBirdAPI(('127.0.0.1', args.port), load_observations(args.replay, args.rows),
+                          latency=args.latency, jitter=args.jitter, rate_limit_every=args.rate_limit_every)
+    print(f"Fake eBird API at {server.base_url} ({len(server.observations)} observations)")
+    print("Use it with: EBirdAPIClient(api_key, base_url='" + server.base_url + "')")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Local Bird Map Server
+Starts BirdMapServer on a free local port with request logging turned off, for the
+benchmarks and the test suite
+"""
+
+import threading
+
+from start_bird_website import BirdMapHandler, BirdMapServer
+
+
+class QuietHandler(BirdMapHandler):
+    """BirdMapHandler without per-request log lines"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_map_server(**options):
+    """
+    Serve the bird map on 127.0.0.1 from a background thread
+
+    Args:
+        **options: Passed to BirdMapServer (store, max_connections, history_sync_interval);
+                   history_sync_interval defaults to 0 so no dump sync runs unasked
+
+    Returns:
+        BirdMapServer: The running server; stop it with stop_map_server()
+    """
+    options.setdefault('history_sync_interval', 0)
+    server = BirdMapServer(('127.0.0.1', 0), QuietHandler, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_map_server(server):
+    """Stop a server started with start_map_server() and release its socket"""
+    server.shutdown()
+    server.server_close()
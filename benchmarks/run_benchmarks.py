@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Measures API client fetch throughput, save rows/sec and memory, and web server latency
+under concurrent clients against a local fake eBird API. Each run is appended to
+benchmarks/results.jsonl and compared with the previous run.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only server --clients 32
+"""
+
+import argparse
+import asyncio
+import contextlib
+import http.client
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_ebird_api import FakeEBirdAPI, load_observations
+from benchmarks.map_server import start_map_server, stop_map_server
+from ebird_api_client import EBirdAPIClient
+from async_fetcher import AsyncEBirdFetcher, NY_COUNTY_CODES
+from observation import Observation
+from observation_store import ObservationStore
+import start_bird_website
+
+
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.jsonl')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples):
+    """p50/p95/p99/max in milliseconds"""
+    return {
+        f"{name}_ms": round(percentile(samples, pct) * 1000, 3)
+        for name, pct in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+    }
+
+
+def bench_fetch(base_url, requests, concurrency, max_results):
+    """Sequential and concurrent fetch throughput through EBirdAPIClient"""
+    results = {}
+    with EBirdAPIClient('benchmark', base_url=base_url, pool_size=concurrency, backoff_factor=0) as client:
+        start = time.perf_counter()
+        rows = 0
+        for i in range(requests):
+            rows += len(client.get_notable_observations(NY_COUNTY_CODES[i % len(NY_COUNTY_CODES)],
+                                                        max_results=max_results))
+        elapsed = time.perf_counter() - start
+        results['sequential'] = {
+            'requests': requests,
+            'seconds': round(elapsed, 4),
+            'requests_per_sec': round(requests / elapsed, 1),
+            'rows_per_sec': round(rows / elapsed, 1),
+        }
+
+        fetcher = AsyncEBirdFetcher(client, max_concurrency=concurrency, requests_per_second=10000)
+        regions = [NY_COUNTY_CODES[i % len(NY_COUNTY_CODES)] for i in range(requests)]
+        start = time.perf_counter()
+        batches = asyncio.run(_collect(fetcher, regions, max_results))
+        elapsed = time.perf_counter() - start
+        rows = sum(len(batch) for batch in batches)
+        results['concurrent'] = {
+            'requests': requests,
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 4),
+            'requests_per_sec': round(requests / elapsed, 1),
+            'rows_per_sec': round(rows / elapsed, 1),
+        }
+    return results
+
+
+async def _collect(fetcher, regions, max_results):
+    return [batch async for batch in fetcher._iter_fetch(
+        fetcher.client.get_recent_observations, regions, days_back=7, notable_only=True, max_results=max_results
+    )]
+
+
+def bench_save(raw_observations, workdir):
+    """Rows/sec and peak traced memory for each save format"""
+    client = EBirdAPIClient('benchmark')
+    observations = [Observation.from_api(obs) for obs in raw_observations]
+    cases = {
+        'csv': lambda path: client.save_to_csv(observations, path + '.csv'),
+        'json': lambda path: client.save_to_json(observations, path + '.json'),
+        'json_compact': lambda path: client.save_to_json(observations, path + '.compact.json', compact=True),
+        'ndjson': lambda path: client.save_to_ndjson(observations, path + '.ndjson'),
+    }
+
+    results = {}
+    for name, save in cases.items():
+        path = os.path.join(workdir, f"save_{name}")
+        tracemalloc.start()
+        start = time.perf_counter()
+        save(path)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            'rows': len(observations),
+            'seconds': round(elapsed, 4),
+            'rows_per_sec': round(len(observations) / elapsed, 1),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+    client.close()
+    return results
+
+
+def bench_server(raw_observations, workdir, clients, requests_per_client):
+    """Request latency per route with N concurrent keep-alive clients"""
+    store = ObservationStore(os.path.join(workdir, 'bench.db'))
+    store.upsert(raw_observations)
+
+    data_file = os.path.join(workdir, 'ny_rare_birds_20260515_180000.json')
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump(raw_observations, f)
+
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    start_bird_website.latest_data_cache = start_bird_website.LatestDataCache()
+    server = start_map_server(store=store)
+    port = server.server_address[1]
+
+    routes = {
+        'latest_data': '/get_latest_data.php',
+        'observations_page': '/api/observations?limit=100',
+        'stats': '/api/stats',
+    }
+
+    results = {}
+    try:
+        for name, path in routes.items():
+            samples = []
+            lock = threading.Lock()
+
+            def worker():
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                local = []
+                for _ in range(requests_per_client):
+                    start = time.perf_counter()
+                    conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+                    response = conn.getresponse()
+                    response.read()
+                    local.append(time.perf_counter() - start)
+                conn.close()
+                with lock:
+                    samples.extend(local)
+
+            threads = [threading.Thread(target=worker) for _ in range(clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            results[name] = dict(
+                clients=clients,
+                requests=len(samples),
+                requests_per_sec=round(len(samples) / elapsed, 1),
+                **latency_summary(samples)
+            )
+    finally:
+        stop_map_server(server)
+        store.close()
+        os.chdir(previous_dir)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_FILE)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_previous(results_file):
+    try:
+        with open(results_file, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        return json.loads(lines[-1]) if lines else None
+    except (OSError, ValueError):
+        return None
+
+
+def print_comparison(current, previous):
+    """Print each throughput/latency figure with its change since the previous run"""
+    for suite, cases in current['results'].items():
+        print(f"\n{suite}")
+        for case, figures in cases.items():
+            parts = []
+            for key, value in figures.items():
+                if not key.endswith(('_per_sec', '_ms', '_kb')):
+                    continue
+                text = f"{key}={value}"
+                old = (previous or {}).get('results', {}).get(suite, {}).get(case, {}).get(key)
+                if old:
+                    text += f" ({(value - old) / old * 100:+.1f}%)"
+                parts.append(text)
+            print(f"  {case:20} " + '  '.join(parts))
+
+
+def main():
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Benchmark the eBird client, writers and web server")
+    parser.add_argument('--only', choices=['fetch', 'save', 'server'], action='append',
+                        help="Run only these suites (repeatable; default: all)")
+    parser.add_argument('--rows', type=int, default=5000, help="Synthetic observations (default: 5000)")
+    parser.add_argument('--replay', help="Use a recorded JSON dump instead of synthetic rows")
+    parser.add_argument('--latency', type=float, default=0.02, help="Fake API latency in seconds (default: 0.02)")
+    parser.add_argument('--rate-limit-every', type=int, default=0,
+                        help="Fake API answers every Nth request with 429 (default: off)")
+    parser.add_argument('--max-results', type=int, default=100, help="maxResults per fetch (default: 100)")
+    parser.add_argument('--requests', type=int, default=62, help="Fetch requests per mode (default: 62)")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent fetches (default: 16)")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent web clients (default: 16)")
+    parser.add_argument('--requests-per-client', type=int, default=50,
+                        help="Requests per web client per route (default: 50)")
+    parser.add_argument('--results', default=RESULTS_FILE, help="Results file (default: benchmarks/results.jsonl)")
+    args = parser.parse_args()
+
+    suites = args.only or ['fetch', 'save', 'server']
+    observations = load_observations(args.replay, args.rows)
+    results = {}
+
+    api = FakeEBirdAPI(('127.0.0.1', 0), observations, latency=args.latency,
+                       rate_limit_every=args.rate_limit_every).start()
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        if 'fetch' in suites:
+            results['fetch'] = bench_fetch(api.base_url, args.requests, args.concurrency, args.max_results)
+        if 'save' in suites:
+            results['save'] = bench_save(observations, workdir)
+        if 'server' in suites:
+            results['server'] = bench_server(observations, workdir, args.clients, args.requests_per_client)
+
+    api.shutdown()
+    api.server_close()
+
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {key: value for key, value in vars(args).items() if key != 'results'},
+        'fake_api': {'requests': api.requests, 'rate_limited': api.rate_limited},
+        'results': results,
+    }
+
+    previous = load_previous(args.results)
+    print_comparison(record, previous)
+    if previous:
+        print(f"\n(changes relative to {previous.get('commit')} at {previous.get('timestamp')})")
+
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"\nResults appended to {args.results}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Columnar Export
+Writes observations as typed, compressed Parquet files partitioned by observation date,
+and compacts the historical ny_rare_birds_*.json dumps into those partitions
+
+Requires pyarrow (pip install pyarrow). Read the output with e.g.
+    pyarrow.dataset.dataset('history_parquet', partitioning='hive')
+    pandas.read_parquet('history_parquet', columns=['species_code', 'county'])
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from county_index import load_county_index
+from metrics import record_write
+from observation import Observation
+
+
+DEFAULT_ROOT_DIR = 'history_parquet'
+PARTITION_FILE = 'part-0.parquet'
+
+
+def _schema():
+    return pa.schema([
+        ('sub_id', pa.string()),
+        ('species_code', pa.string()),
+        ('com_name', pa.string()),
+        ('sci_name', pa.string()),
+        ('loc_id', pa.string()),
+        ('loc_name', pa.string()),
+        ('county', pa.string()),
+        ('obs_dt', pa.timestamp('s')),
+        ('how_many', pa.int32()),
+        ('lat', pa.float64()),
+        ('lng', pa.float64()),
+        ('obs_valid', pa.bool_()),
+        ('obs_reviewed', pa.bool_()),
+        ('location_private', pa.bool_()),
+        ('user_display_name', pa.string()),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+
+def to_record(obs, county_index=None):
+    """Convert an Observation (or raw API dictionary) into a typed columnar record"""
+    # Raw rows go through the same parsing as fetched ones (obsDt, 'X' counts, coordinates)
+    if not isinstance(obs, Observation):
+        obs = Observation.from_api(obs)
+
+    return {
+        'sub_id': obs.sub_id or '',
+        'species_code': obs.species_code or '',
+        'com_name': obs.com_name,
+        'sci_name': obs.sci_name,
+        'loc_id': obs.loc_id,
+        'loc_name': obs.loc_name,
+        'county': county_index.county_for(obs) if county_index else obs.get('subnational2Name'),
+        'obs_dt': obs.obs_dt,
+        'how_many': obs.how_many,
+        'lat': obs.lat,
+        'lng': obs.lng,
+        'obs_valid': obs.obs_valid,
+        'obs_reviewed': obs.obs_reviewed,
+        'location_private': obs.location_private,
+        'user_display_name': obs.user_display_name,
+    }
+
+
+def _partition_path(root_dir, obs_date):
+    return os.path.join(root_dir, f"obs_date={obs_date}", PARTITION_FILE)
+
+
+def save_to_parquet(observations, root_dir=DEFAULT_ROOT_DIR, compression='zstd', county_index=None):
+    """
+    Merge observations into date-partitioned Parquet files
+
+    Each touched partition is rewritten with existing and new rows, deduplicated by
+    (sub_id, species_code) with the new rows winning.
+
+    Args:
+        observations: Iterable of raw observation dictionaries
+        root_dir: Dataset directory (default: history_parquet)
+        compression: Parquet codec, e.g. 'zstd', 'snappy', 'gzip' (default: 'zstd')
+        county_index: Optional CountyIndex (default: bundled NYC boroughs)
+
+    Returns:
+        dict: Rows written per partition date
+    """
+    _require_pyarrow()
+    if county_index is None:
+        county_index = load_county_index()
+
+    start = time.perf_counter()
+    rows_in = 0
+    partitions = {}
+    for obs in observations:
+        rows_in += 1
+        record = to_record(obs, county_index)
+        obs_date = record['obs_dt'].date().isoformat() if record['obs_dt'] else 'unknown'
+        partitions.setdefault(obs_date, {})[(record['sub_id'], record['species_code'])] = record
+
+    schema = _schema()
+    written = {}
+    for obs_date, records in sorted(partitions.items()):
+        path = _partition_path(root_dir, obs_date)
+        if os.path.exists(path):
+            existing = pq.read_table(path, schema=schema).to_pylist()
+            merged = {(row['sub_id'], row['species_code']): row for row in existing}
+            merged.update(records)
+            records = merged
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rows = sorted(records.values(), key=lambda row: (row['obs_dt'] or datetime.min, row['sub_id']))
+        tmp_path = path + '.tmp'
+        pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp_path, compression=compression)
+        os.replace(tmp_path, path)
+        written[obs_date] = len(rows)
+
+    record_write('parquet', rows_in, time.perf_counter() - start)
+    return written
+
+
+def compact_history(pattern='ny_rare_birds_*.json', root_dir=DEFAULT_ROOT_DIR, compression='zstd'):
+    """
+    Merge timestamped JSON dumps into the partitioned Parquet dataset
+
+    Files are applied oldest first, so the most recent copy of a sighting wins.
+
+    Args:
+        pattern: Glob pattern of JSON dumps (default: ny_rare_birds_*.json)
+        root_dir: Dataset directory (default: history_parquet)
+        compression: Parquet codec (default: 'zstd')
+
+    Returns:
+        dict: Rows per partition date after compaction
+    """
+    _require_pyarrow()
+
+    latest = {}
+    for filename in sorted(glob.glob(pattern), key=os.path.getmtime):
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                observations = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {filename}: {e}")
+            continue
+
+        for obs in observations:
+            latest[(obs.get('subId'), obs.get('speciesCode'))] = obs
+
+    return save_to_parquet(latest.values(), root_dir, compression)
+
+
+def main():
+    """Command line: compact [pattern] [root_dir]"""
+    if len(sys.argv) < 2 or sys.argv[1] != 'compact':
+        print("Usage: python columnar_export.py compact [pattern] [root_dir]")
+        return 1
+
+    pattern = sys.argv[2] if len(sys.argv) > 2 else 'ny_rare_birds_*.json'
+    root_dir = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_ROOT_DIR
+
+    try:
+        partitions = compact_history(pattern, root_dir)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"Compacted {sum(partitions.values())} unique sightings into "
+          f"{len(partitions)} daily partitions under {root_dir}/")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+County Spatial Index
+Assigns observations to counties/boroughs: from eBird's own subnational2 fields when a
+row has them, otherwise from its coordinates with a grid-indexed point-in-polygon test
+
+Boundaries are read from a GeoJSON FeatureCollection whose features carry 'county',
+'borough' and 'county_code' properties. The bundled data/nyc_boroughs.geojson holds
+simplified outlines of the five NYC boroughs, good enough for rows without county
+fields; drop in a more detailed file (e.g. the NYC Open Data borough boundaries or NYS
+county shapes) for finer edges or more counties.
+"""
+
+import json
+import math
+import os
+
+
+DEFAULT_BOUNDARIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'nyc_boroughs.geojson')
+
+# NYC borough name for each of the five NYC counties
+NYC_BOROUGHS = {
+    'New York': 'Manhattan',
+    'Bronx': 'Bronx',
+    'Kings': 'Brooklyn',
+    'Queens': 'Queens',
+    'Richmond': 'Staten Island',
+}
+NYC_COUNTIES = list(NYC_BOROUGHS)
+
+# eBird subnational2 code of each NYC county
+NYC_COUNTY_CODES = {
+    'US-NY-005': 'Bronx',
+    'US-NY-047': 'Kings',
+    'US-NY-061': 'New York',
+    'US-NY-081': 'Queens',
+    'US-NY-085': 'Richmond',
+}
+
+
+def resolve_county_names(names):
+    """
+    Normalise county or borough names to county names
+
+    Args:
+        names: Iterable of names such as 'Manhattan', 'brooklyn' or 'Kings'
+
+    Returns:
+        set: County names (e.g., {'New York', 'Kings'})
+    """
+    lookup = {}
+    for county, borough in NYC_BOROUGHS.items():
+        lookup[county.lower()] = county
+        lookup[borough.lower()] = county
+
+    return {lookup.get(name.strip().lower(), name.strip()) for name in names}
+
+
+class CountyIndex:
+    """Uniform-grid index over county polygons for fast point-in-polygon lookups"""
+
+    def __init__(self, features, cell_size=0.01):
+        """
+        Build the index
+
+        Args:
+            features: GeoJSON features with Polygon/MultiPolygon geometry and a 'county' property
+            cell_size: Grid cell size in degrees (default: 0.01, roughly 1 km)
+        """
+        self.cell_size = cell_size
+        self.counties = []
+        self.counties_by_code = dict(NYC_COUNTY_CODES)
+
+        # Each polygon: (county, bbox, rings) where rings[0] is the outer ring, the rest holes
+        self.polygons = []
+        for feature in features:
+            county = feature['properties']['county']
+            self.counties.append(feature['properties'])
+            if feature['properties'].get('county_code'):
+                self.counties_by_code[feature['properties']['county_code']] = county
+            geometry = feature['geometry']
+            polygons = geometry['coordinates']
+            if geometry['type'] == 'Polygon':
+                polygons = [polygons]
+            for rings in polygons:
+                lngs = [point[0] for point in rings[0]]
+                lats = [point[1] for point in rings[0]]
+                self.polygons.append((county, (min(lngs), min(lats), max(lngs), max(lats)), rings))
+
+        # Bucket polygons by the grid cells their bounding boxes overlap
+        self.grid = {}
+        for polygon_id, (_, (min_lng, min_lat, max_lng, max_lat), _) in enumerate(self.polygons):
+            for x in range(self._cell(min_lng), self._cell(max_lng) + 1):
+                for y in range(self._cell(min_lat), self._cell(max_lat) + 1):
+                    self.grid.setdefault((x, y), []).append(polygon_id)
+
+    def _cell(self, value):
+        return int(math.floor(value / self.cell_size))
+
+    def classify(self, lat, lng):
+        """
+        Find the county containing a point
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+
+        Returns:
+            str: County name, or None if the point is outside every polygon
+        """
+        try:
+            lat, lng = float(lat), float(lng)
+        except (TypeError, ValueError):
+            return None
+
+        for polygon_id in self.grid.get((self._cell(lng), self._cell(lat)), ()):
+            county, (min_lng, min_lat, max_lng, max_lat), rings = self.polygons[polygon_id]
+            if not (min_lng <= lng <= max_lng and min_lat <= lat <= max_lat):
+                continue
+            if _point_in_ring(lng, lat, rings[0]) and not any(_point_in_ring(lng, lat, hole) for hole in rings[1:]):
+                return county
+
+        return None
+
+    def bounds(self, region_code):
+        """
+        Bounding box of a county's boundary polygons
+
+        Args:
+            region_code: eBird subnational2 code (e.g., 'US-NY-061')
+
+        Returns:
+            tuple: (min_lat, min_lng, max_lat, max_lng), or None if the county has no boundary
+        """
+        county = self.counties_by_code.get(region_code)
+        boxes = [bbox for name, bbox, _ in self.polygons if county is not None and name == county]
+        if not boxes:
+            return None
+        return (min(box[1] for box in boxes), min(box[0] for box in boxes),
+                max(box[3] for box in boxes), max(box[2] for box in boxes))
+
+    def county_for(self, obs):
+        """
+        County of a raw observation
+
+        eBird's subnational2Code / subnational2Name (sent with notable and detailed
+        rows) are authoritative; the boundary polygons only place rows without them.
+
+        Args:
+            obs: Raw observation dictionary
+
+        Returns:
+            str: County name, or None if unknown
+        """
+        county = self.counties_by_code.get(obs.get('subnational2Code')) or obs.get('subnational2Name')
+        if county:
+            return county
+        return self.classify(obs.get('lat'), obs.get('lng'))
+
+
+def _point_in_ring(x, y, ring):
+    """Even-odd ray casting test of (x, y) against a closed ring of [x, y] points"""
+    inside = False
+    x1, y1 = ring[-1][0], ring[-1][1]
+    for point in ring:
+        x2, y2 = point[0], point[1]
+        if (y2 > y) != (y1 > y) and x < (x1 - x2) * (y - y2) / (y1 - y2) + x2:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def load_county_index(path=DEFAULT_BOUNDARIES_FILE, cell_size=0.01):
+    """
+    Load county boundaries from a GeoJSON file and build a CountyIndex
+
+    Args:
+        path: GeoJSON FeatureCollection (default: bundled data/nyc_boroughs.geojson)
+        cell_size: Grid cell size in degrees (default: 0.01)
+
+    Returns:
+        CountyIndex
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        collection = json.load(f)
+    return CountyIndex(collection['features'], cell_size=cell_size)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Delta Detector
+Remembers which sightings were already reported so each run only alerts on what changed
+"""
+
+import hashlib
+import os
+import time
+from array import array
+from collections import namedtuple
+
+
+ChangeSet = namedtuple('ChangeSet', ['new', 'updated', 'withdrawn', 'unchanged'])
+
+# State bits stored per sighting
+VALID = 1
+REVIEWED = 2
+
+
+def sighting_key(obs):
+    """64-bit hash of a sighting's (subId, speciesCode) identity"""
+    identity = f"{obs.get('subId', '')}|{obs.get('speciesCode', '')}".encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(identity, digest_size=8).digest(), 'little')
+
+
+def sighting_state(obs):
+    """Validation state bits of a sighting (obsValid defaults to True, obsReviewed to False)"""
+    state = VALID if obs.get('obsValid', True) else 0
+    if obs.get('obsReviewed', False):
+        state |= REVIEWED
+    return state
+
+
+class SeenSet:
+    """
+    Persisted set of reported sightings with their last known validation state
+
+    Stored as packed arrays (8-byte key hash, 1-byte state, 4-byte last-seen day)
+    so the file stays ~13 bytes per sighting however long the history gets.
+    """
+
+    def __init__(self, path='seen_sightings.bin'):
+        """
+        Load the seen-set
+
+        Args:
+            path: Binary file holding the set (default: seen_sightings.bin)
+        """
+        self.path = path
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        keys, states, days = array('Q'), array('B'), array('I')
+        with open(self.path, 'rb') as f:
+            count = array('Q')
+            count.fromfile(f, 1)
+            keys.fromfile(f, count[0])
+            states.fromfile(f, count[0])
+            days.fromfile(f, count[0])
+
+        self.entries = {key: (state, day) for key, state, day in zip(keys, states, days)}
+
+    def save(self):
+        """Write the set atomically"""
+        keys = array('Q', self.entries.keys())
+        states = array('B', (state for state, _ in self.entries.values()))
+        days = array('I', (day for _, day in self.entries.values()))
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            array('Q', [len(keys)]).tofile(f)
+            keys.tofile(f)
+            states.tofile(f)
+            days.tofile(f)
+        os.replace(tmp_path, self.path)
+
+    def detect(self, observations):
+        """
+        Classify observations against what was already seen, and remember them
+
+        Args:
+            observations: Iterable of Observation objects or raw API dictionaries
+
+        Returns:
+            ChangeSet: new and updated sightings, withdrawn sightings (obsValid flipped
+                       to false) and the number of unchanged ones
+        """
+        today = int(time.time() // 86400)
+        new, updated, withdrawn = [], [], []
+        unchanged = 0
+
+        for obs in observations:
+            key = sighting_key(obs)
+            state = sighting_state(obs)
+            previous = self.entries.get(key)
+
+            if previous is None:
+                # A sighting first seen already invalidated has nothing to alert on
+                if state & VALID:
+                    new.append(obs)
+            elif previous[0] == state:
+                unchanged += 1
+            elif previous[0] & VALID and not state & VALID:
+                withdrawn.append(obs)
+            else:
+                updated.append(obs)
+
+            self.entries[key] = (state, today)
+
+        return ChangeSet(new, updated, withdrawn, unchanged)
+
+    def prune(self, max_age_days=60):
+        """
+        Forget sightings not seen for max_age_days (they have left every query window)
+
+        Returns:
+            int: Number of entries removed
+        """
+        cutoff = int(time.time() // 86400) - max_age_days
+        stale = [key for key, (_, day) in self.entries.items() if day < cutoff]
+        for key in stale:
+            del self.entries[key]
+        return len(stale)
+
+    def __len__(self):
+        return len(self.entries)
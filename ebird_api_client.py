@@ -5,10 +5,38 @@ Fetches recent bird observations and notable sightings using the official eBird
 """
 
 import requests
-import csv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import time
+
+from metrics import (API_REQUEST_SECONDS, API_REQUESTS, API_RESPONSE_BYTES, API_RETRIES, CACHE_LOOKUPS,
+                     endpoint_label, log_event, record_write)
+from observation import Observation, to_jsonable
+from observation_stats import summarize_observations
+from observation_writer import ObservationWriter
+
+
+# Pointer file naming the most recent ny_rare_birds_*.json dump, read by the web server
+LATEST_POINTER_FILE = 'ny_rare_birds_latest.txt'
+
+
+def update_latest_pointer(json_filename, pointer_file=LATEST_POINTER_FILE):
+    """
+    Record json_filename as the latest data file
+
+    The pointer is replaced atomically so readers never see a partial write.
+
+    Args:
+        json_filename: Path of the JSON file just written
+        pointer_file: Pointer file to update (default: ny_rare_birds_latest.txt)
+    """
+    tmp_file = f"{pointer_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(json_filename)
+    os.replace(tmp_file, pointer_file)
 
 
 class EBirdAPIClient:
@@ -16,19 +44,151 @@ class EBirdAPIClient:
 
     BASE_URL = "https://api.ebird.org/v2"
 
-    def __init__(self, api_key):
+    # Status codes worth retrying: rate limiting and transient server errors
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, api_key, pool_size=10, max_retries=3, backoff_factor=0.5, timeout=(5, 30), cache=None,
+                 base_url=None, reference=None, nearby_index=None):
         """
         Initialize the eBird API client
 
         Args:
             api_key: Your eBird API key (get from https://ebird.org/api/keygen)
+            pool_size: Number of keep-alive connections to hold open (default: 10)
+            max_retries: Retries on connection errors, 429 and 5xx responses (default: 3)
+            backoff_factor: Exponential backoff factor between retries in seconds (default: 0.5)
+            timeout: Request timeout in seconds, or a (connect, read) tuple (default: (5, 30))
+            cache: Optional ResponseCache to serve repeated requests from disk (default: None)
+            base_url: API root to use instead of BASE_URL, e.g. a local stand-in for benchmarks
+            reference: Optional ebird_reference.ReferenceData for resolving species names locally
+            nearby_index: Optional spatial_index.NearbyIndex answering find_nearby_observations /
+                          find_nearest_observations from stored sightings
         """
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
         self.api_key = api_key
         self.headers = {
             'X-eBirdApiToken': api_key
         }
+        self.timeout = timeout
+        self.cache = cache
+        self.reference = reference
+        self.nearby_index = nearby_index
+
+        # One pooled session shared by every fetch method, so repeated calls
+        # reuse the same TCP+TLS connections to api.ebird.org
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            allowed_methods=['GET'],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _send(self, endpoint, params=None, headers=None):
+        """GET on the shared session, recording latency, bytes, final status and retries"""
+        label = endpoint_label(endpoint)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(endpoint, params=params, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            API_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=label)
+            API_REQUESTS.inc(endpoint=label, status='error')
+            raise
+
+        elapsed = time.perf_counter() - start
+        retries = getattr(response.raw, 'retries', None)
+        history = retries.history if retries is not None else ()
+        for attempt in history:
+            API_RETRIES.inc(endpoint=label, status=attempt.status or 'error')
+
+        API_REQUEST_SECONDS.observe(elapsed, endpoint=label)
+        API_REQUESTS.inc(endpoint=label, status=response.status_code)
+        API_RESPONSE_BYTES.inc(len(response.content), endpoint=label)
+        log_event('api_request', endpoint=label, status=response.status_code, seconds=round(elapsed, 6),
+                  bytes=len(response.content), retries=len(history))
+        return response
+
+    def _get_json(self, endpoint, params=None):
+        """
+        Perform a GET request on the shared session and decode the JSON body
 
-    def get_recent_observations(self, region_code, days_back=14, notable_only=False, max_results=100):
+        Fresh cached responses are returned without a network call; stale ones
+        are revalidated with If-None-Match / If-Modified-Since when possible.
+
+        Args:
+            endpoint: Full endpoint URL
+            params: Query string parameters
+
+        Returns:
+            Decoded JSON payload
+
+        Raises:
+            requests.exceptions.HTTPError: If the final response is an error status
+        """
+        if self.cache is None:
+            response = self._send(endpoint, params)
+            response.raise_for_status()
+            return response.json()
+
+        entry = self.cache.lookup(endpoint, params)
+        if entry and entry.fresh:
+            CACHE_LOOKUPS.inc(result='hit')
+            API_REQUESTS.inc(endpoint=endpoint_label(endpoint), status='cache')
+            return json.loads(entry.body)
+
+        headers = {}
+        if entry and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+
+        response = self._send(endpoint, params, headers)
+        if response.status_code == 304 and entry:
+            CACHE_LOOKUPS.inc(result='revalidated')
+            self.cache.mark_revalidated(entry.key)
+            return json.loads(entry.body)
+
+        CACHE_LOOKUPS.inc(result='miss')
+
+        response.raise_for_status()
+        self.cache.store(
+            endpoint, params, response.content,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        return response.json()
+
+    def _get_observations(self, endpoint, params=None):
+        """
+        Fetch an observation list endpoint and parse each row once into an Observation
+
+        Returns:
+            list: Observation objects
+        """
+        return [Observation.from_api(obs) for obs in self._get_json(endpoint, params)]
+
+    def close(self):
+        """Close the pooled HTTP session and the response cache"""
+        if self.session:
+            self.session.close()
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_recent_observations(self, region_code, days_back=14, notable_only=False, max_results=100,
+                                raise_errors=False):
         """
         Get recent bird observations for a region
 
@@ -37,9 +197,13 @@ class EBirdAPIClient:
             days_back: Number of days back to search (1-30, default: 14)
             notable_only: Only return notable/rare observations (default: False)
             max_results: Maximum number of results to return (default: 100)
+            raise_errors: Re-raise request errors instead of returning [] (default: False)
 
         Returns:
-            list: List of observation dictionaries
+            list: List of Observation objects
+
+        Raises:
+            Exception: The request error, only when raise_errors is set
         """
         endpoint = f"{self.BASE_URL}/data/obs/{region_code}/recent"
         if notable_only:
@@ -53,23 +217,25 @@ class EBirdAPIClient:
         print(f"Fetching {'notable' if notable_only else 'recent'} observations for region {region_code}...")
 
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            observations = response.json()
+            observations = self._get_observations(endpoint, params)
             print(f"Found {len(observations)} observations")
             return observations
 
         except requests.exceptions.HTTPError as e:
-            if response.status_code == 404:
+            if e.response is not None and e.response.status_code == 404:
                 print(f"Error: Region code '{region_code}' not found")
             else:
                 print(f"HTTP Error: {e}")
+            if raise_errors:
+                raise
             return []
         except Exception as e:
             print(f"Error fetching observations: {e}")
+            if raise_errors:
+                raise
             return []
 
-    def get_recent_observations_hotspot(self, location_id, days_back=14, max_results=100):
+    def get_recent_observations_hotspot(self, location_id, days_back=14, max_results=100, raise_errors=False):
         """
         Get recent observations from a specific hotspot
 
@@ -77,9 +243,13 @@ class EBirdAPIClient:
             location_id: Hotspot location ID (e.g., 'L99381' - the ID from the alert URL)
             days_back: Number of days back to search (1-30, default: 14)
             max_results: Maximum number of results to return (default: 100)
+            raise_errors: Re-raise request errors instead of returning [] (default: False)
 
         Returns:
-            list: List of observation dictionaries
+            list: List of Observation objects
+
+        Raises:
+            Exception: The request error, only when raise_errors is set
         """
         endpoint = f"{self.BASE_URL}/data/obs/{location_id}/recent"
 
@@ -91,23 +261,25 @@ class EBirdAPIClient:
         print(f"Fetching recent observations for hotspot {location_id}...")
 
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            observations = response.json()
+            observations = self._get_observations(endpoint, params)
             print(f"Found {len(observations)} observations")
             return observations
 
         except requests.exceptions.HTTPError as e:
-            if response.status_code == 404:
+            if e.response is not None and e.response.status_code == 404:
                 print(f"Error: Location ID '{location_id}' not found")
             else:
                 print(f"HTTP Error: {e}")
+            if raise_errors:
+                raise
             return []
         except Exception as e:
             print(f"Error fetching observations: {e}")
+            if raise_errors:
+                raise
             return []
 
-    def get_notable_observations(self, region_code, days_back=14, max_results=100):
+    def get_notable_observations(self, region_code, days_back=14, max_results=100, raise_errors=False):
         """
         Get notable (rare/unusual) bird observations for a region
 
@@ -115,11 +287,13 @@ class EBirdAPIClient:
             region_code: Region code (e.g., 'US-CA' for California)
             days_back: Number of days back to search (1-30, default: 14)
             max_results: Maximum number of results to return (default: 100)
+            raise_errors: Re-raise request errors instead of returning [] (default: False)
 
         Returns:
-            list: List of notable observation dictionaries
+            list: List of notable Observation objects
         """
-        return self.get_recent_observations(region_code, days_back, notable_only=True, max_results=max_results)
+        return self.get_recent_observations(region_code, days_back, notable_only=True, max_results=max_results,
+                                            raise_errors=raise_errors)
 
     def get_species_observations(self, region_code, species_code, days_back=14, max_results=100):
         """
@@ -127,13 +301,15 @@ class EBirdAPIClient:
 
         Args:
             region_code: Region code (e.g., 'US-CA')
-            species_code: Species code (e.g., 'bkcchi' for Black-capped Chickadee)
+            species_code: Species code (e.g., 'bkcchi' for Black-capped Chickadee); with a
+                          reference cache also a common or scientific name or banding code
             days_back: Number of days back to search (1-30)
             max_results: Maximum number of results
 
         Returns:
-            list: List of observation dictionaries
+            list: List of Observation objects
         """
+        species_code = self.resolve_species(species_code)
         endpoint = f"{self.BASE_URL}/data/obs/{region_code}/recent/{species_code}"
 
         params = {
@@ -144,9 +320,7 @@ class EBirdAPIClient:
         print(f"Fetching observations of species {species_code} in region {region_code}...")
 
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            observations = response.json()
+            observations = self._get_observations(endpoint, params)
             print(f"Found {len(observations)} observations")
             return observations
 
@@ -154,21 +328,29 @@ class EBirdAPIClient:
             print(f"Error fetching species observations: {e}")
             return []
 
-    def get_nearby_observations(self, latitude, longitude, distance_km=25, days_back=14, max_results=100):
+    def get_nearby_observations(self, latitude, longitude, distance_km=25, days_back=14, max_results=100,
+                                notable_only=False, raise_errors=False):
         """
         Get recent observations near a specific location
 
         Args:
             latitude: Latitude coordinate
             longitude: Longitude coordinate
-            distance_km: Search radius in kilometers (default: 25)
+            distance_km: Search radius in kilometers (0-50, default: 25)
             days_back: Number of days back to search (1-30)
             max_results: Maximum number of results
+            notable_only: Only return notable/rare observations (default: False)
+            raise_errors: Re-raise request errors instead of returning [] (default: False)
 
         Returns:
-            list: List of observation dictionaries
+            list: List of Observation objects
+
+        Raises:
+            Exception: The request error, only when raise_errors is set
         """
         endpoint = f"{self.BASE_URL}/data/obs/geo/recent"
+        if notable_only:
+            endpoint = f"{self.BASE_URL}/data/obs/geo/recent/notable"
 
         params = {
             'lat': latitude,
@@ -181,26 +363,192 @@ class EBirdAPIClient:
         print(f"Fetching observations near ({latitude}, {longitude})...")
 
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            observations = response.json()
+            observations = self._get_observations(endpoint, params)
             print(f"Found {len(observations)} observations")
             return observations
 
         except Exception as e:
             print(f"Error fetching nearby observations: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    def _require_nearby_index(self):
+        if self.nearby_index is None:
+            raise ValueError("No nearby_index configured; pass NearbyIndex(store) to EBirdAPIClient")
+        return self.nearby_index
+
+    def find_nearby_observations(self, latitude, longitude, distance_km=25, days_back=14, max_results=100,
+                                 species=None):
+        """
+        Stored observations near a location, from the local spatial index (no API call)
+
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            distance_km: Search radius in kilometers (default: 25)
+            days_back: Number of days back to search (default: 14)
+            max_results: Maximum number of results, nearest first (default: 100)
+            species: Optional species code or common name
+
+        Returns:
+            list: List of Observation objects, nearest first
+        """
+        since = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d %H:%M')
+        species = self.resolve_species(species) if species else None
+        results = self._require_nearby_index().within(
+            latitude, longitude, distance_km, since=since, species=species, limit=max_results
+        )
+        return [Observation.from_api(obs) for _, obs in results]
+
+    def find_nearest_observations(self, latitude, longitude, k=10, days_back=14, species=None,
+                                  max_distance_km=None):
+        """
+        The k stored observations closest to a location, from the local spatial index (no API call)
+
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            k: Number of observations (default: 10)
+            days_back: Number of days back to search (default: 14)
+            species: Optional species code or common name
+            max_distance_km: Ignore observations farther than this (default: no limit)
+
+        Returns:
+            list: (distance in km, Observation) pairs, nearest first
+        """
+        since = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d %H:%M')
+        species = self.resolve_species(species) if species else None
+        results = self._require_nearby_index().nearest(
+            latitude, longitude, k, max_distance_km=max_distance_km, since=since, species=species
+        )
+        return [(distance, Observation.from_api(obs)) for distance, obs in results]
+
+    def refresh_nearby_index(self, latitude, longitude, distance_km=50, days_back=14, max_results=10000,
+                             notable_only=False):
+        """
+        Fetch observations around a location from the API into the spatial index's store
+
+        The index rebuilds itself on its next query.
+
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            distance_km: Radius to fetch, at most 50 (default: 50)
+            days_back: Number of days back to fetch (1-30, default: 14)
+            max_results: Maximum number of results (default: 10000)
+            notable_only: Only fetch notable/rare observations (default: False)
+
+        Returns:
+            dict: Counts of 'inserted', 'updated' and 'unchanged' sightings
+        """
+        observations = self.get_nearby_observations(latitude, longitude, distance_km, days_back, max_results,
+                                                    notable_only=notable_only)
+        return self.save_to_store(observations, self._require_nearby_index().store)
+
+    def resolve_species(self, name):
+        """
+        Species code for a name, looked up in the local reference cache (no API call)
+
+        Args:
+            name: Species code, common or scientific name, or banding code
+
+        Returns:
+            str: The species code, or name unchanged if there is no cache or no match
+        """
+        if self.reference is None:
+            return name
+        return self.reference.species_code(name) or name
+
+    def get_taxonomy(self, species_codes=None, locale=None):
+        """
+        Get the eBird taxonomy (about 17,000 entries; prefer the ebird_reference cache)
+
+        Args:
+            species_codes: Optional list of species codes to limit the result to
+            locale: Optional locale for common names (e.g., 'es')
+
+        Returns:
+            list: Taxonomy dictionaries (speciesCode, comName, sciName, category, taxonOrder, ...)
+        """
+        endpoint = f"{self.BASE_URL}/ref/taxonomy/ebird"
+        params = {'fmt': 'json'}
+        if species_codes:
+            params['species'] = ','.join(species_codes)
+        if locale:
+            params['locale'] = locale
+
+        try:
+            return self._get_json(endpoint, params)
+        except Exception as e:
+            print(f"Error fetching taxonomy: {e}")
+            return []
+
+    def get_taxonomy_versions(self):
+        """
+        Get the published eBird taxonomy versions
+
+        Returns:
+            list: Dictionaries with 'authorityVer' and 'latest'
+        """
+        try:
+            return self._get_json(f"{self.BASE_URL}/ref/taxonomy/versions")
+        except Exception as e:
+            print(f"Error fetching taxonomy versions: {e}")
+            return []
+
+    def get_hotspots(self, region_code, days_back=None):
+        """
+        Get the hotspots in a region
+
+        Args:
+            region_code: Region code (e.g., 'US-NY' or 'US-NY-061')
+            days_back: Only hotspots visited in the last N days (1-30, default: all)
+
+        Returns:
+            list: Hotspot dictionaries (locId, locName, subnational2Code, lat, lng, ...)
+        """
+        endpoint = f"{self.BASE_URL}/ref/hotspot/{region_code}"
+        params = {'fmt': 'json'}
+        if days_back:
+            params['back'] = days_back
+
+        try:
+            return self._get_json(endpoint, params)
+        except Exception as e:
+            print(f"Error fetching hotspots: {e}")
+            return []
+
+    def get_subregions(self, region_code, region_type='subnational2'):
+        """
+        Get the subregions of a region
+
+        Args:
+            region_code: Parent region code (e.g., 'US-NY')
+            region_type: 'country', 'subnational1' or 'subnational2' (default: 'subnational2', counties)
+
+        Returns:
+            list: Dictionaries with 'code' and 'name'
+        """
+        try:
+            return self._get_json(f"{self.BASE_URL}/ref/region/list/{region_type}/{region_code}")
+        except Exception as e:
+            print(f"Error fetching {region_type} regions of {region_code}: {e}")
             return []
 
     def format_observation(self, obs):
         """
-        Format an observation dictionary into a more readable structure
+        Format an observation into a more readable structure
 
         Args:
-            obs: Raw observation dictionary from API
+            obs: Observation, or raw observation dictionary from API
 
         Returns:
             dict: Formatted observation data
         """
+        if isinstance(obs, Observation):
+            return obs.to_formatted()
+
         return {
             'species_code': obs.get('speciesCode', ''),
             'common_name': obs.get('comName', ''),
@@ -219,15 +567,30 @@ class EBirdAPIClient:
             'has_media': obs.get('hasComments', False) or obs.get('hasRichMedia', False)
         }
 
+    def open_writer(self, filename, fmt='ndjson'):
+        """
+        Open a streaming writer that accepts observations as they arrive
+
+        Args:
+            filename: Output path
+            fmt: 'csv' (formatted rows), 'ndjson' or 'json' (compact raw observations)
+
+        Returns:
+            ObservationWriter: Use as a context manager; call write() or write_many()
+        """
+        return ObservationWriter(filename, fmt, formatter=self.format_observation)
+
     def save_to_csv(self, observations, filename=None):
         """
         Save observations to CSV file
 
+        Rows are formatted and written one at a time, so observations may be a generator.
+
         Args:
-            observations: List of observation dictionaries
+            observations: List (or iterable) of observation dictionaries
             filename: Output filename (default: ebird_observations_TIMESTAMP.csv)
         """
-        if not observations:
+        if isinstance(observations, list) and not observations:
             print("No observations to save")
             return
 
@@ -235,28 +598,21 @@ class EBirdAPIClient:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"ebird_observations_{timestamp}.csv"
 
-        # Format all observations
-        formatted_obs = [self.format_observation(obs) for obs in observations]
-
-        # Get all fieldnames
-        fieldnames = sorted(set().union(*[obs.keys() for obs in formatted_obs]))
-
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(formatted_obs)
+        with self.open_writer(filename, 'csv') as writer:
+            writer.write_many(observations)
 
         print(f"Data saved to {filename}")
 
-    def save_to_json(self, observations, filename=None):
+    def save_to_json(self, observations, filename=None, compact=False):
         """
         Save observations to JSON file
 
         Args:
-            observations: List of observation dictionaries
+            observations: List of observation dictionaries (any iterable when compact=True)
             filename: Output filename (default: ebird_observations_TIMESTAMP.json)
+            compact: Stream a compact, unindented array instead of pretty-printing (default: False)
         """
-        if not observations:
+        if isinstance(observations, list) and not observations:
             print("No observations to save")
             return
 
@@ -264,11 +620,65 @@ class EBirdAPIClient:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"ebird_observations_{timestamp}.json"
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(observations, f, indent=2)
+        if compact:
+            with self.open_writer(filename, 'json') as writer:
+                writer.write_many(observations)
+        else:
+            start = time.perf_counter()
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(observations, f, indent=2, default=to_jsonable)
+            record_write('json', len(observations), time.perf_counter() - start)
 
         print(f"Data saved to {filename}")
 
+    def save_to_ndjson(self, observations, filename=None):
+        """
+        Save observations as newline-delimited JSON (one observation per line)
+
+        Args:
+            observations: List (or iterable) of observation dictionaries
+            filename: Output filename (default: ebird_observations_TIMESTAMP.ndjson)
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"ebird_observations_{timestamp}.ndjson"
+
+        with self.open_writer(filename, 'ndjson') as writer:
+            count = writer.write_many(observations)
+
+        print(f"{count} observations saved to {filename}")
+
+    def save_to_parquet(self, observations, root_dir='history_parquet'):
+        """
+        Merge observations into date-partitioned Parquet files (requires pyarrow)
+
+        Args:
+            observations: List (or iterable) of observation dictionaries
+            root_dir: Dataset directory, one obs_date=YYYY-MM-DD folder per day (default: history_parquet)
+        """
+        from columnar_export import save_to_parquet
+
+        partitions = save_to_parquet(observations, root_dir)
+        print(f"Data saved to {root_dir}/ ({len(partitions)} daily partitions)")
+
+    def save_to_store(self, observations, store):
+        """
+        Upsert observations into a persistent ObservationStore
+
+        Only sightings that are new or whose content changed are written.
+
+        Args:
+            observations: List of observation dictionaries
+            store: ObservationStore instance
+
+        Returns:
+            dict: Counts of 'inserted', 'updated' and 'unchanged' sightings
+        """
+        counts = store.upsert(observations)
+        print(f"Store updated: {counts['inserted']} new, {counts['updated']} changed, "
+              f"{counts['unchanged']} unchanged ({store.db_path})")
+        return counts
+
 
 def main():
     """Main function to run the API client"""
@@ -301,67 +711,59 @@ def main():
         return 1
 
     # Create API client
-    client = EBirdAPIClient(api_key)
-
-    # Example: Get recent notable observations for a region
-    # You can change this to match your needs
-
-    print("\n" + "="*60)
-    print("New York Rare Bird Alert - eBird API Client")
-    print("Alert ID: SN35466 (New York State)")
-    print("="*60 + "\n")
-
-    # SN35466 = New York Rare Bird Alert
-    # Using US-NY (New York State) region code
-    region_code = "US-NY"
-
-    print(f"Fetching notable/rare bird observations for New York State...")
-    print(f"Region code: {region_code}")
-    print()
-
-    observations = client.get_notable_observations(region_code, days_back=7, max_results=100)
-
-    if observations:
-        # Save to CSV with New York specific filename
-        csv_filename = f"ny_rare_birds_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        client.save_to_csv(observations, csv_filename)
-
-        # Also save to JSON for full data
-        json_filename = f"ny_rare_birds_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        client.save_to_json(observations, json_filename)
-
-        # Print detailed summary
-        print(f"\n" + "="*60)
-        print(f"NEW YORK RARE BIRD ALERT SUMMARY")
-        print("="*60)
-        print(f"Total rare bird observations: {len(observations)}")
-        species = set(obs.get('comName') for obs in observations)
-        print(f"Unique rare species reported: {len(species)}")
-
-        # Group by county
-        counties = {}
-        for obs in observations:
-            loc = obs.get('locName', '')
-            if 'US-NY' in loc or 'New York' in loc:
-                # Try to extract county from location
-                counties[loc] = counties.get(loc, 0) + 1
-
-        print(f"\nMost recent rare bird sightings in NY:")
-        for i, obs in enumerate(observations[:10], 1):
-            species_name = obs.get('comName', 'Unknown')
-            location = obs.get('locName', 'Unknown location')
-            date = obs.get('obsDt', 'Unknown date')
-            count = obs.get('howMany', '?')
-            print(f"{i}. {species_name} ({count} bird{'s' if count != 1 else ''})")
-            print(f"   Location: {location}")
-            print(f"   Date/Time: {date}")
-            print()
-
-        print(f"Full data saved to:")
-        print(f"  - {csv_filename}")
-        print(f"  - {json_filename}")
-    else:
-        print("\nNo rare bird observations found for New York in the past 7 days.")
+    with EBirdAPIClient(api_key) as client:
+        # Example: Get recent notable observations for a region
+        # You can change this to match your needs
+
+        print("\n" + "="*60)
+        print("New York Rare Bird Alert - eBird API Client")
+        print("Alert ID: SN35466 (New York State)")
+        print("="*60 + "\n")
+
+        # SN35466 = New York Rare Bird Alert
+        # Using US-NY (New York State) region code
+        region_code = "US-NY"
+
+        print(f"Fetching notable/rare bird observations for New York State...")
+        print(f"Region code: {region_code}")
+        print()
+
+        observations = client.get_notable_observations(region_code, days_back=7, max_results=100)
+
+        if observations:
+            # Save to CSV with New York specific filename
+            csv_filename = f"ny_rare_birds_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            client.save_to_csv(observations, csv_filename)
+
+            # Also save to JSON for full data
+            json_filename = f"ny_rare_birds_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            client.save_to_json(observations, json_filename)
+            update_latest_pointer(json_filename)
+
+            # Print detailed summary
+            print(f"\n" + "="*60)
+            print(f"NEW YORK RARE BIRD ALERT SUMMARY")
+            print("="*60)
+            print(f"Total rare bird observations: {len(observations)}")
+            stats = summarize_observations(observations)
+            print(f"Unique rare species reported: {stats['unique_species']}")
+
+            print(f"\nMost recent rare bird sightings in NY:")
+            for i, obs in enumerate(observations[:10], 1):
+                species_name = obs.get('comName', 'Unknown')
+                location = obs.get('locName', 'Unknown location')
+                date = obs.get('obsDt', 'Unknown date')
+                count = obs.get('howMany', '?')
+                print(f"{i}. {species_name} ({count} bird{'s' if count != 1 else ''})")
+                print(f"   Location: {location}")
+                print(f"   Date/Time: {date}")
+                print()
+
+            print(f"Full data saved to:")
+            print(f"  - {csv_filename}")
+            print(f"  - {json_filename}")
+        else:
+            print("\nNo rare bird observations found for New York in the past 7 days.")
 
     return 0
 
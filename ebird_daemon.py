@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+eBird Polling Daemon
+Long-running alternative to the daily cron job: keeps warm connections and polls
+regions on an adaptive schedule, publishing new sightings as soon as they appear
+"""
+
+import argparse
+import heapq
+import http.server
+import json
+import os
+import random
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+
+from ebird_api_client import EBirdAPIClient, update_latest_pointer
+from metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from observation_writer import ObservationWriter
+from async_fetcher import NY_COUNTY_CODES
+from observation_store import ObservationStore
+from county_index import load_county_index
+from delta_detector import SeenSet
+
+
+HEALTH_PORT = 8765
+
+# Snapshot rewritten in place as sightings change. The latest-data pointer names it for
+# the map; the name stays outside ny_rare_birds_*.json so it is not treated as history.
+LIVE_FILE = 'ny_rare_birds.live.json'
+
+# Fastest the live snapshot is rewritten, however many polls change the store meanwhile
+PUBLISH_INTERVAL = 60
+
+# How often sightings that have left every query window are pruned from the seen set
+PRUNE_INTERVAL = 86400
+
+# Months of peak spring and fall migration, polled faster
+MIGRATION_MONTHS = (4, 5, 9, 10)
+
+
+class RegionState:
+    """Polling schedule and counters for one region"""
+
+    def __init__(self, region, interval):
+        self.region = region
+        self.interval = interval
+        self.polls = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.new_sightings = 0
+        self.last_changed = 0
+        self.last_poll = None
+        self.last_success = None
+        self.last_new = None
+
+    def to_dict(self):
+        return {
+            'interval_seconds': round(self.interval),
+            'polls': self.polls,
+            'errors': self.errors,
+            'new_sightings': self.new_sightings,
+            'last_poll': self.last_poll,
+            'last_success': self.last_success,
+            'last_new': self.last_new,
+        }
+
+
+class PollingDaemon:
+    """Adaptive poller for eBird notable observations"""
+
+    def __init__(self, client, regions, store, seen=None, days_back=7, max_results=100,
+                 base_interval=900, min_interval=120, max_interval=3600, jitter=0.2,
+                 health_port=HEALTH_PORT, live_file=LIVE_FILE, publish_interval=PUBLISH_INTERVAL,
+                 on_new=None):
+        """
+        Initialize the daemon
+
+        Args:
+            client: EBirdAPIClient (its pooled connections stay warm between polls)
+            regions: Region codes or hotspot IDs to poll
+            store: ObservationStore receiving every polled sighting
+            seen: Optional SeenSet used to pick out newly reported sightings
+            days_back: Window requested on each poll (default: 7)
+            max_results: Maximum results per poll (default: 100)
+            base_interval: Starting poll interval per region in seconds (default: 900)
+            min_interval: Fastest poll interval for active regions (default: 120)
+            max_interval: Slowest poll interval for quiet regions (default: 3600)
+            jitter: Random +/- fraction applied to each interval (default: 0.2)
+            health_port: Port of the /health endpoint, or None to disable (default: 8765)
+            live_file: Snapshot of the store's recent window republished after changes,
+                       or None to only update the store (default: ny_rare_birds.live.json)
+            publish_interval: Minimum seconds between live snapshot rewrites; changes from
+                              polls in between are coalesced into one rewrite (default: 60)
+            on_new: Optional callbacks called with each list of new sightings
+        """
+        self.client = client
+        self.store = store
+        self.seen = seen
+        self.days_back = days_back
+        self.max_results = max_results
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.health_port = health_port
+        self.live_file = live_file
+        self.publish_interval = publish_interval
+        self.on_new = list(on_new or [])
+
+        self.regions = {region: RegionState(region, base_interval) for region in regions}
+        self.started_at = None
+        self._stop = threading.Event()
+        self._health_server = None
+        self._dirty = False
+        self._next_publish = 0
+        self._next_prune = 0
+
+        # Spread the first round of polls out instead of firing them all at once
+        now = time.monotonic()
+        self._schedule = [
+            (now + random.uniform(0, min(base_interval, 60)), region) for region in self.regions
+        ]
+        heapq.heapify(self._schedule)
+
+    def next_interval(self, state, found_new, failed):
+        """
+        Adapt a region's interval after a poll
+
+        Active regions speed up, quiet ones back off, failures back off faster, and
+        everything runs twice as often during migration peaks.
+        """
+        if failed:
+            state.interval = min(self.max_interval, state.interval * 2)
+        elif found_new:
+            state.interval = max(self.min_interval, state.interval / 2)
+        else:
+            state.interval = min(self.max_interval, state.interval * 1.5)
+
+        interval = state.interval
+        if datetime.now().month in MIGRATION_MONTHS:
+            interval = max(self.min_interval, interval / 2)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def poll(self, region):
+        """
+        Poll one region, store the results and publish new sightings
+
+        Returns:
+            list: Newly reported sightings
+
+        Raises:
+            Exception: If the request fails (counted by run() and reported by health())
+        """
+        state = self.regions[region]
+        state.polls += 1
+        state.last_poll = datetime.now().isoformat(timespec='seconds')
+
+        observations = self.client.get_notable_observations(
+            region, days_back=self.days_back, max_results=self.max_results, raise_errors=True
+        )
+
+        # The store backs /api/observations directly; the live snapshot is rewritten by
+        # the run loop at most once per publish_interval
+        counts = self.store.upsert(observations)
+        state.last_changed = counts['inserted'] + counts['updated']
+        if state.last_changed:
+            self._dirty = True
+
+        if self.seen is not None:
+            changes = self.seen.detect(observations)
+            new = changes.new + changes.updated
+            if time.monotonic() >= self._next_prune:
+                # A day of slack past the window, so nothing still returned is forgotten
+                self.seen.prune(max_age_days=self.days_back + 1)
+                self._next_prune = time.monotonic() + PRUNE_INTERVAL
+            self.seen.save()
+        else:
+            new = []
+
+        state.last_success = state.last_poll
+        if new:
+            state.new_sightings += len(new)
+            state.last_new = state.last_poll
+            print(f"[{state.last_poll}] {region}: {len(new)} new sighting(s)")
+            for callback in self.on_new:
+                callback(new)
+
+        return new
+
+    def publish_snapshot(self):
+        """Rewrite the live snapshot from the store and point the website at it"""
+        self._dirty = False
+        self._next_publish = time.monotonic() + self.publish_interval
+        if not self.live_file:
+            return
+
+        since = (datetime.now() - timedelta(days=self.days_back)).strftime('%Y-%m-%d')
+        tmp_path = f"{self.live_file}.tmp"
+        with ObservationWriter(tmp_path, 'json') as writer:
+            writer.write_many(self.store.query(since=since))
+        os.replace(tmp_path, self.live_file)
+        update_latest_pointer(self.live_file)
+
+    def _publish_pending(self):
+        try:
+            self.publish_snapshot()
+        except Exception as e:
+            # Still marked clean; the next change retries after publish_interval
+            print(f"Error publishing {self.live_file}: {e}")
+
+    def run(self):
+        """Poll until stopped by SIGINT/SIGTERM or stop()"""
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._install_signal_handlers()
+        self._start_health_server()
+
+        print(f"Polling {len(self.regions)} region(s); health at "
+              f"{'http://localhost:%d/health' % self.health_port if self.health_port else 'disabled'}")
+
+        try:
+            while not self._stop.is_set():
+                if self._dirty and time.monotonic() >= self._next_publish:
+                    self._publish_pending()
+
+                due_at, region = self._schedule[0]
+                if self._dirty:
+                    due_at = min(due_at, self._next_publish)
+                wait = due_at - time.monotonic()
+                if wait > 0:
+                    self._stop.wait(wait)
+                    continue
+
+                if self._schedule[0][0] > time.monotonic():
+                    continue
+
+                heapq.heappop(self._schedule)
+                self._poll_and_reschedule(region)
+        finally:
+            self.shutdown()
+
+    def _poll_and_reschedule(self, region):
+        """Poll a due region, count any failure and schedule its next poll"""
+        state = self.regions[region]
+        failed = False
+        try:
+            self.poll(region)
+            state.consecutive_errors = 0
+        except Exception as e:
+            failed = True
+            state.errors += 1
+            state.consecutive_errors += 1
+            print(f"Error polling {region}: {e}")
+
+        # Activity is judged by the store, so it works with or without a seen set
+        found_new = not failed and state.last_changed > 0
+        heapq.heappush(self._schedule, (time.monotonic() + self.next_interval(state, found_new, failed), region))
+
+    def stop(self, *args):
+        """Request a graceful stop; the current poll finishes first"""
+        self._stop.set()
+
+    def shutdown(self):
+        """Stop the health/metrics endpoint and flush state"""
+        if self._dirty:
+            self._publish_pending()
+        if self._health_server:
+            self._health_server.shutdown()
+            self._health_server.server_close()
+            self._health_server = None
+        if self.seen is not None:
+            self.seen.save()
+        print("Daemon stopped.")
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+    def health(self):
+        """
+        Health summary
+
+        Returns:
+            dict: 'status' is 'ok' when every region succeeded within two max intervals
+        """
+        now = time.time()
+        stale = []
+        for region, state in self.regions.items():
+            if state.last_success is None:
+                if state.consecutive_errors:
+                    stale.append(region)
+                continue
+            age = now - datetime.fromisoformat(state.last_success).timestamp()
+            if age > 2 * self.max_interval:
+                stale.append(region)
+
+        return {
+            'status': 'degraded' if stale else 'ok',
+            'started_at': self.started_at,
+            'stale_regions': stale,
+            'stored_sightings': self.store.count(),
+            'regions': {region: state.to_dict() for region, state in self.regions.items()},
+        }
+
+    def _start_health_server(self):
+        if not self.health_port:
+            return
+
+        daemon = self
+
+        class HealthHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/health':
+                    report = daemon.health()
+                    body = json.dumps(report).encode('utf-8')
+                    status = 200 if report['status'] == 'ok' else 503
+                    content_type = 'application/json'
+                elif path == '/metrics':
+                    body = REGISTRY.render().encode('utf-8')
+                    status = 200
+                    content_type = PROMETHEUS_CONTENT_TYPE
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(status)
+                self.send_header('Content-type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._health_server = http.server.ThreadingHTTPServer(('', self.health_port), HealthHandler)
+        threading.Thread(target=self._health_server.serve_forever, daemon=True).start()
+
+
+def main():
+    """Run the polling daemon"""
+    parser = argparse.ArgumentParser(description="Poll eBird for NY rare birds continuously")
+    parser.add_argument('--regions', nargs='+', default=NY_COUNTY_CODES,
+                        help="Region codes or hotspot IDs to poll (default: all NY counties)")
+    parser.add_argument('--days-back', type=int, default=7, help="Window per poll in days (default: 7)")
+    parser.add_argument('--interval', type=int, default=900, help="Starting poll interval in seconds (default: 900)")
+    parser.add_argument('--min-interval', type=int, default=120, help="Fastest poll interval (default: 120)")
+    parser.add_argument('--max-interval', type=int, default=3600, help="Slowest poll interval (default: 3600)")
+    parser.add_argument('--publish-interval', type=int, default=PUBLISH_INTERVAL,
+                        help=f"Minimum seconds between live snapshot rewrites (default: {PUBLISH_INTERVAL})")
+    parser.add_argument('--health-port', type=int, default=HEALTH_PORT,
+                        help=f"Port for /health, 0 to disable (default: {HEALTH_PORT})")
+    parser.add_argument('--db', default='ny_rare_birds.db', help="Observation store (default: ny_rare_birds.db)")
+    args = parser.parse_args()
+
+    try:
+        with open('config.json', 'r') as f:
+            api_key = json.load(f).get('ebird_api_key')
+    except Exception:
+        api_key = os.getenv('EBIRD_API_KEY')
+
+    if not api_key:
+        print("Error: No API key found in config.json")
+        return 1
+
+    with EBirdAPIClient(api_key) as client, \
+            ObservationStore(args.db, county_index=load_county_index()) as store:
+        daemon = PollingDaemon(
+            client, args.regions, store,
+            seen=SeenSet('seen_sightings.bin'),
+            days_back=args.days_back,
+            base_interval=args.interval,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            publish_interval=args.publish_interval,
+            health_port=args.health_port or None
+        )
+        daemon.run()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+eBird Reference Cache
+Local, versioned copy of the eBird taxonomy and a region's hotspots, with in-memory
+indexes for species name -> code, taxonomic order and hotspot -> county/lat/lng
+
+Refresh it from cron (e.g. weekly); the taxonomy is only downloaded again when eBird
+publishes a new version:
+
+    python ebird_reference.py
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import time
+
+from ebird_api_client import EBirdAPIClient
+
+
+REFERENCE_FILE = 'ebird_reference.json'
+DEFAULT_REGION = 'US-NY'
+
+# How often each part is checked against the API
+TAXONOMY_MAX_AGE = 30 * 24 * 60 * 60
+HOTSPOT_MAX_AGE = 7 * 24 * 60 * 60
+
+# Taxonomy fields kept locally (the full download has a dozen more per species)
+TAXONOMY_FIELDS = ('speciesCode', 'comName', 'sciName', 'category', 'taxonOrder', 'familyComName', 'bandingCodes')
+HOTSPOT_FIELDS = ('locId', 'locName', 'subnational2Code', 'lat', 'lng', 'numSpeciesAllTime')
+
+
+def normalize_name(name):
+    """Lookup key for a species name: case, punctuation and spacing ignored"""
+    return re.sub(r'[^a-z0-9]+', ' ', re.sub(r"['\u2019]", '', name.casefold())).strip()
+
+
+class ReferenceData:
+    """
+    eBird taxonomy and hotspot lists cached on disk, indexed in memory
+
+    Every lookup is a dictionary access; nothing here calls the API except refresh().
+    """
+
+    def __init__(self, path=REFERENCE_FILE, region_code=DEFAULT_REGION):
+        """
+        Load the cached reference data (empty if the file does not exist yet)
+
+        Args:
+            path: JSON file holding the cache (default: ebird_reference.json)
+            region_code: Region whose hotspots and counties are cached (default: US-NY)
+        """
+        self.path = path
+        self.region_code = region_code
+        self.data = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if data.get('region_code', self.region_code) != self.region_code:
+            data = {key: value for key, value in data.items() if not key.startswith(('hotspots', 'counties'))}
+        self.data = data
+        self._build_indexes()
+
+    def _build_indexes(self):
+        taxonomy = self.data.get('taxonomy', [])
+        self._species = {entry['speciesCode']: entry for entry in taxonomy}
+        self._taxon_order = {entry['speciesCode']: entry.get('taxonOrder', math.inf) for entry in taxonomy}
+
+        # Later keys never shadow earlier ones: common names win over banding codes
+        self._codes_by_name = {}
+        for field in ('comName', 'sciName', 'bandingCodes'):
+            for entry in taxonomy:
+                names = entry.get(field) or []
+                for name in [names] if isinstance(names, str) else names:
+                    self._codes_by_name.setdefault(normalize_name(name), entry['speciesCode'])
+
+        counties = self.data.get('counties', {})
+        self._hotspots = {}
+        for entry in self.data.get('hotspots', []):
+            entry = dict(entry)
+            entry['county'] = counties.get(entry.get('subnational2Code'))
+            self._hotspots[entry['locId']] = entry
+
+    @property
+    def taxonomy_version(self):
+        return self.data.get('taxonomy_version')
+
+    def is_stale(self, now=None):
+        """Whether refresh() would contact the API"""
+        now = time.time() if now is None else now
+        return (now - self.data.get('taxonomy_checked_at', 0) > TAXONOMY_MAX_AGE
+                or now - self.data.get('hotspots_fetched_at', 0) > HOTSPOT_MAX_AGE)
+
+    def refresh(self, client, force=False):
+        """
+        Bring stale parts of the cache up to date and save it
+
+        The taxonomy is re-downloaded only when eBird lists a newer version than the
+        cached one; hotspots and county names are re-downloaded when older than
+        HOTSPOT_MAX_AGE.
+
+        Args:
+            client: EBirdAPIClient instance
+            force: Refresh everything regardless of age and version (default: False)
+
+        Returns:
+            list: Names of the parts that were downloaded ('taxonomy', 'hotspots')
+        """
+        now = time.time()
+        updated = []
+        checked = False
+
+        # Failed downloads come back empty; keep the cached copy and try again next time
+        if force or now - self.data.get('taxonomy_checked_at', 0) > TAXONOMY_MAX_AGE:
+            latest = next((entry['authorityVer'] for entry in client.get_taxonomy_versions()
+                           if entry.get('latest')), None)
+            if latest is not None:
+                if force or not self.data.get('taxonomy') or latest != self.taxonomy_version:
+                    taxonomy = client.get_taxonomy()
+                    if taxonomy:
+                        self.data['taxonomy'] = [
+                            {field: entry[field] for field in TAXONOMY_FIELDS if field in entry}
+                            for entry in taxonomy
+                        ]
+                        self.data['taxonomy_version'] = latest
+                        updated.append('taxonomy')
+                if self.taxonomy_version == latest:
+                    self.data['taxonomy_checked_at'] = now
+                    checked = True
+
+        if force or now - self.data.get('hotspots_fetched_at', 0) > HOTSPOT_MAX_AGE:
+            hotspots = client.get_hotspots(self.region_code)
+            subregions = client.get_subregions(self.region_code)
+            if hotspots:
+                self.data['hotspots'] = [
+                    {field: entry[field] for field in HOTSPOT_FIELDS if field in entry} for entry in hotspots
+                ]
+                self.data['counties'] = {entry['code']: entry['name'] for entry in subregions}
+                self.data['region_code'] = self.region_code
+                self.data['hotspots_fetched_at'] = now
+                updated.append('hotspots')
+
+        if updated or checked:
+            self.save()
+            self._build_indexes()
+        return updated
+
+    def save(self):
+        """Write the cache atomically"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def species_code(self, name):
+        """
+        eBird species code for a common name, scientific name, banding code or code
+
+        Args:
+            name: e.g. 'Black-capped Chickadee', 'poecile atricapillus', 'BCCH' or 'bkcchi'
+
+        Returns:
+            str: Species code, or None if unknown
+        """
+        if name in self._species:
+            return name
+        return self._codes_by_name.get(normalize_name(name))
+
+    def species(self, species_code):
+        """Taxonomy entry (speciesCode, comName, sciName, category, taxonOrder, ...) or None"""
+        return self._species.get(species_code)
+
+    def taxon_order(self, species_code):
+        """Position in the eBird taxonomy (infinity for unknown codes, so they sort last)"""
+        return self._taxon_order.get(species_code, math.inf)
+
+    def sort_taxonomic(self, observations):
+        """
+        Sort observations into field-guide (taxonomic) order
+
+        Args:
+            observations: Observation objects or raw API dictionaries
+
+        Returns:
+            list: Observations sorted by taxonomic order, then by common name
+        """
+        return sorted(observations, key=lambda obs: (self.taxon_order(obs.get('speciesCode')),
+                                                     obs.get('comName') or ''))
+
+    def hotspot(self, loc_id):
+        """Hotspot entry (locId, locName, county, lat, lng, ...) or None"""
+        return self._hotspots.get(loc_id)
+
+    def county_for(self, obs):
+        """
+        County of an observation from its hotspot, falling back to eBird's subnational2Name
+
+        Args:
+            obs: Observation object or raw API dictionary
+
+        Returns:
+            str: County name, or None
+        """
+        hotspot = self._hotspots.get(obs.get('locId'))
+        if hotspot and hotspot['county']:
+            return hotspot['county']
+        return obs.get('subnational2Name')
+
+    def __len__(self):
+        return len(self._species)
+
+
+def load_reference(client=None, path=REFERENCE_FILE, region_code=DEFAULT_REGION):
+    """
+    Load the reference cache, refreshing stale parts first when a client is given
+
+    Args:
+        client: Optional EBirdAPIClient used to refresh the cache
+        path: JSON file holding the cache (default: ebird_reference.json)
+        region_code: Region whose hotspots are cached (default: US-NY)
+
+    Returns:
+        ReferenceData
+    """
+    reference = ReferenceData(path, region_code)
+    if client is not None and reference.is_stale():
+        reference.refresh(client)
+    return reference
+
+
+def main():
+    """Refresh the reference cache (run from cron)"""
+    api_key = os.getenv('EBIRD_API_KEY')
+    try:
+        with open('config.json', 'r') as f:
+            api_key = json.load(f).get('ebird_api_key') or api_key
+    except (OSError, ValueError):
+        pass
+    if not api_key:
+        print("No API key found (config.json ebird_api_key or EBIRD_API_KEY)")
+        return 1
+
+    force = '--force' in sys.argv[1:]
+    with EBirdAPIClient(api_key) as client:
+        reference = ReferenceData()
+        updated = reference.refresh(client, force=force)
+
+    print(f"Taxonomy {reference.taxonomy_version}: {len(reference)} species; "
+          f"{len(reference.data.get('hotspots', []))} hotspots in {reference.region_code}")
+    print(f"Updated: {', '.join(updated) if updated else 'nothing (cache is current)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,20 +4,175 @@ eBird Alert Scraper
 Scrapes bird alert data from eBird and saves to CSV
 """
 
+import argparse
 import time
 import csv
+import json
+import threading
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from urllib.parse import urljoin
 import os
 
+import requests
+
+from alert_page_parser import extract_rows, parse_login_form
+
+# Selenium is only needed in browser mode; browser=False works without it
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.chrome.options import Options
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+except ImportError:
+    webdriver = None
+
+
+# Cookies of the last successful login, reused by later runs instead of signing in again
+SESSION_FILE = 'ebird_session.json'
+
+# Common eBird alert structures to try (these selectors may need adjustment)
+ALERT_SELECTORS = [
+    "//div[contains(@class, 'Alert')]",
+    "//tr[contains(@class, 'alert')]",
+    "//div[contains(@class, 'sighting')]",
+    "//div[contains(@class, 'observation')]"
+]
+
+# Alert field -> XPath relative to an alert row
+ALERT_FIELDS = {
+    'species': ".//span[contains(@class, 'species')] | .//a[contains(@class, 'species')]",
+    'date': ".//span[contains(@class, 'date')] | .//time",
+    'location': ".//span[contains(@class, 'location')] | .//a[contains(@class, 'location')]",
+    'observer': ".//span[contains(@class, 'observer')] | .//a[contains(@class, 'observer')]",
+}
+
+# Runs in the page: finds the rows of the first matching selector and reads every
+# field of every row, so a whole page costs one WebDriver round trip
+EXTRACT_ALERTS_SCRIPT = """
+const [selectors, fields] = arguments;
+const text = node => (node.innerText || node.textContent || '').trim();
+for (const selector of selectors) {
+    let found;
+    try {
+        found = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (error) {
+        continue;
+    }
+    if (!found.snapshotLength) continue;
+
+    const rows = [];
+    for (let i = 0; i < found.snapshotLength; i++) {
+        const element = found.snapshotItem(i);
+        const row = {fields: {}, raw_text: text(element)};
+        for (const [name, xpath] of Object.entries(fields)) {
+            const node = document.evaluate(xpath, element, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            row.fields[name] = node ? text(node) : '';
+        }
+        rows.push(row);
+    }
+    return {selector: selector, rows: rows};
+}
+return null;
+"""
+
+# Sent by browserless mode, which otherwise looks like a script to the login server
+HTTP_USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+# How long a fully loaded page may stay without alert rows before it is treated as empty
+ALERT_SETTLE_SECONDS = 1
+
+
+def chrome_options(headless=True):
+    """Chrome options shared by the scraper and the driver pool"""
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    return options
+
+
+class DriverPool:
+    """
+    Warm Chrome instances reused across scrapes in one process
+
+    Starting Chrome takes seconds, and a released driver keeps its cookies, so a
+    scraper that acquires it is usually still signed in.
+    """
+
+    def __init__(self, size=2, headless=True):
+        """
+        Initialize the pool (drivers start lazily)
+
+        Args:
+            size: Maximum number of idle drivers kept warm (default: 2)
+            headless: Run browsers in headless mode (default: True)
+        """
+        self.size = size
+        self.headless = headless
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return an idle live driver, or start a new one"""
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                return webdriver.Chrome(options=chrome_options(self.headless))
+            if self._alive(driver):
+                return driver
+            self._quit(driver)
+
+    def release(self, driver):
+        """Return a driver to the pool (quit if the pool is full)"""
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(driver)
+                return
+        self._quit(driver)
+
+    def close(self):
+        """Quit every idle driver"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
+    @staticmethod
+    def _alive(driver):
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def __len__(self):
+        return len(self._idle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
 
 class EBirdScraper:
-    def __init__(self, username, password, headless=True):
+    def __init__(self, username, password, headless=True, session_file=SESSION_FILE, pool=None, timeout=10,
+                 browser=True):
         """
         Initialize the eBird scraper
 
@@ -25,32 +180,57 @@ class EBirdScraper:
             username: eBird account username/email
             password: eBird account password
             headless: Run browser in headless mode (default: True)
+            session_file: File the login cookies are saved to and restored from,
+                          None to always sign in (default: ebird_session.json)
+            pool: Optional DriverPool to take a warm browser from (headless is then the pool's)
+            timeout: Seconds to wait for pages and elements (default: 10)
+            browser: Drive Chrome (default: True); False signs in and fetches the alert
+                     page over plain HTTP and parses the HTML, with no browser process
         """
         self.username = username
         self.password = password
         self.alert_url = "https://ebird.org/alert/summary?sid=SN35466"
+        self.session_file = session_file
+        self.pool = pool
+        self.timeout = timeout
+        self.driver = None
+        self.http = None
+        self._alert_html = None
+
+        if not browser:
+            self.http = requests.Session()
+            self.http.headers['User-Agent'] = HTTP_USER_AGENT
+            return
 
-        # Setup Chrome options
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
+        if webdriver is None:
+            raise ImportError("Browser mode needs Selenium (pip install selenium), or use browser=False")
+        if pool is not None:
+            self.driver = pool.acquire()
+        else:
+            self.driver = webdriver.Chrome(options=chrome_options(headless))
+        self.wait = WebDriverWait(self.driver, timeout)
 
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
+    def _on_login_page(self):
+        return "login" in self.driver.current_url.lower()
 
     def login(self):
-        """Login to eBird"""
+        """Login to eBird, reusing the browser's or the saved session when it is still valid"""
         print("Logging in to eBird...")
 
+        if self.http is not None:
+            self._login_http()
+            return
+
         try:
-            # Navigate to the alert page (will redirect to login)
+            # Navigate to the alert page (will redirect to login unless already signed in)
             self.driver.get(self.alert_url)
-            time.sleep(2)
+            if not self._on_login_page():
+                print("Already logged in")
+                return
+
+            if self._restore_session():
+                print("Login successful! (saved session)")
+                return
 
             # Wait for login form
             username_field = self.wait.until(
@@ -66,13 +246,13 @@ class EBirdScraper:
             login_button = self.driver.find_element(By.ID, "form_submit")
             login_button.click()
 
-            # Wait for redirect back to alert page
-            time.sleep(3)
-
-            # Check if login was successful
-            if "login" in self.driver.current_url.lower():
+            # Wait for redirect back to alert page; still on the login page means it failed
+            try:
+                self.wait.until(lambda driver: not self._on_login_page())
+            except TimeoutException:
                 raise Exception("Login failed. Please check your credentials.")
 
+            self.save_session()
             print("Login successful!")
 
         except TimeoutException:
@@ -80,41 +260,173 @@ class EBirdScraper:
         except NoSuchElementException as e:
             raise Exception(f"Could not find login elements: {e}")
 
-    def scrape_alerts(self):
+    def _login_http(self):
+        """Browserless login: submit the login form with requests, following the redirects"""
+        restored = self._load_http_cookies()
+
+        response = self.http.get(self.alert_url, timeout=self.timeout)
+        response.raise_for_status()
+        if "login" not in response.url.lower():
+            print("Login successful! (saved session)" if restored else "Already logged in")
+            self._alert_html = response.text
+            return
+
+        form = parse_login_form(response.text)
+        if form is None:
+            raise Exception("Login page did not load properly")
+
+        data = dict(form['fields'])
+        data[form['username']] = self.username
+        data[form['password']] = self.password
+
+        # A successful login redirects back to the alert page
+        response = self.http.post(urljoin(response.url, form['action']), data=data, timeout=self.timeout)
+        response.raise_for_status()
+        if "login" in response.url.lower():
+            raise Exception("Login failed. Please check your credentials.")
+
+        self._alert_html = response.text
+        self.save_session()
+        print("Login successful!")
+
+    def _load_http_cookies(self):
+        """
+        Load saved cookies (the browser's format) into the HTTP session
+
+        Returns:
+            bool: True if any cookies were loaded
+        """
+        if not self.session_file or not os.path.exists(self.session_file):
+            return False
+        try:
+            with open(self.session_file, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        for cookie in cookies:
+            self.http.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', ''), path=cookie.get('path', '/'),
+                secure=cookie.get('secure', False), expires=cookie.get('expiry'),
+                rest={'HttpOnly': None} if cookie.get('httpOnly') else {}
+            )
+        return bool(cookies)
+
+    def _http_cookies(self):
+        """The HTTP session's cookies in the browser's get_cookies() format"""
+        cookies = []
+        for cookie in self.http.cookies:
+            entry = {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'httpOnly': cookie.has_nonstandard_attr('HttpOnly'),
+            }
+            if cookie.expires:
+                entry['expiry'] = cookie.expires
+            cookies.append(entry)
+        return cookies
+
+    def save_session(self):
+        """Save the session's cookies so later runs (in either mode) can skip the login form"""
+        if not self.session_file:
+            return
+
+        cookies = self.driver.get_cookies() if self.driver is not None else self._http_cookies()
+
+        # The cookies authenticate as the user: keep the file private
+        tmp_path = f"{self.session_file}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cookies, f)
+        os.replace(tmp_path, self.session_file)
+
+    def _restore_session(self):
+        """
+        Load saved cookies and reopen the alert page
+
+        Returns:
+            bool: True if the saved session is still signed in
+        """
+        if not self.session_file or not os.path.exists(self.session_file):
+            return False
+        try:
+            with open(self.session_file, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        # WebDriver only accepts cookies for the domain of the current page
+        by_domain = {}
+        for cookie in cookies:
+            domain = cookie.get('domain', '').lstrip('.')
+            if domain:
+                by_domain.setdefault(domain, []).append(cookie)
+
+        for domain, domain_cookies in by_domain.items():
+            self.driver.get(f"https://{domain}/robots.txt")
+            for cookie in domain_cookies:
+                if 'expiry' in cookie:
+                    cookie['expiry'] = int(cookie['expiry'])
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException:
+                    pass
+
+        self.driver.get(self.alert_url)
+        return not self._on_login_page()
+
+    def _wait_for_alerts(self):
+        """
+        Wait until alert rows are present, or the page has been fully loaded for
+        ALERT_SETTLE_SECONDS without any (bounded by the scraper's timeout)
+        """
+        xpath = " | ".join(ALERT_SELECTORS)
+        loaded_at = []
+
+        def ready(driver):
+            if driver.find_elements(By.XPATH, xpath):
+                return True
+            if driver.execute_script("return document.readyState") != 'complete':
+                return False
+            if not loaded_at:
+                loaded_at.append(time.monotonic())
+            return time.monotonic() - loaded_at[0] >= ALERT_SETTLE_SECONDS
+
+        try:
+            self.wait.until(ready)
+        except TimeoutException:
+            pass
+
+    def scrape_alerts(self, batch=True):
         """
         Scrape bird alert data from the page
 
+        Args:
+            batch: Read all rows and fields with one injected script (default: True);
+                   False queries each field of each row through WebDriver
+
         Returns:
             list: List of dictionaries containing alert data
         """
         print("Scraping alert data...")
 
+        if self.http is not None:
+            return self._scrape_alerts_http()
+
         try:
             # Wait for alert content to load
-            time.sleep(3)
+            self._wait_for_alerts()
 
-            alerts = []
-
-            # Try to find alert rows/cards (these selectors may need adjustment)
-            # Common eBird alert structures to try
-            selectors_to_try = [
-                "//div[contains(@class, 'Alert')]",
-                "//tr[contains(@class, 'alert')]",
-                "//div[contains(@class, 'sighting')]",
-                "//div[contains(@class, 'observation')]"
-            ]
+            if batch:
+                alerts = self._extract_alerts_batch()
+            else:
+                alerts = self._extract_alerts_per_element()
 
-            alert_elements = []
-            for selector in selectors_to_try:
-                try:
-                    alert_elements = self.driver.find_elements(By.XPATH, selector)
-                    if alert_elements:
-                        print(f"Found {len(alert_elements)} alerts using selector: {selector}")
-                        break
-                except:
-                    continue
-
-            if not alert_elements:
+            if alerts is None:
                 # Fallback: try to extract from page source
                 print("Using fallback extraction method...")
                 page_source = self.driver.page_source
@@ -126,12 +438,6 @@ class EBirdScraper:
 
                 return self._extract_from_page_source(page_source)
 
-            # Extract data from each alert element
-            for element in alert_elements:
-                alert_data = self._extract_alert_data(element)
-                if alert_data:
-                    alerts.append(alert_data)
-
             print(f"Successfully scraped {len(alerts)} alerts")
             return alerts
 
@@ -142,6 +448,62 @@ class EBirdScraper:
             print("Screenshot saved to ebird_error_screenshot.png")
             raise
 
+    def _scrape_alerts_http(self):
+        """Browserless scrape: fetch the alert page (unless login just did) and parse it"""
+        page_source, self._alert_html = self._alert_html, None
+        if page_source is None:
+            response = self.http.get(self.alert_url, timeout=self.timeout)
+            response.raise_for_status()
+            if "login" in response.url.lower():
+                raise Exception("Not logged in; call login() first")
+            page_source = response.text
+
+        alerts = _alerts_from_rows(extract_rows(page_source, ALERT_SELECTORS, ALERT_FIELDS))
+        if alerts is None:
+            with open('ebird_page_debug.html', 'w', encoding='utf-8') as f:
+                f.write(page_source)
+            print("No alerts found; page source saved to ebird_page_debug.html for inspection")
+            return []
+
+        print(f"Successfully scraped {len(alerts)} alerts")
+        return alerts
+
+    def _extract_alerts_batch(self):
+        """
+        Extract every alert on the page in a single execute_script call
+
+        Returns:
+            list: Alert dictionaries, or None if no selector matched
+        """
+        return _alerts_from_rows(self.driver.execute_script(EXTRACT_ALERTS_SCRIPT, ALERT_SELECTORS, ALERT_FIELDS))
+
+    def _extract_alerts_per_element(self):
+        """
+        Extract alerts with one WebDriver call per selector, row and field (slow; for debugging)
+
+        Returns:
+            list: Alert dictionaries, or None if no selector matched
+        """
+        alert_elements = []
+        for selector in ALERT_SELECTORS:
+            try:
+                alert_elements = self.driver.find_elements(By.XPATH, selector)
+                if alert_elements:
+                    print(f"Found {len(alert_elements)} alerts using selector: {selector}")
+                    break
+            except WebDriverException:
+                continue
+
+        if not alert_elements:
+            return None
+
+        alerts = []
+        for element in alert_elements:
+            alert_data = self._extract_alert_data(element)
+            if alert_data:
+                alerts.append(alert_data)
+        return alerts
+
     def _extract_alert_data(self, element):
         """
         Extract data from a single alert element
@@ -153,51 +515,14 @@ class EBirdScraper:
             dict: Alert data or None if extraction fails
         """
         try:
-            alert = {
-                'species': '',
-                'common_name': '',
-                'date': '',
-                'time': '',
-                'location': '',
-                'observer': '',
-                'count': '',
-                'latitude': '',
-                'longitude': ''
-            }
-
-            # Try to extract species name
-            try:
-                species_elem = element.find_element(By.XPATH, ".//span[contains(@class, 'species')] | .//a[contains(@class, 'species')]")
-                alert['species'] = species_elem.text.strip()
-            except:
-                pass
-
-            # Try to extract date/time
-            try:
-                date_elem = element.find_element(By.XPATH, ".//span[contains(@class, 'date')] | .//time")
-                alert['date'] = date_elem.text.strip()
-            except:
-                pass
-
-            # Try to extract location
-            try:
-                location_elem = element.find_element(By.XPATH, ".//span[contains(@class, 'location')] | .//a[contains(@class, 'location')]")
-                alert['location'] = location_elem.text.strip()
-            except:
-                pass
-
-            # Try to extract observer
-            try:
-                observer_elem = element.find_element(By.XPATH, ".//span[contains(@class, 'observer')] | .//a[contains(@class, 'observer')]")
-                alert['observer'] = observer_elem.text.strip()
-            except:
-                pass
-
-            # Get full text as fallback
-            if not any(alert.values()):
-                alert['raw_text'] = element.text.strip()
+            fields = {}
+            for name, xpath in ALERT_FIELDS.items():
+                try:
+                    fields[name] = element.find_element(By.XPATH, xpath).text.strip()
+                except NoSuchElementException:
+                    fields[name] = ''
 
-            return alert if any(alert.values()) else None
+            return _build_alert(fields, element.text.strip())
 
         except Exception as e:
             print(f"Error extracting alert data: {e}")
@@ -205,15 +530,19 @@ class EBirdScraper:
 
     def _extract_from_page_source(self, page_source):
         """
-        Fallback method to extract data from page source
-        This is a placeholder - you'll need to inspect the HTML structure
-        and implement proper parsing logic
+        Fallback method to extract data from page source (e.g. a saved ebird_page_debug.html)
+
+        Returns:
+            list: Alert dictionaries (empty if no selector matched)
         """
-        print("Please inspect ebird_page_debug.html to identify the correct selectors")
-        print("Update the script with the correct CSS selectors or XPath expressions")
-        return []
+        alerts = extract_alerts_from_html(page_source)
+        if not alerts:
+            print("Please inspect ebird_page_debug.html to identify the correct selectors")
+            print("Update ALERT_SELECTORS / ALERT_FIELDS with the correct XPath expressions")
+        return alerts
 
-    def save_to_csv(self, alerts, filename=None):
+    @staticmethod
+    def save_to_csv(alerts, filename=None):
         """
         Save alerts to CSV file
 
@@ -243,9 +572,15 @@ class EBirdScraper:
         print(f"Data saved to {filename}")
 
     def close(self):
-        """Close the browser"""
+        """Close the browser, or hand it back to the pool still signed in"""
+        if self.http is not None:
+            self.http.close()
         if self.driver:
-            self.driver.quit()
+            if self.pool is not None:
+                self.pool.release(self.driver)
+            else:
+                self.driver.quit()
+            self.driver = None
 
     def __enter__(self):
         return self
@@ -254,15 +589,88 @@ class EBirdScraper:
         self.close()
 
 
+def _build_alert(fields, raw_text):
+    """
+    Alert dictionary from extracted field texts
+
+    Args:
+        fields: ALERT_FIELDS name -> text ('' when not found)
+        raw_text: Full text of the alert row, kept when no field was found
+
+    Returns:
+        dict: Alert data or None if the row had no text at all
+    """
+    alert = {
+        'species': '',
+        'common_name': '',
+        'date': '',
+        'time': '',
+        'location': '',
+        'observer': '',
+        'count': '',
+        'latitude': '',
+        'longitude': ''
+    }
+    alert.update(fields)
+
+    # Get full text as fallback
+    if not any(alert.values()):
+        alert['raw_text'] = raw_text
+
+    return alert if any(alert.values()) else None
+
+
+def _alerts_from_rows(result):
+    """Alert dictionaries from extracted rows ({'selector', 'rows'}), or None if nothing matched"""
+    if not result or not result.get('rows'):
+        return None
+
+    print(f"Found {len(result['rows'])} alerts using selector: {result['selector']}")
+    alerts = []
+    for row in result['rows']:
+        alert = _build_alert(row['fields'], row['raw_text'])
+        if alert:
+            alerts.append(alert)
+    return alerts
+
+
+def extract_alerts_from_html(page_source):
+    """
+    Parse alerts out of alert page HTML without a browser
+
+    Args:
+        page_source: HTML of the alert summary page
+
+    Returns:
+        list: Alert dictionaries (empty if no selector matched)
+    """
+    return _alerts_from_rows(extract_rows(page_source, ALERT_SELECTORS, ALERT_FIELDS)) or []
+
+
 def main():
     """Main function to run the scraper"""
+    parser = argparse.ArgumentParser(description="Scrape the eBird alert summary to CSV")
+    parser.add_argument('--no-browser', action='store_true',
+                        help="Sign in and fetch the page over plain HTTP instead of driving Chrome")
+    parser.add_argument('--parse', metavar='HTML_FILE',
+                        help="Parse a saved page (e.g. ebird_page_debug.html) instead of scraping")
+    parser.add_argument('--output', help="CSV file to write (default: ebird_alerts_TIMESTAMP.csv)")
+    args = parser.parse_args()
+
+    if args.parse:
+        with open(args.parse, 'r', encoding='utf-8') as f:
+            alerts = extract_alerts_from_html(f.read())
+        if not alerts:
+            print(f"No alerts found in {args.parse}; update ALERT_SELECTORS / ALERT_FIELDS")
+            return 1
+        EBirdScraper.save_to_csv(alerts, args.output)
+        return 0
 
     # Try to load credentials from config.json first
     username = None
     password = None
 
     try:
-        import json
         with open('config.json', 'r') as f:
             config = json.load(f)
             username = config.get('ebird_username')
@@ -296,7 +704,7 @@ def main():
 
     try:
         # Create scraper instance
-        with EBirdScraper(username, password, headless=False) as scraper:
+        with EBirdScraper(username, password, headless=False, browser=not args.no_browser) as scraper:
             # Login
             scraper.login()
 
@@ -305,7 +713,7 @@ def main():
 
             # Save to CSV
             if alerts:
-                scraper.save_to_csv(alerts)
+                scraper.save_to_csv(alerts, args.output)
             else:
                 print("\nNo alerts found. The page structure may have changed.")
                 print("Check ebird_page_debug.html and update the selectors in the script.")
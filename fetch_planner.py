@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Fetch Planner
+Detects responses truncated at maxResults and splits them into smaller queries
+(counties, then geo tiles, then shorter windows) until every piece comes back complete
+"""
+
+import asyncio
+import math
+from collections import namedtuple
+
+from async_fetcher import AsyncEBirdFetcher, NY_COUNTY_CODES, merge_observations
+
+
+# Known subregions to split a saturated region into
+SUBREGIONS = {
+    'US-NY': NY_COUNTY_CODES,
+}
+
+# The geo endpoints accept a radius of at most 50 km
+MAX_TILE_RADIUS_KM = 50
+DEFAULT_TILE_RADIUS_KM = 25
+MIN_TILE_RADIUS_KM = 3
+
+KM_PER_DEGREE_LAT = 111.32
+
+# kind: 'region' or 'tile'
+# target: region code, or (lat, lng, half_side_km) of a square tile
+# scope: region code the results must belong to (tiles spill over region borders)
+FetchTask = namedtuple('FetchTask', ['kind', 'target', 'days_back', 'scope'])
+
+
+class FetchPlanner:
+    """
+    Complete-coverage fetcher for region queries
+
+    A response with exactly max_results rows is treated as truncated and replaced by
+    finer queries: a region by its subregions (or by geo tiles covering its boundary),
+    a tile by its four quadrants, and a tile already at the minimum size by shorter
+    back windows. Each level runs concurrently through AsyncEBirdFetcher and all
+    results are deduplicated by (subId, speciesCode). Queries that stay truncated are
+    listed in .truncated and failed requests in .failed.
+    """
+
+    def __init__(self, client, max_results=100, notable_only=True, subregions=None,
+                 tile_radius_km=DEFAULT_TILE_RADIUS_KM, min_tile_radius_km=MIN_TILE_RADIUS_KM,
+                 max_requests=500, county_index=None, **fetcher_options):
+        """
+        Initialize the planner
+
+        Args:
+            client: EBirdAPIClient instance
+            max_results: maxResults sent with every query (default: 100)
+            notable_only: Only fetch notable/rare observations (default: True)
+            subregions: Region code -> list of subregion codes (default: SUBREGIONS)
+            tile_radius_km: Radius of the first geo tiles (default: 25, at most 50)
+            min_tile_radius_km: Tiles this small split into shorter windows instead (default: 3)
+            max_requests: Stop splitting after this many requests (default: 500)
+            county_index: CountyIndex whose boundaries give the extent of regions without
+                          subregions; without one their tiles only cover the returned sample
+            **fetcher_options: Passed to AsyncEBirdFetcher (max_concurrency, requests_per_second, burst)
+        """
+        self.client = client
+        self.max_results = max_results
+        self.notable_only = notable_only
+        self.subregions = SUBREGIONS if subregions is None else subregions
+        self.tile_radius_km = min(tile_radius_km, MAX_TILE_RADIUS_KM)
+        self.min_tile_radius_km = min_tile_radius_km
+        self.max_requests = max_requests
+        self.county_index = county_index
+        self.fetcher = AsyncEBirdFetcher(client, **fetcher_options)
+
+        self.requests = 0
+        self.splits = 0
+        self.truncated = []
+        self.failed = []
+
+    def _run_task(self, task):
+        if task.kind == 'region':
+            observations = self.client.get_recent_observations(
+                task.target, task.days_back, notable_only=self.notable_only, max_results=self.max_results,
+                raise_errors=True
+            )
+        else:
+            lat, lng, half_side = task.target
+            observations = self.client.get_nearby_observations(
+                round(lat, 4), round(lng, 4),
+                distance_km=round(min(half_side * math.sqrt(2), MAX_TILE_RADIUS_KM), 2),
+                days_back=task.days_back,
+                max_results=self.max_results,
+                notable_only=self.notable_only,
+                raise_errors=True
+            )
+        return task, observations
+
+    def split(self, task, observations):
+        """
+        Finer queries covering a saturated task
+
+        Returns:
+            tuple: (FetchTasks, whether together they cover the whole task)
+        """
+        if task.kind == 'region':
+            children = self.subregions.get(task.target)
+            if children:
+                return [FetchTask('region', code, task.days_back, code) for code in children], True
+            bounds = self.county_index.bounds(task.target) if self.county_index else None
+            if bounds:
+                return self._tiles_for(bounds, task), True
+            # Only the truncated sample's extent is known; sightings outside it can be missed
+            bounds = _sample_bounds(observations, self.tile_radius_km / math.sqrt(2))
+            return (self._tiles_for(bounds, task) if bounds else []), False
+
+        lat, lng, half_side = task.target
+        if half_side * math.sqrt(2) > self.min_tile_radius_km:
+            quarter = half_side / 2
+            dlat, dlng = _km_to_degrees(quarter, lat)
+            return [
+                FetchTask('tile', (lat + sign_lat * dlat, lng + sign_lng * dlng, quarter), task.days_back, task.scope)
+                for sign_lat in (-1, 1) for sign_lng in (-1, 1)
+            ], True
+
+        # 'back' is anchored at today, so shorter windows nest inside the saturated one
+        # rather than partition it: they complete the most recent days, not the older ones
+        if task.days_back > 1:
+            return [FetchTask('tile', task.target, task.days_back // 2, task.scope)], False
+        return [], False
+
+    def _tiles_for(self, bounds, task):
+        """Grid of square tiles covering a (min_lat, min_lng, max_lat, max_lng) box"""
+        min_lat, min_lng, max_lat, max_lng = bounds
+        half_side = self.tile_radius_km / math.sqrt(2)
+        dlat, _ = _km_to_degrees(2 * half_side, min_lat)
+        rows = max(1, math.ceil((max_lat - min_lat) / dlat))
+        tiles = []
+        for row in range(rows):
+            center_lat = min_lat + (row + 0.5) * dlat
+            _, dlng = _km_to_degrees(2 * half_side, center_lat)
+            cols = max(1, math.ceil((max_lng - min_lng) / dlng))
+            for col in range(cols):
+                center_lng = min_lng + (col + 0.5) * dlng
+                tiles.append(FetchTask('tile', (center_lat, center_lng, half_side), task.days_back, task.scope))
+        return tiles
+
+    def _in_scope(self, obs, scope):
+        code = obs.get('subnational2Code') or obs.get('subnational1Code')
+        return code is None or scope is None or code.startswith(scope)
+
+    async def fetch_async(self, region_code, days_back=7):
+        """
+        Fetch every observation for a region, splitting saturated queries
+
+        Args:
+            region_code: Region code (e.g., 'US-NY' or 'US-NY-061')
+            days_back: Number of days back to search (1-30, default: 7)
+
+        Returns:
+            list: Observations sorted newest first, unique by (subId, speciesCode)
+        """
+        batches = []
+        level = [FetchTask('region', region_code, days_back, region_code)]
+
+        while level:
+            next_level = []
+            failures = len(self.fetcher.failed_regions)
+            async for task, observations in self.fetcher._iter_fetch(self._run_task, level):
+                self.requests += 1
+                saturated = len(observations) >= self.max_results
+                if task.kind == 'tile':
+                    observations = [obs for obs in observations if self._in_scope(obs, task.scope)]
+                batches.append(observations)
+
+                if not saturated:
+                    continue
+
+                children, complete = self.split(task, observations)
+                if self.requests + len(next_level) + len(children) > self.max_requests:
+                    children, complete = [], False
+                if children:
+                    self.splits += 1
+                    next_level.extend(children)
+                if not complete:
+                    self.truncated.append(task)
+            self.requests += len(self.fetcher.failed_regions) - failures
+            level = next_level
+
+        self.failed = list(self.fetcher.failed_regions)
+        if self.truncated:
+            print(f"Warning: {len(self.truncated)} queries returned {self.max_results} results and "
+                  f"could not be split into complete pieces; coverage may be incomplete")
+        if self.failed:
+            print(f"Warning: {len(self.failed)} queries failed; coverage is incomplete")
+
+        return merge_observations(batches)
+
+    def fetch(self, region_code, days_back=7):
+        """Blocking wrapper around fetch_async()"""
+        return asyncio.run(self.fetch_async(region_code, days_back))
+
+
+def _sample_bounds(observations, pad_km):
+    """Bounding box of the sightings' coordinates padded by pad_km, or None without any"""
+    points = [(obs.get('lat'), obs.get('lng')) for obs in observations]
+    points = [(lat, lng) for lat, lng in points if lat is not None and lng is not None]
+    if not points:
+        return None
+
+    pad_lat, pad_lng = _km_to_degrees(pad_km, sum(lat for lat, _ in points) / len(points))
+    return (min(lat for lat, _ in points) - pad_lat, min(lng for _, lng in points) - pad_lng,
+            max(lat for lat, _ in points) + pad_lat, max(lng for _, lng in points) + pad_lng)
+
+
+def _km_to_degrees(km, lat):
+    """Degrees of latitude and longitude spanning km at a given latitude"""
+    dlat = km / KM_PER_DEGREE_LAT
+    dlng = km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return dlat, dlng
+
+
+def fetch_complete(client, region_code, days_back=7, max_results=100, notable_only=True, **planner_options):
+    """
+    Blocking helper: fetch a region with automatic splitting of truncated responses
+
+    Args:
+        client: EBirdAPIClient instance
+        region_code: Region code (e.g., 'US-NY')
+        days_back: Number of days back to search (1-30, default: 7)
+        max_results: maxResults per query; a full response triggers a split (default: 100)
+        notable_only: Only return notable/rare observations (default: True)
+        **planner_options: Passed to FetchPlanner (subregions, county_index, tile sizes, fetcher options)
+
+    Returns:
+        list: Merged, deduplicated observations
+    """
+    planner = FetchPlanner(client, max_results=max_results, notable_only=notable_only, **planner_options)
+    observations = planner.fetch(region_code, days_back)
+    if planner.splits:
+        print(f"Split {planner.splits} truncated queries; {planner.requests} requests, "
+              f"{len(observations)} unique observations")
+    return observations
@@ -1,21 +1,43 @@
 <?php
 header('Content-Type: application/json');
 header('Access-Control-Allow-Origin: *');
+header('Cache-Control: no-cache');
+header('Vary: Accept-Encoding');
 
-// Find the most recent JSON file
-$files = glob('ny_rare_birds_*.json');
-if (empty($files)) {
-    http_response_code(404);
-    echo json_encode(['error' => 'No data files found']);
-    exit;
+// Use the pointer written by run_ny_alerts.py, falling back to a directory scan
+$latestFile = null;
+if (is_file('ny_rare_birds_latest.txt')) {
+    $latestFile = trim(file_get_contents('ny_rare_birds_latest.txt'));
+    if (!is_file($latestFile)) {
+        $latestFile = null;
+    }
 }
 
-// Sort by modification time, most recent first
-usort($files, function($a, $b) {
-    return filemtime($b) - filemtime($a);
-});
+if ($latestFile === null) {
+    // Find the most recent JSON file
+    $files = glob('ny_rare_birds_*.json');
+    if (empty($files)) {
+        http_response_code(404);
+        echo json_encode(['error' => 'No data files found']);
+        exit;
+    }
+
+    // Sort by modification time, most recent first
+    usort($files, function($a, $b) {
+        return filemtime($b) - filemtime($a);
+    });
+
+    $latestFile = $files[0];
+}
+
+// Let the browser reuse its copy when the file has not changed
+$etag = '"' . md5($latestFile . filemtime($latestFile) . filesize($latestFile)) . '"';
+header('ETag: ' . $etag);
+if (isset($_SERVER['HTTP_IF_NONE_MATCH']) && strpos($_SERVER['HTTP_IF_NONE_MATCH'], $etag) !== false) {
+    http_response_code(304);
+    exit;
+}
 
-$latestFile = $files[0];
-$data = file_get_contents($latestFile);
-echo $data;
+ob_start('ob_gzhandler');
+readfile($latestFile);
 ?>
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+History Manifest
+Index of the ny_rare_birds_*.json dumps (date range, row count and content hash per file),
+updated incrementally so only new or modified files are read
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+
+MANIFEST_FILE = 'history_manifest.json'
+HISTORY_PATTERN = 'ny_rare_birds_*.json'
+
+
+class HistoryManifest:
+    """
+    Persisted list of history files with their date ranges, row counts and hashes
+
+    Files are re-read only when their size or modification time changes, so a
+    refresh over hundreds of dumps costs one stat() per file.
+    """
+
+    def __init__(self, path=MANIFEST_FILE, pattern=HISTORY_PATTERN):
+        """
+        Load the manifest
+
+        Args:
+            path: JSON file holding the manifest (default: history_manifest.json)
+            pattern: Glob pattern of the history files (default: ny_rare_birds_*.json)
+        """
+        self.path = path
+        self.pattern = pattern
+        self.files = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.files = {entry['file']: entry for entry in manifest.get('files', [])}
+
+    def _describe(self, filename, stat):
+        """Manifest entry for one file (None if it is not a readable JSON list)"""
+        with open(filename, 'rb') as f:
+            data = f.read()
+        try:
+            observations = json.loads(data)
+        except ValueError as e:
+            print(f"Skipping {filename}: {e}")
+            return None
+        if not isinstance(observations, list):
+            return None
+
+        dates = [obs['obsDt'] for obs in observations if isinstance(obs, dict) and obs.get('obsDt')]
+        return {
+            'file': filename,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': hashlib.sha1(data).hexdigest(),
+            'rows': len(observations),
+            'first_obs_dt': min(dates) if dates else None,
+            'last_obs_dt': max(dates) if dates else None,
+        }
+
+    def refresh(self):
+        """
+        Bring the manifest up to date with the files on disk, saving it if anything changed
+
+        Returns:
+            list: Filenames that are new or whose content changed since the last refresh
+        """
+        changed = []
+        present = set()
+        for filename in sorted(glob.glob(self.pattern)):
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            present.add(filename)
+
+            entry = self.files.get(filename)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                continue
+
+            try:
+                new_entry = self._describe(filename, stat)
+            except OSError:
+                continue
+            if new_entry is None:
+                continue
+
+            # A touched but identical file keeps its entry; only the stat fields move on
+            if entry is None or entry['sha1'] != new_entry['sha1']:
+                changed.append(filename)
+            self.files[filename] = new_entry
+
+        removed = set(self.files) - present
+        for filename in removed:
+            del self.files[filename]
+
+        if changed or removed or not os.path.exists(self.path):
+            self.save()
+        return changed
+
+    def to_dict(self):
+        """The manifest as a JSON-serializable dictionary, files oldest first"""
+        entries = sorted(self.files.values(), key=lambda entry: entry['file'])
+        firsts = [entry['first_obs_dt'] for entry in entries if entry['first_obs_dt']]
+        lasts = [entry['last_obs_dt'] for entry in entries if entry['last_obs_dt']]
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'total_rows': sum(entry['rows'] for entry in entries),
+            'first_obs_dt': min(firsts) if firsts else None,
+            'last_obs_dt': max(lasts) if lasts else None,
+            'files': entries,
+        }
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.files)
+
+
+def update_history_manifest(path=MANIFEST_FILE, pattern=HISTORY_PATTERN):
+    """
+    Refresh the manifest on disk after writing a history file
+
+    Returns:
+        list: Filenames that are new or changed
+    """
+    return HistoryManifest(path, pattern).refresh()
+
+
+def main():
+    """Rebuild the manifest and print a summary"""
+    pattern = sys.argv[1] if len(sys.argv) > 1 else HISTORY_PATTERN
+
+    manifest = HistoryManifest(pattern=pattern)
+    changed = manifest.refresh()
+    summary = manifest.to_dict()
+    print(f"{len(manifest)} history files, {summary['total_rows']} rows "
+          f"({summary['first_obs_dt']} to {summary['last_obs_dt']}); {len(changed)} new or changed")
+    print(f"Manifest written to {manifest.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Metrics
+In-process counters and latency histograms for the fetch, save and serve hot paths,
+rendered in the Prometheus text format, plus an optional structured JSON event log
+
+Set EBIRD_LOG_FORMAT=json to write one JSON object per API request, save and
+served request to stderr.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Latency buckets in seconds, from cache hits up to retried slow requests
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+JSON_LOGS = os.getenv('EBIRD_LOG_FORMAT', '').lower() == 'json'
+
+# Path segments of the eBird API that are not IDs; any other segment becomes {id}
+_API_WORDS = {
+    'data', 'obs', 'recent', 'notable', 'geo', 'historic', 'ref', 'taxonomy', 'ebird',
+    'hotspot', 'region', 'list', 'info', 'adjacent', 'product', 'spplist', 'stats',
+    'top100', 'lists', 'checklist', 'view', 'nearest', 'species', 'taxa-locales',
+    'versions', 'country', 'subnational1', 'subnational2',
+}
+
+
+def _label_key(names, labels):
+    """Label values as strings, so e.g. status=200 and status='error' sort together"""
+    return tuple(str(labels.get(name, '')) for name in names)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def total(self):
+        return sum(self._values.values())
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+    def snapshot(self):
+        with self._lock:
+            return [dict(zip(self.labelnames, key), value=value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                dict(zip(self.labelnames, key), count=count, sum=round(total, 6),
+                     mean=round(total / count, 6) if count else None)
+                for key, (_, total, count) in sorted(self._values.items())
+            ]
+
+
+class Gauge:
+    """Value computed when metrics are rendered"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, function):
+        self.name = name
+        self.help = help_text
+        self.labelnames = ()
+        self.function = function
+
+    def render(self):
+        value = self.function()
+        return [] if value is None else [f"{self.name} {_format_value(value)}"]
+
+    def snapshot(self):
+        return self.function()
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """All metrics as a JSON-serializable dictionary"""
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+
+REGISTRY = Registry()
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# eBird API client
+API_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'ebird_api_request_seconds', 'eBird API request latency including retries', ['endpoint']))
+API_REQUESTS = REGISTRY.register(Counter(
+    'ebird_api_requests_total', 'eBird API requests by final status (cache for fresh cache hits)',
+    ['endpoint', 'status']))
+API_RESPONSE_BYTES = REGISTRY.register(Counter(
+    'ebird_api_response_bytes_total', 'Bytes received from the eBird API', ['endpoint']))
+API_RETRIES = REGISTRY.register(Counter(
+    'ebird_api_retries_total', 'Retried eBird API attempts by status (error for connection failures)',
+    ['endpoint', 'status']))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'ebird_cache_lookups_total', 'Response cache lookups by result (hit, revalidated, miss)', ['result']))
+
+
+def _cache_hit_ratio():
+    lookups = CACHE_LOOKUPS.total()
+    if not lookups:
+        return None
+    return (CACHE_LOOKUPS.value(result='hit') + CACHE_LOOKUPS.value(result='revalidated')) / lookups
+
+
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    'ebird_cache_hit_ratio', 'Share of cache lookups answered without downloading a body', _cache_hit_ratio))
+
+# Output sinks
+ROWS_WRITTEN = REGISTRY.register(Counter(
+    'observations_written_total', 'Observations written by sink', ['sink']))
+WRITE_SECONDS = REGISTRY.register(Counter(
+    'observation_write_seconds_total', 'Time spent writing observations by sink', ['sink']))
+
+# Web server
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'http_server_request_seconds', 'Web server request latency by route', ['route', 'status']))
+HTTP_RESPONSE_BYTES = REGISTRY.register(Counter(
+    'http_server_response_bytes_total', 'Web server response body bytes by route', ['route']))
+
+
+def endpoint_label(url):
+    """
+    Low-cardinality label for an eBird API URL
+
+    '.../v2/data/obs/US-NY-061/recent/notable' -> '/data/obs/{id}/recent/notable'
+    """
+    path = url.split('://', 1)[-1].split('?', 1)[0]
+    segments = path.split('/')[1:]
+    if segments and segments[0] == 'v2':
+        segments = segments[1:]
+    return '/' + '/'.join(segment if segment in _API_WORDS else '{id}' for segment in segments)
+
+
+def log_event(event, **fields):
+    """Write one JSON log line to stderr when EBIRD_LOG_FORMAT=json"""
+    if not JSON_LOGS:
+        return
+    record = {'ts': round(time.time(), 3), 'event': event}
+    record.update(fields)
+    sys.stderr.write(json.dumps(record, default=str) + '\n')
+
+
+def record_write(sink, rows, seconds):
+    """Count observations written to a sink and log the throughput"""
+    ROWS_WRITTEN.inc(rows, sink=sink)
+    WRITE_SECONDS.inc(seconds, sink=sink)
+    log_event('write', sink=sink, rows=rows, seconds=round(seconds, 6),
+              rows_per_sec=round(rows / seconds, 1) if seconds > 0 else None)
+
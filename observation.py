@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Observation Record
+Compact, slotted representation of one eBird observation, parsed once at fetch time
+"""
+
+from datetime import datetime
+from sys import intern
+
+
+# (API key, attribute name) for the plain fields copied as-is
+_PLAIN_FIELDS = (
+    ('speciesCode', 'species_code'),
+    ('comName', 'com_name'),
+    ('sciName', 'sci_name'),
+    ('locId', 'loc_id'),
+    ('locName', 'loc_name'),
+    ('subId', 'sub_id'),
+    ('userDisplayName', 'user_display_name'),
+    ('obsValid', 'obs_valid'),
+    ('obsReviewed', 'obs_reviewed'),
+    ('locationPrivate', 'location_private'),
+    ('hasComments', 'has_comments'),
+    ('hasRichMedia', 'has_rich_media'),
+    # Sent with every notable / detail=full row
+    ('subnational1Code', 'subnational1_code'),
+    ('subnational1Name', 'subnational1_name'),
+    ('subnational2Code', 'subnational2_code'),
+    ('subnational2Name', 'subnational2_name'),
+    ('countryCode', 'country_code'),
+    ('countryName', 'country_name'),
+    ('obsId', 'obs_id'),
+    ('checklistId', 'checklist_id'),
+    ('presenceNoted', 'presence_noted'),
+    ('firstName', 'first_name'),
+    ('lastName', 'last_name'),
+    ('evidence', 'evidence'),
+    ('exoticCategory', 'exotic_category'),
+)
+_API_TO_ATTR = dict(_PLAIN_FIELDS)
+_API_TO_ATTR.update({'obsDt': 'obs_dt', 'howMany': 'how_many', 'lat': 'lat', 'lng': 'lng'})
+
+# Fields drawn from a small set of values (species, places, regions, observers);
+# interned so a large pull holds one copy of each string instead of one per row
+_SHARED_FIELDS = frozenset((
+    'speciesCode', 'comName', 'sciName', 'locId', 'locName', 'userDisplayName',
+    'subnational1Code', 'subnational1Name', 'subnational2Code', 'subnational2Name',
+    'countryCode', 'countryName', 'firstName', 'lastName', 'evidence', 'exoticCategory',
+))
+
+
+class Observation:
+    """
+    One eBird observation with typed fields
+
+    obs_dt is a datetime, lat/lng are floats and how_many is an int (None when eBird
+    reports 'X'; the raw text is then kept in .extra). The notable feed's region,
+    checklist and observer fields have their own slots; any other API keys are kept
+    in .extra so to_dict() round-trips.
+    For compatibility with code written against raw API dicts, get(), [] and 'in'
+    accept the original camelCase keys.
+    """
+
+    __slots__ = (
+        'species_code', 'com_name', 'sci_name', 'loc_id', 'loc_name', 'sub_id',
+        'user_display_name', 'obs_valid', 'obs_reviewed', 'location_private',
+        'has_comments', 'has_rich_media', 'subnational1_code', 'subnational1_name',
+        'subnational2_code', 'subnational2_name', 'country_code', 'country_name', 'obs_id',
+        'checklist_id', 'presence_noted', 'first_name', 'last_name', 'evidence', 'exotic_category',
+        'obs_dt', 'obs_dt_has_time', 'how_many', 'lat', 'lng', 'extra',
+    )
+
+    @classmethod
+    def from_api(cls, data):
+        """
+        Build an Observation from a raw API dictionary
+
+        Args:
+            data: Observation dictionary as returned by the eBird API
+
+        Returns:
+            Observation
+        """
+        obs = cls.__new__(cls)
+        for key, attr in _PLAIN_FIELDS:
+            value = data.get(key)
+            if key in _SHARED_FIELDS and type(value) is str:
+                value = intern(value)
+            setattr(obs, attr, value)
+
+        obs.obs_dt, obs.obs_dt_has_time = _parse_obs_dt(data.get('obsDt'))
+        obs.how_many = _to_number(data.get('howMany'), int)
+        obs.lat = _to_number(data.get('lat'), float)
+        obs.lng = _to_number(data.get('lng'), float)
+
+        extra = {key: value for key, value in data.items() if key not in _API_TO_ATTR}
+        # Keep values that are not numbers (howMany 'X' means present, uncounted)
+        for key, value in (('howMany', obs.how_many), ('lat', obs.lat), ('lng', obs.lng)):
+            if value is None and data.get(key) is not None:
+                extra[key] = data[key]
+        obs.extra = extra or None
+        return obs
+
+    @property
+    def key(self):
+        """(subId, speciesCode) identity of the sighting"""
+        return (self.sub_id, self.species_code)
+
+    @property
+    def obs_dt_text(self):
+        """obsDt in eBird's 'YYYY-MM-DD HH:MM' / 'YYYY-MM-DD' text form"""
+        if self.obs_dt is None:
+            return None
+        return self.obs_dt.strftime('%Y-%m-%d %H:%M' if self.obs_dt_has_time else '%Y-%m-%d')
+
+    def to_dict(self):
+        """Convert back to the raw API dictionary form (for JSON output and storage)"""
+        data = {}
+        for key, attr in _PLAIN_FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                data[key] = value
+        for key, value in (('obsDt', self.obs_dt_text), ('howMany', self.how_many),
+                           ('lat', self.lat), ('lng', self.lng)):
+            if value is not None:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_formatted(self):
+        """Readable flat record, identical in shape to EBirdAPIClient.format_observation"""
+        return {
+            'species_code': self.species_code or '',
+            'common_name': self.com_name or '',
+            'scientific_name': self.sci_name or '',
+            'location_id': self.loc_id or '',
+            'location_name': self.loc_name or '',
+            'observation_date': self.obs_dt_text or '',
+            'how_many': self.get('howMany', ''),
+            'latitude': '' if self.lat is None else self.lat,
+            'longitude': '' if self.lng is None else self.lng,
+            'location_private': bool(self.location_private),
+            'observation_reviewed': bool(self.obs_reviewed),
+            'observation_valid': True if self.obs_valid is None else self.obs_valid,
+            'observer_id': self.user_display_name or '',
+            'subspecies_common_name': self.sub_id or '',
+            'has_media': bool(self.has_comments or self.has_rich_media)
+        }
+
+    def get(self, key, default=None):
+        """Dict-style access by API key (e.g. obs.get('comName'))"""
+        attr = _API_TO_ATTR.get(key)
+        if attr is None:
+            return self.extra.get(key, default) if self.extra else default
+        value = self.obs_dt_text if attr == 'obs_dt' else getattr(self, attr)
+        if value is None and self.extra:
+            return self.extra.get(key, default)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __repr__(self):
+        return f"Observation({self.com_name!r}, {self.loc_name!r}, {self.obs_dt_text!r})"
+
+
+def _parse_obs_dt(value):
+    """Parse obsDt text, returning (datetime or None, whether a time of day was given)"""
+    if not value:
+        return None, False
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M'), True
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, '%Y-%m-%d'), False
+    except ValueError:
+        return None, False
+
+
+def _to_number(value, number_type):
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_jsonable(obj):
+    """json.dumps default= hook: serialize Observation objects as their API dictionaries"""
+    if isinstance(obj, Observation):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def as_dict(obs):
+    """Return the raw API dictionary for an Observation or an already-raw dict"""
+    return obs.to_dict() if isinstance(obs, Observation) else obs
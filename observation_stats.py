@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Observation Statistics
+Computes every summary used by the CLI reports and the /api/stats endpoint in one pass over a batch
+"""
+
+from collections import Counter
+from datetime import date
+
+from observation import Observation
+
+
+def rows_from_observations(observations, county_index=None):
+    """
+    Project observations onto the columns the statistics need
+
+    Args:
+        observations: Iterable of Observation objects or raw API dictionaries
+        county_index: Optional CountyIndex for county attribution
+
+    Yields:
+        tuple: (species_code, com_name, loc_id, loc_name, county, obs_dt text)
+    """
+    for obs in observations:
+        if county_index is not None:
+            county = county_index.county_for(obs)
+        else:
+            county = obs.get('subnational2Name')
+
+        if isinstance(obs, Observation):
+            yield (obs.species_code, obs.com_name, obs.loc_id, obs.loc_name, county, obs.obs_dt_text)
+        else:
+            yield (obs.get('speciesCode'), obs.get('comName'), obs.get('locId'), obs.get('locName'),
+                   county, obs.get('obsDt'))
+
+
+def compute_stats(rows, top_n=10):
+    """
+    Aggregate observation rows in a single pass
+
+    Args:
+        rows: Iterable of (species_code, com_name, loc_id, loc_name, county, obs_dt text) tuples,
+              e.g. from rows_from_observations() or ObservationStore.stats_rows()
+        top_n: Length of the top species/hotspot lists (default: 10)
+
+    Returns:
+        dict: total, unique_species, top_species, by_county, by_day, top_hotspots and
+              per-species count, first_seen, last_seen, days_reported and streaks
+    """
+    total = 0
+    species_counts = Counter()
+    species_names = {}
+    county_counts = Counter()
+    day_counts = Counter()
+    hotspot_counts = Counter()
+    hotspot_names = {}
+    first_seen = {}
+    last_seen = {}
+    species_days = {}
+
+    for species_code, com_name, loc_id, loc_name, county, obs_dt in rows:
+        total += 1
+        species = species_code or com_name or 'unknown'
+        species_counts[species] += 1
+        if com_name:
+            species_names[species] = com_name
+
+        county_counts[county or 'Unknown'] += 1
+
+        if loc_id:
+            hotspot_counts[loc_id] += 1
+            hotspot_names[loc_id] = loc_name
+
+        if obs_dt:
+            day = obs_dt[:10]
+            day_counts[day] += 1
+            species_days.setdefault(species, set()).add(day)
+            if species not in first_seen or obs_dt < first_seen[species]:
+                first_seen[species] = obs_dt
+            if species not in last_seen or obs_dt > last_seen[species]:
+                last_seen[species] = obs_dt
+
+    latest_day = max(day_counts) if day_counts else None
+
+    species_stats = {}
+    for species, count in species_counts.items():
+        longest, current = _streaks(species_days.get(species, ()), latest_day)
+        species_stats[species] = {
+            'name': species_names.get(species, species),
+            'count': count,
+            'first_seen': first_seen.get(species),
+            'last_seen': last_seen.get(species),
+            'days_reported': len(species_days.get(species, ())),
+            'longest_streak': longest,
+            'current_streak': current,
+        }
+
+    return {
+        'total': total,
+        'unique_species': len(species_counts),
+        'top_species': [
+            {'species_code': species, 'name': species_names.get(species, species), 'count': count}
+            for species, count in species_counts.most_common(top_n)
+        ],
+        'by_county': dict(county_counts.most_common()),
+        'by_day': dict(sorted(day_counts.items())),
+        'top_hotspots': [
+            {'loc_id': loc_id, 'name': hotspot_names.get(loc_id), 'count': count}
+            for loc_id, count in hotspot_counts.most_common(top_n)
+        ],
+        'species': species_stats,
+    }
+
+
+def _streaks(days, latest_day):
+    """
+    Longest run of consecutive days, and the run ending on latest_day
+
+    Args:
+        days: Set of 'YYYY-MM-DD' strings
+        latest_day: Most recent 'YYYY-MM-DD' in the batch
+
+    Returns:
+        tuple: (longest streak, current streak) in days
+    """
+    ordinals = sorted(date.fromisoformat(day).toordinal() for day in days if _is_iso_day(day))
+    longest = run = 0
+    previous = None
+    for ordinal in ordinals:
+        run = run + 1 if previous is not None and ordinal == previous + 1 else 1
+        longest = max(longest, run)
+        previous = ordinal
+
+    current = 0
+    if ordinals and latest_day and _is_iso_day(latest_day):
+        if ordinals[-1] == date.fromisoformat(latest_day).toordinal():
+            current = run
+    return longest, current
+
+
+def _is_iso_day(value):
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def summarize_observations(observations, county_index=None, top_n=10):
+    """Convenience wrapper: compute_stats over Observation objects or raw dictionaries"""
+    return compute_stats(rows_from_observations(observations, county_index), top_n)
+
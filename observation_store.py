@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+Observation Store
+Persistent SQLite store of eBird sightings keyed by (subId, speciesCode), updated incrementally
+"""
+
+import base64
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from metrics import record_write
+from observation import as_dict
+
+
+class ObservationStore:
+    """Incremental, indexed store of raw eBird observations"""
+
+    def __init__(self, db_path='ny_rare_birds.db', county_index=None):
+        """
+        Open (or create) the observation store
+
+        Args:
+            db_path: SQLite database file (default: ny_rare_birds.db)
+            county_index: Optional CountyIndex used to assign each sighting's county at ingest
+        """
+        self.db_path = db_path
+        self.county_index = county_index
+        self._lock = threading.Lock()
+        # Other processes hold the write lock for one batch at a time; wait rather than fail
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the observations table and its indexes"""
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS observations (
+                sub_id TEXT NOT NULL,
+                species_code TEXT NOT NULL,
+                com_name TEXT,
+                sci_name TEXT,
+                loc_id TEXT,
+                loc_name TEXT,
+                obs_dt TEXT,
+                how_many INTEGER,
+                lat REAL,
+                lng REAL,
+                obs_valid INTEGER,
+                obs_reviewed INTEGER,
+                location_private INTEGER,
+                county TEXT,
+                raw TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                seq INTEGER NOT NULL,
+                fetched_at REAL,
+                PRIMARY KEY (sub_id, species_code)
+            );
+        """)
+        self._add_missing_columns({'county': 'TEXT', 'fetched_at': 'REAL'})
+        self._conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_observations_obs_dt
+                ON observations (obs_dt, sub_id, species_code);
+            CREATE INDEX IF NOT EXISTS idx_observations_loc_id ON observations (loc_id);
+            CREATE INDEX IF NOT EXISTS idx_observations_species_code ON observations (species_code);
+            CREATE INDEX IF NOT EXISTS idx_observations_com_name ON observations (com_name COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_observations_county ON observations (county COLLATE NOCASE, obs_dt);
+            CREATE INDEX IF NOT EXISTS idx_observations_lat_lng ON observations (lat, lng);
+            CREATE INDEX IF NOT EXISTS idx_observations_seq ON observations (seq);
+        """)
+        self._conn.commit()
+
+    def _add_missing_columns(self, columns):
+        """Add columns introduced after a store file was created"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(observations)")}
+        for name, column_type in columns.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE observations ADD COLUMN {name} {column_type}")
+
+    def _county_for(self, obs):
+        """County of an observation, via the county index when one is available"""
+        if self.county_index is not None:
+            return self.county_index.county_for(obs)
+        return obs.get('subnational2Name')
+
+    def _row_from_observation(self, obs):
+        """Convert an observation into column values plus its serialized form"""
+        obs = as_dict(obs)
+        raw = json.dumps(obs, sort_keys=True, separators=(',', ':'))
+        return {
+            'sub_id': obs.get('subId', ''),
+            'species_code': obs.get('speciesCode', ''),
+            'com_name': obs.get('comName'),
+            'sci_name': obs.get('sciName'),
+            'loc_id': obs.get('locId'),
+            'loc_name': obs.get('locName'),
+            'obs_dt': obs.get('obsDt') or '',
+            'how_many': obs.get('howMany'),
+            'lat': obs.get('lat'),
+            'lng': obs.get('lng'),
+            'obs_valid': obs.get('obsValid'),
+            'obs_reviewed': obs.get('obsReviewed'),
+            'location_private': obs.get('locationPrivate'),
+            'county': self._county_for(obs),
+            'raw': raw,
+            'content_hash': hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        }
+
+    def upsert(self, observations, fetched_at=None):
+        """
+        Insert new sightings and update changed ones; identical sightings are not rewritten
+
+        A stored sighting fetched more recently than this batch is left alone and counted
+        as unchanged, so replaying an old dump cannot revert newer review flags.
+
+        Args:
+            observations: Iterable of Observation objects (or raw dictionaries) from EBirdAPIClient
+            fetched_at: Unix time the batch was fetched from eBird, such as a dump's mtime
+                        (default: now)
+
+        Returns:
+            dict: Counts of 'inserted', 'updated' and 'unchanged' sightings
+        """
+        start = time.perf_counter()
+        rows = {}
+        for obs in observations:
+            row = self._row_from_observation(obs)
+            rows[(row['sub_id'], row['species_code'])] = row
+
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not rows:
+            return counts
+
+        now = time.time()
+        if fetched_at is None:
+            fetched_at = now
+        with self._lock:
+            # Take the write lock before reading MAX(seq): the daemon, run_ny_alerts and the
+            # website write to the same file, and must never hand out the same sequence number
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._existing_versions(rows.keys())
+                seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM observations").fetchone()[0]
+
+                inserts, updates = [], []
+                for key, row in rows.items():
+                    old_hash, old_fetched_at = existing.get(key, (None, None))
+                    if old_hash is None:
+                        inserts.append(dict(row, first_seen=now, updated_at=now, seq=seq, fetched_at=fetched_at))
+                    elif old_hash != row['content_hash'] and old_fetched_at <= fetched_at:
+                        updates.append(dict(row, updated_at=now, seq=seq, fetched_at=fetched_at))
+                    else:
+                        counts['unchanged'] += 1
+
+                self._conn.executemany("""
+                    INSERT INTO observations (
+                        sub_id, species_code, com_name, sci_name, loc_id, loc_name, obs_dt, how_many,
+                        lat, lng, obs_valid, obs_reviewed, location_private, county, raw, content_hash,
+                        first_seen, updated_at, seq, fetched_at
+                    ) VALUES (
+                        :sub_id, :species_code, :com_name, :sci_name, :loc_id, :loc_name, :obs_dt, :how_many,
+                        :lat, :lng, :obs_valid, :obs_reviewed, :location_private, :county, :raw, :content_hash,
+                        :first_seen, :updated_at, :seq, :fetched_at
+                    )
+                """, inserts)
+                self._conn.executemany("""
+                    UPDATE observations SET
+                        com_name = :com_name, sci_name = :sci_name, loc_id = :loc_id, loc_name = :loc_name,
+                        obs_dt = :obs_dt, how_many = :how_many, lat = :lat, lng = :lng,
+                        obs_valid = :obs_valid, obs_reviewed = :obs_reviewed,
+                        location_private = :location_private, county = :county,
+                        raw = :raw, content_hash = :content_hash,
+                        updated_at = :updated_at, seq = :seq, fetched_at = :fetched_at
+                    WHERE sub_id = :sub_id AND species_code = :species_code
+                """, updates)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+        counts['inserted'] = len(inserts)
+        counts['updated'] = len(updates)
+        record_write('store', len(rows), time.perf_counter() - start)
+        return counts
+
+    def _existing_versions(self, keys, chunk_size=400):
+        """Fetch stored (content hash, fetched_at) pairs for a batch of (sub_id, species_code) keys"""
+        keys = list(keys)
+        versions = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ','.join(['(?, ?)'] * len(chunk))
+            params = [value for key in chunk for value in key]
+            # Rows stored before fetched_at existed fall back to their last write time
+            for sub_id, species_code, content_hash, fetched_at in self._conn.execute(
+                f"SELECT sub_id, species_code, content_hash, COALESCE(fetched_at, updated_at) FROM observations "
+                f"WHERE (sub_id, species_code) IN (VALUES {placeholders})", params
+            ):
+                versions[(sub_id, species_code)] = (content_hash, fetched_at)
+        return versions
+
+    def query(self, since=None, until=None, species_code=None, loc_id=None, bbox=None, limit=None):
+        """
+        Query stored sightings, newest first
+
+        Args:
+            since: Only sightings with obsDt >= this 'YYYY-MM-DD[ HH:MM]' string
+            until: Only sightings with obsDt < this 'YYYY-MM-DD[ HH:MM]' string
+            species_code: Only this eBird species code
+            loc_id: Only this location/hotspot ID
+            bbox: Only sightings inside (min_lng, min_lat, max_lng, max_lat)
+            limit: Maximum number of sightings to return
+
+        Returns:
+            list: Raw observation dictionaries
+        """
+        clauses, params = [], []
+        if since:
+            clauses.append("obs_dt >= ?")
+            params.append(since)
+        if until:
+            clauses.append("obs_dt < ?")
+            params.append(until)
+        if species_code:
+            clauses.append("species_code = ?")
+            params.append(species_code)
+        if loc_id:
+            clauses.append("loc_id = ?")
+            params.append(loc_id)
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = bbox
+            clauses.append("lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?")
+            params.extend([min_lat, max_lat, min_lng, max_lng])
+
+        sql = "SELECT raw FROM observations"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY obs_dt DESC, sub_id, species_code"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            return [json.loads(raw) for (raw,) in self._conn.execute(sql, params)]
+
+    def page(self, species=None, county=None, since=None, until=None, bbox=None, limit=100, cursor=None):
+        """
+        Fetch one page of sightings, newest first, using keyset pagination
+
+        Rows are returned as their stored JSON text so a server can pass them
+        through without decoding and re-encoding every observation.
+
+        Args:
+            species: eBird species code or common name (case-insensitive)
+            county: County name, or a list of names (case-insensitive)
+            since: Only sightings with obsDt >= this 'YYYY-MM-DD[ HH:MM]' string
+            until: Only sightings with obsDt < this 'YYYY-MM-DD[ HH:MM]' string
+            bbox: Only sightings inside (min_lng, min_lat, max_lng, max_lat)
+            limit: Page size (default: 100)
+            cursor: Opaque cursor returned with the previous page
+
+        Returns:
+            tuple: (list of JSON observation strings, next cursor or None)
+        """
+        clauses, params = [], []
+        if species:
+            clauses.append("(species_code = ? OR com_name = ? COLLATE NOCASE)")
+            params.extend([species, species])
+        if county:
+            counties = [county] if isinstance(county, str) else list(county)
+            clauses.append(f"county COLLATE NOCASE IN ({','.join('?' * len(counties))})")
+            params.extend(counties)
+        if since:
+            clauses.append("obs_dt >= ?")
+            params.append(since)
+        if until:
+            clauses.append("obs_dt < ?")
+            params.append(until)
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = bbox
+            clauses.append("lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?")
+            params.extend([min_lat, max_lat, min_lng, max_lng])
+        if cursor:
+            clauses.append("(obs_dt, sub_id, species_code) < (?, ?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        sql = "SELECT obs_dt, sub_id, species_code, raw FROM observations"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY obs_dt DESC, sub_id DESC, species_code DESC LIMIT ?"
+        params.append(int(limit) + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][:3])
+
+        return [row[3] for row in rows], next_cursor
+
+    def stats_rows(self, since=None, until=None, county=None):
+        """
+        Read the columns used by observation_stats.compute_stats straight from the table
+
+        Args:
+            since: Only sightings with obsDt >= this 'YYYY-MM-DD[ HH:MM]' string
+            until: Only sightings with obsDt < this 'YYYY-MM-DD[ HH:MM]' string
+            county: County name, or a list of names (case-insensitive)
+
+        Returns:
+            list: (species_code, com_name, loc_id, loc_name, county, obs_dt) tuples
+        """
+        clauses, params = [], []
+        if since:
+            clauses.append("obs_dt >= ?")
+            params.append(since)
+        if until:
+            clauses.append("obs_dt < ?")
+            params.append(until)
+        if county:
+            counties = [county] if isinstance(county, str) else list(county)
+            clauses.append(f"county COLLATE NOCASE IN ({','.join('?' * len(counties))})")
+            params.extend(counties)
+
+        sql = "SELECT species_code, com_name, loc_id, loc_name, county, obs_dt FROM observations"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def grid_clusters(self, cell_size, species=None, county=None, since=None, until=None):
+        """
+        Aggregate sightings into a lat/lng grid, e.g. for drawing map clusters
+
+        Args:
+            cell_size: Grid cell size in degrees
+            species: eBird species code or common name (case-insensitive)
+            county: County name, or a list of names (case-insensitive)
+            since: Only sightings with obsDt >= this 'YYYY-MM-DD[ HH:MM]' string
+            until: Only sightings with obsDt < this 'YYYY-MM-DD[ HH:MM]' string
+
+        Returns:
+            list: One dict per non-empty cell with the centroid 'lat'/'lng', 'count',
+                  distinct 'species', 'first'/'last' obsDt, and the full 'sighting'
+                  when the cell holds a single one
+        """
+        clauses, params = ["lat IS NOT NULL AND lng IS NOT NULL"], [cell_size, cell_size]
+        if species:
+            clauses.append("(species_code = ? OR com_name = ? COLLATE NOCASE)")
+            params.extend([species, species])
+        if county:
+            counties = [county] if isinstance(county, str) else list(county)
+            clauses.append(f"county COLLATE NOCASE IN ({','.join('?' * len(counties))})")
+            params.extend(counties)
+        if since:
+            clauses.append("obs_dt >= ?")
+            params.append(since)
+        if until:
+            clauses.append("obs_dt < ?")
+            params.append(until)
+
+        # CAST truncates toward zero, so shift by a large offset to floor negative longitudes
+        sql = f"""
+            SELECT CAST(lat / ? + 10000000 AS INTEGER) AS cell_y,
+                   CAST(lng / ? + 10000000 AS INTEGER) AS cell_x,
+                   COUNT(*), AVG(lat), AVG(lng), COUNT(DISTINCT species_code),
+                   MIN(obs_dt), MAX(obs_dt), MIN(rowid)
+            FROM observations
+            WHERE {' AND '.join(clauses)}
+            GROUP BY cell_y, cell_x
+        """
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+            singles = [row[8] for row in rows if row[2] == 1]
+            raw_by_rowid = {}
+            for start in range(0, len(singles), 500):
+                chunk = singles[start:start + 500]
+                raw_by_rowid.update(self._conn.execute(
+                    f"SELECT rowid, raw FROM observations WHERE rowid IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+
+        clusters = []
+        for _, _, count, lat, lng, species_count, first, last, rowid in rows:
+            cluster = {
+                'lat': round(lat, 6),
+                'lng': round(lng, 6),
+                'count': count,
+                'species': species_count,
+                'first': first or None,
+                'last': last or None,
+            }
+            if count == 1 and rowid in raw_by_rowid:
+                cluster['sighting'] = json.loads(raw_by_rowid[rowid])
+            clusters.append(cluster)
+        return clusters
+
+    def spatial_rows(self):
+        """
+        Read every sighting with coordinates, for building a spatial index
+
+        Returns:
+            list: (lat, lng, obs_dt, species_code, com_name, county, raw JSON string) tuples
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT lat, lng, obs_dt, species_code, com_name, county, raw FROM observations "
+                "WHERE lat IS NOT NULL AND lng IS NOT NULL"
+            ).fetchall()
+
+    def reclassify_counties(self):
+        """
+        Recompute the county of every stored sighting (e.g. after updating boundary files)
+
+        Returns:
+            int: Number of sightings whose county changed
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT sub_id, species_code, county, raw FROM observations").fetchall()
+            changes = []
+            for sub_id, species_code, county, raw in rows:
+                new_county = self._county_for(json.loads(raw))
+                if new_county != county:
+                    changes.append((new_county, sub_id, species_code))
+
+            self._conn.executemany(
+                "UPDATE observations SET county = ? WHERE sub_id = ? AND species_code = ?", changes
+            )
+            self._conn.commit()
+
+        return len(changes)
+
+    def changes_since(self, seq):
+        """
+        Get sightings inserted or updated after a given ingest sequence number
+
+        Args:
+            seq: Sequence number previously returned by latest_seq()
+
+        Returns:
+            list: Raw observation dictionaries, oldest change first
+        """
+        with self._lock:
+            return [json.loads(raw) for (raw,) in self._conn.execute(
+                "SELECT raw FROM observations WHERE seq > ? ORDER BY seq, obs_dt", (seq,)
+            )]
+
+    def change_feed(self, seq):
+        """
+        Get sightings changed after a given ingest sequence number, still JSON-encoded
+
+        Args:
+            seq: Sequence number previously returned by latest_seq()
+
+        Returns:
+            list: (seq, county, raw JSON string) tuples, oldest change first
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, county, raw FROM observations WHERE seq > ? ORDER BY seq, obs_dt", (seq,)
+            ).fetchall()
+
+    def history(self, after_seq=0, county=None, since=None):
+        """
+        Get the merged sighting history, still JSON-encoded, for the map's history view
+
+        Args:
+            after_seq: Only sightings inserted or updated after this ingest sequence number
+            county: County name, or a list of names (case-insensitive)
+            since: Only sightings with obsDt >= this 'YYYY-MM-DD[ HH:MM]' string
+
+        Returns:
+            list: Raw JSON strings, newest sighting first, one per (subId, speciesCode)
+        """
+        clauses, params = ["seq > ?"], [after_seq]
+        if since:
+            clauses.append("obs_dt >= ?")
+            params.append(since)
+        if county:
+            counties = [county] if isinstance(county, str) else list(county)
+            clauses.append(f"county COLLATE NOCASE IN ({','.join('?' * len(counties))})")
+            params.extend(counties)
+
+        sql = f"SELECT raw FROM observations WHERE {' AND '.join(clauses)} ORDER BY obs_dt DESC"
+        with self._lock:
+            return [raw for (raw,) in self._conn.execute(sql, params)]
+
+    def latest_seq(self):
+        """Return the sequence number of the most recent ingest batch (0 when empty)"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM observations").fetchone()[0]
+
+    def count(self):
+        """Return the number of stored sightings"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+    def import_json_files(self, pattern='ny_rare_birds_*.json'):
+        """
+        Load historical timestamped JSON dumps into the store, each as of its mtime
+
+        Args:
+            pattern: Glob pattern of JSON files to import (default: ny_rare_birds_*.json)
+
+        Returns:
+            dict: Combined 'inserted', 'updated' and 'unchanged' counts
+        """
+        totals = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for filename in sorted(glob.glob(pattern)):
+            try:
+                fetched_at = os.path.getmtime(filename)
+                with open(filename, 'r', encoding='utf-8') as f:
+                    observations = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {filename}: {e}")
+                continue
+
+            for name, value in self.upsert(observations, fetched_at=fetched_at).items():
+                totals[name] += value
+
+        return totals
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def encode_cursor(key):
+    """Encode an (obs_dt, sub_id, species_code) position as an opaque URL-safe cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(key, list) or len(key) != 3:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key
+
+
+def main():
+    """Import existing ny_rare_birds_*.json dumps into the store"""
+    from county_index import load_county_index
+
+    pattern = sys.argv[1] if len(sys.argv) > 1 else 'ny_rare_birds_*.json'
+
+    with ObservationStore(county_index=load_county_index()) as store:
+        counts = store.import_json_files(pattern)
+        reclassified = store.reclassify_counties()
+        if reclassified:
+            print(f"Updated county for {reclassified} existing sightings")
+        print(f"Imported {pattern}: {counts['inserted']} new, {counts['updated']} updated, "
+              f"{counts['unchanged']} unchanged")
+        print(f"Store now holds {store.count()} sightings in {store.db_path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Streaming Observation Writer
+Writes observations to CSV, NDJSON or compact JSON one row at a time, in constant memory
+"""
+
+import csv
+import json
+import time
+
+from metrics import record_write
+from observation import to_jsonable
+
+
+# CSV columns, matching the keys produced by EBirdAPIClient.format_observation
+FORMATTED_FIELDNAMES = [
+    'common_name',
+    'has_media',
+    'how_many',
+    'latitude',
+    'location_id',
+    'location_name',
+    'location_private',
+    'longitude',
+    'observation_date',
+    'observation_reviewed',
+    'observation_valid',
+    'observer_id',
+    'scientific_name',
+    'species_code',
+    'subspecies_common_name',
+]
+
+FORMATS = ('csv', 'ndjson', 'json')
+
+
+class ObservationWriter:
+    """
+    Incremental writer for observation rows
+
+    Formats:
+        csv: Formatted rows with the fixed FORMATTED_FIELDNAMES schema
+        ndjson: One raw observation per line (appendable, streamable)
+        json: A compact JSON array of raw observations
+    """
+
+    def __init__(self, filename, fmt='ndjson', formatter=None):
+        """
+        Open the output file
+
+        Args:
+            filename: Output path
+            fmt: 'csv', 'ndjson' or 'json' (default: 'ndjson')
+            formatter: Callable turning a raw observation into a CSV row (required for 'csv')
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+        if fmt == 'csv' and formatter is None:
+            raise ValueError("CSV output needs a formatter (e.g. EBirdAPIClient.format_observation)")
+
+        self.filename = filename
+        self.fmt = fmt
+        self.formatter = formatter
+        self.count = 0
+        self.seconds = 0.0
+
+        self._file = open(filename, 'w', newline='' if fmt == 'csv' else None, encoding='utf-8')
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=FORMATTED_FIELDNAMES)
+            self._csv.writeheader()
+        elif fmt == 'json':
+            self._file.write('[')
+
+    def write(self, obs):
+        """Write one raw observation"""
+        start = time.perf_counter()
+        if self.fmt == 'csv':
+            self._csv.writerow(self.formatter(obs))
+        elif self.fmt == 'ndjson':
+            self._file.write(json.dumps(obs, separators=(',', ':'), default=to_jsonable))
+            self._file.write('\n')
+        else:
+            if self.count:
+                self._file.write(',')
+            self._file.write(json.dumps(obs, separators=(',', ':'), default=to_jsonable))
+        self.count += 1
+        self.seconds += time.perf_counter() - start
+
+    def write_many(self, observations):
+        """
+        Write every observation from an iterable (list, generator or fetcher batch)
+
+        Returns:
+            int: Number of observations written by this call
+        """
+        written = 0
+        for obs in observations:
+            self.write(obs)
+            written += 1
+        return written
+
+    def close(self):
+        """Finish and close the output file"""
+        if self._file.closed:
+            return
+        if self.fmt == 'json':
+            self._file.write(']\n')
+        self._file.close()
+        record_write(self.fmt, self.count, self.seconds)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+eBird API Response Cache
+On-disk TTL + revalidation cache for eBird API responses, with LRU size-bounded eviction
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlencode
+
+
+CacheEntry = namedtuple('CacheEntry', ['key', 'body', 'etag', 'last_modified', 'fresh'])
+
+
+class ResponseCache:
+    """SQLite-backed cache of raw eBird API response bodies keyed by endpoint + params"""
+
+    # Time-to-live in seconds by endpoint fragment; the first matching fragment wins
+    DEFAULT_TTLS = [
+        ('/recent/notable', 15 * 60),
+        ('/data/obs/', 30 * 60),
+        ('/ref/', 7 * 24 * 60 * 60),
+    ]
+
+    def __init__(self, db_path='ebird_cache.db', max_bytes=50 * 1024 * 1024, ttls=None, default_ttl=10 * 60):
+        """
+        Initialize the response cache
+
+        Args:
+            db_path: SQLite file holding cached responses (default: ebird_cache.db)
+            max_bytes: Total body size kept before least-recently-used entries are evicted (default: 50 MB)
+            ttls: List of (endpoint fragment, seconds) pairs overriding DEFAULT_TTLS
+            default_ttl: TTL in seconds for endpoints matching no fragment (default: 10 minutes)
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttls = ttls if ttls is not None else self.DEFAULT_TTLS
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint, params=None):
+        """Build a stable cache key from an endpoint URL and its query parameters"""
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{endpoint}?{query}".encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint):
+        """Return the TTL in seconds that applies to an endpoint"""
+        for fragment, ttl in self.ttls:
+            if fragment in endpoint:
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, endpoint, params=None):
+        """
+        Look up a cached response
+
+        Args:
+            endpoint: Full endpoint URL
+            params: Query string parameters
+
+        Returns:
+            CacheEntry: Cached entry (check .fresh before using without revalidation), or None
+        """
+        key = self.make_key(endpoint, params)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            body, etag, last_modified, stored_at = row
+            fresh = now - stored_at < self.ttl_for(endpoint)
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        return CacheEntry(key, body, etag, last_modified, fresh)
+
+    def store(self, endpoint, params, body, etag=None, last_modified=None):
+        """
+        Store a response body, evicting least-recently-used entries if over max_bytes
+
+        Args:
+            endpoint: Full endpoint URL
+            params: Query string parameters
+            body: Raw response body (bytes)
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+        """
+        key = self.make_key(endpoint, params)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, endpoint, body, etag, last_modified, stored_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, last_modified, now, now, len(body))
+            )
+            self._evict()
+            self._conn.commit()
+
+    def mark_revalidated(self, key):
+        """Reset the TTL of an entry after the server answered 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self.revalidations += 1
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key)
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
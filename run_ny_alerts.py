@@ -4,7 +4,15 @@ New York Rare Bird Alert - Customizable Runner
 Quick script to fetch NY rare bird alerts with custom settings
 """
 
-from ebird_api_client import EBirdAPIClient
+from ebird_api_client import EBirdAPIClient, update_latest_pointer
+from async_fetcher import NY_COUNTY_CODES, fetch_ny_county_sweep
+from fetch_planner import fetch_complete
+from response_cache import ResponseCache
+from observation_store import ObservationStore
+from county_index import load_county_index, resolve_county_names
+from observation_stats import summarize_observations
+from delta_detector import SeenSet
+from history_manifest import update_history_manifest
 from datetime import datetime
 import json
 import os
@@ -23,7 +31,31 @@ def main():
     # You can also use county codes like 'US-NY-061' for Manhattan
     REGION_CODE = "US-NY"
 
+    # Sweep every NY county concurrently instead of one statewide request
+    # (avoids the statewide MAX_RESULTS cap; REGION_CODE is ignored when enabled)
+    COUNTY_SWEEP = False
+
+    # When a request comes back with exactly MAX_RESULTS sightings it was truncated:
+    # split it into counties, then geo tiles, until every piece is complete
+    SPLIT_SATURATED = True
+
+    # Extra hotspot IDs to include in a county sweep (e.g. ['L99381'])
+    HOTSPOTS = []
+
+    # Cache API responses on disk so repeated runs skip identical requests
+    # (set to None to always hit the API)
+    CACHE_FILE = "ebird_cache.db"
+
+    # Persistent sighting history; each run only writes new or changed sightings
+    STORE_FILE = "ny_rare_birds.db"
+
+    # Also write sightings that are new or changed since the last run to
+    # ny_new_rarities_*.csv/json and list only those in the summary (the full window
+    # is still saved as ny_rare_birds_*.csv/json). Set to None to turn this off.
+    SEEN_FILE = "seen_sightings.bin"
+
     # Filter by specific counties (optional, leave empty for all NY)
+    # Sightings are placed by eBird's county fields, else coordinates; borough or county names both work
     # Example: ['Manhattan', 'Queens', 'Brooklyn', 'Bronx', 'Staten Island']
     COUNTY_FILTER = []
 
@@ -42,91 +74,152 @@ def main():
         return 1
 
     # Create client
-    client = EBirdAPIClient(api_key)
-
-    print("\n" + "="*70)
-    print(f"  NEW YORK RARE BIRD ALERT (SN35466)")
-    print("="*70)
-    print(f"Region: {REGION_CODE}")
-    print(f"Looking back: {DAYS_BACK} days")
-    print(f"Max results: {MAX_RESULTS}")
-    if COUNTY_FILTER:
-        print(f"Filtering by: {', '.join(COUNTY_FILTER)}")
-    print("="*70 + "\n")
-
-    # Fetch observations
-    observations = client.get_notable_observations(
-        REGION_CODE,
-        days_back=DAYS_BACK,
-        max_results=MAX_RESULTS
-    )
-
-    if not observations:
-        print("No rare birds found in the specified timeframe.")
-        return 0
+    cache = ResponseCache(CACHE_FILE) if CACHE_FILE else None
+    with EBirdAPIClient(api_key, cache=cache) as client:
+
+        print("\n" + "="*70)
+        print(f"  NEW YORK RARE BIRD ALERT (SN35466)")
+        print("="*70)
+        if COUNTY_SWEEP:
+            print(f"Region: all {len(NY_COUNTY_CODES)} NY counties (concurrent sweep)")
+        else:
+            print(f"Region: {REGION_CODE}")
+        print(f"Looking back: {DAYS_BACK} days")
+        print(f"Max results: {MAX_RESULTS}")
+        if COUNTY_FILTER:
+            print(f"Filtering by: {', '.join(COUNTY_FILTER)}")
+        print("="*70 + "\n")
+
+        # County boundaries: tile extents for split queries and the county filter
+        county_index = load_county_index()
+
+        # Fetch observations
+        if COUNTY_SWEEP:
+            try:
+                observations = fetch_ny_county_sweep(
+                    client,
+                    days_back=DAYS_BACK,
+                    max_results=MAX_RESULTS,
+                    hotspots=HOTSPOTS
+                )
+            except RuntimeError as e:
+                print(f"Error: {e}")
+                return 1
+        elif SPLIT_SATURATED:
+            observations = fetch_complete(
+                client,
+                REGION_CODE,
+                days_back=DAYS_BACK,
+                max_results=MAX_RESULTS,
+                county_index=county_index
+            )
+        else:
+            observations = client.get_notable_observations(
+                REGION_CODE,
+                days_back=DAYS_BACK,
+                max_results=MAX_RESULTS
+            )
+
+        if not observations:
+            print("No rare birds found in the specified timeframe.")
+            return 0
+
+        # Filter by county if specified
+        if COUNTY_FILTER:
+            wanted_counties = resolve_county_names(COUNTY_FILTER)
+            observations = [obs for obs in observations if county_index.county_for(obs) in wanted_counties]
+            print(f"Filtered to {len(observations)} observations in specified counties.\n")
+            if not observations:
+                print("No rare birds found in the specified counties.")
+                return 0
+
+        # Keep the full window in the store (only new or changed rows are written)
+        with ObservationStore(STORE_FILE, county_index=county_index) as store:
+            client.save_to_store(observations, store)
+
+        # Full-window snapshot on every run: the map, get_latest_data.php and the
+        # history manifest all read the newest ny_rare_birds_*.json
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_file = f"ny_rare_birds_{timestamp}.csv"
+        json_file = f"ny_rare_birds_{timestamp}.json"
+
+        client.save_to_csv(observations, csv_file)
+        client.save_to_json(observations, json_file)
+        update_latest_pointer(json_file)
+        update_history_manifest()
+        saved_files = [csv_file, json_file]
+
+        # Additionally pick out what changed since the last run, for alerting
+        alerts = observations
+        if SEEN_FILE:
+            seen = SeenSet(SEEN_FILE)
+            changes = seen.detect(observations)
+            print(f"\nChanges since last run: {len(changes.new)} new, {len(changes.updated)} updated, "
+                  f"{len(changes.withdrawn)} withdrawn ({changes.unchanged} already reported)")
+            for obs in changes.withdrawn:
+                print(f"   ✖ Withdrawn: {obs.com_name} at {obs.loc_name}")
+
+            alerts = changes.new + changes.updated
+            if alerts:
+                delta_csv_file = f"ny_new_rarities_{timestamp}.csv"
+                delta_json_file = f"ny_new_rarities_{timestamp}.json"
+                client.save_to_csv(alerts, delta_csv_file)
+                client.save_to_json(alerts, delta_json_file)
+                saved_files += [delta_csv_file, delta_json_file]
+
+            # Remember what was reported only once it has been written out
+            seen.prune()
+            seen.save()
+
+        # Print summary
+        print("\n" + "="*70)
+        print("SUMMARY")
+        print("="*70)
+        print(f"Total rare bird observations: {len(observations)}")
+        if SEEN_FILE:
+            print(f"New or updated since the last run: {len(alerts)}")
+
+        # All summaries in one pass over the batch
+        stats = summarize_observations(observations, county_index)
+        print(f"Unique species: {stats['unique_species']}")
+
+        # Show top species
+        print("\nMost frequently reported rare species:")
+        for i, species in enumerate(stats['top_species'], 1):
+            print(f"  {i}. {species['name']} - {species['count']} observation(s)")
+
+        # Show counties
+        print("\nObservations by county:")
+        for county, count in stats['by_county'].items():
+            print(f"  {county}: {count}")
+
+        # Show recent sightings (only the new ones when tracking what was already reported)
+        print("\n" + "="*70)
+        print("NEW OR UPDATED SINCE LAST RUN (Last 10)" if SEEN_FILE else "RECENT SIGHTINGS (Last 10)")
+        print("="*70 + "\n")
+
+        if not alerts:
+            print("No new rare birds since the last run.\n")
+
+        for i, obs in enumerate(alerts[:10], 1):
+            species = obs.com_name or 'Unknown'
+            location = obs.loc_name or 'Unknown'
+            date = obs.obs_dt_text or 'Unknown'
+            count = obs.get('howMany', '?')
+
+            print(f"{i}. {species} ({count} individual{'s' if count != 1 else ''})")
+            print(f"   📍 {location}")
+            print(f"   🕒 {date}")
+            print()
+
+        print("="*70)
+        print(f"✅ Data saved to:")
+        for filename in saved_files:
+            print(f"   📄 {filename}")
+        print(f"   🗄️  {STORE_FILE}")
+        print("="*70 + "\n")
 
-    # Filter by county if specified
-    if COUNTY_FILTER:
-        filtered_obs = []
-        for obs in observations:
-            location = obs.get('locName', '')
-            if any(county.lower() in location.lower() for county in COUNTY_FILTER):
-                filtered_obs.append(obs)
-        observations = filtered_obs
-        print(f"Filtered to {len(observations)} observations in specified counties.\n")
-
-    # Generate filenames with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_file = f"ny_rare_birds_{timestamp}.csv"
-    json_file = f"ny_rare_birds_{timestamp}.json"
-
-    # Save data
-    client.save_to_csv(observations, csv_file)
-    client.save_to_json(observations, json_file)
-
-    # Print summary
-    print("\n" + "="*70)
-    print("SUMMARY")
-    print("="*70)
-    print(f"Total rare bird observations: {len(observations)}")
-
-    # Count unique species
-    species_counts = {}
-    for obs in observations:
-        species = obs.get('comName', 'Unknown')
-        species_counts[species] = species_counts.get(species, 0) + 1
-
-    print(f"Unique species: {len(species_counts)}")
-
-    # Show top species
-    print("\nMost frequently reported rare species:")
-    sorted_species = sorted(species_counts.items(), key=lambda x: x[1], reverse=True)
-    for i, (species, count) in enumerate(sorted_species[:10], 1):
-        print(f"  {i}. {species} - {count} observation(s)")
-
-    # Show recent sightings
-    print("\n" + "="*70)
-    print("RECENT SIGHTINGS (Last 10)")
-    print("="*70 + "\n")
-
-    for i, obs in enumerate(observations[:10], 1):
-        species = obs.get('comName', 'Unknown')
-        location = obs.get('locName', 'Unknown')
-        date = obs.get('obsDt', 'Unknown')
-        count = obs.get('howMany', '?')
-
-        print(f"{i}. {species} ({count} individual{'s' if count != 1 else ''})")
-        print(f"   📍 {location}")
-        print(f"   🕒 {date}")
-        print()
-
-    print("="*70)
-    print(f"✅ Data saved to:")
-    print(f"   📄 {csv_file}")
-    print(f"   📄 {json_file}")
-    print("="*70 + "\n")
-
-    return 0
+        return 0
 
 
 if __name__ == "__main__":
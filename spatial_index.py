@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Spatial Index
+KD-tree over stored sightings for radius ("within 5 km of here") and k-nearest
+queries answered in memory, without an API call
+"""
+
+import heapq
+import json
+import math
+import threading
+import time
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Ranges this small are scanned linearly instead of split further
+LEAF_SIZE = 8
+
+
+def _to_xyz(lat, lng):
+    """Point on the unit sphere; straight-line (chord) distance grows with great-circle distance"""
+    phi, lam = math.radians(lat), math.radians(lng)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def _km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def _dist2(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+class KDTree:
+    """
+    Static 3-d tree over points on the sphere
+
+    The tree is implicit: points are reordered so that each range's median splits it
+    on axis depth % 3, and ranges of at most LEAF_SIZE points are leaves. Distances
+    are exact great-circle distances, with no distortion near the poles or the
+    antimeridian.
+    """
+
+    def __init__(self, points, items):
+        """
+        Build the tree
+
+        Args:
+            points: (lat, lng) pairs
+            items: Payload for each point, returned by the queries
+        """
+        xyz = [_to_xyz(lat, lng) for lat, lng in points]
+        order = list(range(len(xyz)))
+        self._build(order, xyz)
+        self._xyz = [xyz[i] for i in order]
+        self._items = [items[i] for i in order]
+
+    @staticmethod
+    def _build(order, xyz):
+        stack = [(0, len(order), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            axis = depth % 3
+            order[lo:hi] = sorted(order[lo:hi], key=lambda i: xyz[i][axis])
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+    def __len__(self):
+        return len(self._items)
+
+    def within(self, lat, lng, radius_km, predicate=None):
+        """
+        Items within radius_km of a point
+
+        Args:
+            lat, lng: Query point
+            radius_km: Search radius in kilometers
+            predicate: Optional function(item) -> bool filtering the results
+
+        Returns:
+            list: (distance_km, item) pairs, nearest first
+        """
+        query = _to_xyz(lat, lng)
+        radius = _km_to_chord(radius_km)
+        radius2 = radius * radius
+        xyz, items = self._xyz, self._items
+
+        found = []
+        stack = [(0, len(items), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                candidates = range(lo, hi)
+            else:
+                mid = (lo + hi) // 2
+                candidates = (mid,)
+                diff = query[depth % 3] - xyz[mid][depth % 3]
+                if diff <= radius:
+                    stack.append((lo, mid, depth + 1))
+                if diff >= -radius:
+                    stack.append((mid + 1, hi, depth + 1))
+
+            for i in candidates:
+                d2 = _dist2(query, xyz[i])
+                if d2 <= radius2 and (predicate is None or predicate(items[i])):
+                    found.append((d2, i))
+
+        found.sort()
+        return [(_chord_to_km(math.sqrt(d2)), items[i]) for d2, i in found]
+
+    def nearest(self, lat, lng, k=10, max_distance_km=None, predicate=None):
+        """
+        The k items closest to a point
+
+        Args:
+            lat, lng: Query point
+            k: Number of items (default: 10)
+            max_distance_km: Ignore items farther than this (default: no limit)
+            predicate: Optional function(item) -> bool; non-matching items are skipped
+
+        Returns:
+            list: (distance_km, item) pairs, nearest first
+        """
+        if k <= 0 or not self._items:
+            return []
+
+        query = _to_xyz(lat, lng)
+        xyz, items = self._xyz, self._items
+        limit2 = _km_to_chord(max_distance_km) ** 2 if max_distance_km is not None else math.inf
+
+        # Max-heap of the best k so far, as (-d2, index)
+        best = []
+
+        def worst2():
+            return -best[0][0] if len(best) == k else limit2
+
+        def consider(i):
+            d2 = _dist2(query, xyz[i])
+            if d2 <= worst2() and (predicate is None or predicate(items[i])):
+                if len(best) == k:
+                    heapq.heapreplace(best, (-d2, i))
+                else:
+                    heapq.heappush(best, (-d2, i))
+
+        def search(lo, hi, depth):
+            if hi - lo <= LEAF_SIZE:
+                for i in range(lo, hi):
+                    consider(i)
+                return
+            mid = (lo + hi) // 2
+            axis = depth % 3
+            diff = query[axis] - xyz[mid][axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff <= 0 else ((mid + 1, hi), (lo, mid))
+
+            search(near[0], near[1], depth + 1)
+            consider(mid)
+            if diff * diff <= worst2():
+                search(far[0], far[1], depth + 1)
+
+        search(0, len(items), 0)
+        return [(_chord_to_km(math.sqrt(-neg_d2)), items[i]) for neg_d2, i in sorted(best, reverse=True)]
+
+
+class NearbyIndex:
+    """
+    KD-tree over an ObservationStore's sightings, rebuilt when the store changes
+
+    Each query checks the store's ingest sequence (at most every check_interval
+    seconds) and rebuilds the tree after new ingests, so refreshing the index is
+    just storing new observations.
+    """
+
+    def __init__(self, store, check_interval=1.0):
+        """
+        Initialize the index (built on the first query)
+
+        Args:
+            store: ObservationStore to index
+            check_interval: Seconds between checks for new ingests (default: 1.0)
+        """
+        self.store = store
+        self.check_interval = check_interval
+        self._tree = None
+        self._seq = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_tree(self):
+        now = time.monotonic()
+        if self._tree is not None and now - self._checked_at < self.check_interval:
+            return self._tree
+
+        with self._lock:
+            seq = self.store.latest_seq()
+            if self._tree is None or seq != self._seq:
+                rows = self.store.spatial_rows()
+                # Item: (obs_dt, species_code, lower-cased common name, county, raw JSON)
+                self._tree = KDTree(
+                    [(row[0], row[1]) for row in rows],
+                    [(row[2] or '', row[3], (row[4] or '').lower(), row[5], row[6]) for row in rows]
+                )
+                self._seq = seq
+            self._checked_at = now
+            return self._tree
+
+    @staticmethod
+    def _predicate(since, species, counties):
+        if not (since or species or counties):
+            return None
+        species = species.lower() if species else None
+        counties = {county.lower() for county in counties} if counties else None
+
+        def matches(item):
+            obs_dt, species_code, com_name, county, _ = item
+            if since and obs_dt < since:
+                return False
+            if species and species_code != species and com_name != species:
+                return False
+            if counties and (county or '').lower() not in counties:
+                return False
+            return True
+        return matches
+
+    def within(self, lat, lng, radius_km, since=None, species=None, counties=None, limit=None, decode=True):
+        """
+        Stored sightings within radius_km of a point
+
+        Args:
+            lat, lng: Query point
+            radius_km: Search radius in kilometers
+            since: Only sightings with obsDt >= this 'YYYY-MM-DD[ HH:MM]' string
+            species: eBird species code or common name (case-insensitive)
+            counties: Only sightings in these counties
+            limit: Return at most this many, nearest first (default: all)
+            decode: Return observation dictionaries (default) or raw JSON strings
+
+        Returns:
+            list: (distance_km, observation) pairs, nearest first
+        """
+        results = self._current_tree().within(lat, lng, radius_km, self._predicate(since, species, counties))
+        if limit is not None:
+            results = results[:limit]
+        return [(distance, json.loads(item[4]) if decode else item[4]) for distance, item in results]
+
+    def nearest(self, lat, lng, k=10, max_distance_km=None, since=None, species=None, counties=None, decode=True):
+        """
+        The k stored sightings closest to a point
+
+        Args:
+            lat, lng: Query point
+            k: Number of sightings (default: 10)
+            max_distance_km: Ignore sightings farther than this (default: no limit)
+            since, species, counties: Filters, as for within()
+            decode: Return observation dictionaries (default) or raw JSON strings
+
+        Returns:
+            list: (distance_km, observation) pairs, nearest first
+        """
+        results = self._current_tree().nearest(lat, lng, k, max_distance_km,
+                                               self._predicate(since, species, counties))
+        return [(distance, json.loads(item[4]) if decode else item[4]) for distance, item in results]
+
+    def __len__(self):
+        return len(self._current_tree())
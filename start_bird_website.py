@@ -3,30 +3,528 @@
 Start a simple web server for the Bird Map website
 """
 
+import argparse
 import http.server
-import socketserver
 import json
 import os
 import glob
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from urllib.parse import urlparse, parse_qs
 
+from ebird_api_client import LATEST_POINTER_FILE
+from history_manifest import HistoryManifest
+from metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE, HTTP_REQUEST_SECONDS, HTTP_RESPONSE_BYTES, log_event
+from observation_store import ObservationStore
+from county_index import NYC_COUNTIES, load_county_index, resolve_county_names
+from observation_stats import compute_stats
+from spatial_index import NearbyIndex
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 PORT = 8000
 
+# Connections served at once (one thread each); further connections wait in the listen backlog
+MAX_CONNECTIONS = 256
+
+# Seconds an idle keep-alive connection is held open between requests
+KEEPALIVE_TIMEOUT = 2
+
+# Observation store written by run_ny_alerts.py, used by the /api/ endpoints
+STORE_FILE = 'ny_rare_birds.db'
+
+# Page size limits for /api/observations
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Cache-Control by file extension for static files; everything else uses the default.
+# HTML is revalidated on every load (cheap thanks to ETags); timestamped data dumps never change.
+STATIC_CACHE_CONTROL = {
+    '.html': 'no-cache',
+}
+DEFAULT_CACHE_CONTROL = 'public, max-age=3600'
+
+# /api/clusters: grid cells of about this many pixels on a 256 px map tile, the zoom
+# at which cells get no smaller, and how many zoom/filter grids are kept in memory
+CLUSTER_CELL_PIXELS = 64
+MAX_CLUSTER_ZOOM = 18
+CLUSTER_CACHE_SIZE = 64
+
+# /api/nearby: default and largest k (nearest sightings) and radius in km
+DEFAULT_NEARBY_K = 10
+MAX_NEARBY_RESULTS = 500
+MAX_NEARBY_RADIUS_KM = 100
+
+# Routes reported under their own name in the request metrics; everything else is 'static'
+API_ROUTES = ('/get_latest_data.php', '/api/observations', '/api/stats', '/api/clusters', '/api/history',
+              '/api/history/manifest', '/api/nearby', '/api/live', '/metrics')
+
+# /api/live: how often the store is checked for new ingests, the keepalive comment
+# interval, the unsent bytes a slow client may fall behind by before it is dropped,
+# and the viewer limit
+LIVE_POLL_INTERVAL = 2
+LIVE_KEEPALIVE = 15
+LIVE_CLIENT_BUFFER = 1024 * 1024
+MAX_LIVE_CLIENTS = 1000
+
+# Seconds between merges of new or changed history dumps into the store
+HISTORY_SYNC_INTERVAL = 300
+
+
+class LatestDataCache:
+    """
+    In-memory copy of the latest bird data file, with precompressed variants
+
+    The latest file is taken from the pointer written by run_ny_alerts.py. Without a
+    pointer, the directory is only rescanned when its mtime changes. The payload is
+    only reread when the chosen file's mtime or size changes.
+    """
+
+    def __init__(self, pattern='ny_rare_birds_*.json', pointer_file=LATEST_POINTER_FILE, directory='.'):
+        self.pattern = pattern
+        self.pointer_file = pointer_file
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pointer_stamp = None
+        self._pointer_target = None
+        self._scan_stamp = None
+        self._scanned_file = None
+        self._file_stamp = None
+        self.payload = None
+
+    def _read_pointer(self):
+        """Return the file named by the pointer, rereading it only when it changed"""
+        try:
+            stat = os.stat(self.pointer_file)
+        except FileNotFoundError:
+            self._pointer_stamp = self._pointer_target = None
+            return None
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._pointer_stamp:
+            with open(self.pointer_file, 'r', encoding='utf-8') as f:
+                self._pointer_target = f.read().strip() or None
+            self._pointer_stamp = stamp
+        return self._pointer_target
+
+    def _find_latest_file(self):
+        """Return the latest data file, touching the filesystem only when something changed"""
+        latest_file = self._read_pointer()
+        if latest_file and os.path.exists(latest_file):
+            return latest_file
+
+        # No usable pointer: scan the directory, keyed on the pointer state and the
+        # directory mtime so repeated requests reuse the last scan
+        stamp = (self._pointer_stamp, os.stat(self.directory).st_mtime_ns)
+        if stamp != self._scan_stamp:
+            json_files = [os.path.normpath(path) for path in glob.glob(os.path.join(self.directory, self.pattern))]
+            json_files.sort(key=os.path.getmtime, reverse=True)
+            self._scanned_file = json_files[0] if json_files else None
+            self._scan_stamp = stamp
+        return self._scanned_file
+
+    def get(self):
+        """
+        Return the cached payload for the latest data file
+
+        Returns:
+            dict: {'file', 'etag', 'identity', 'gzip', 'br'} or None if no data files exist
+        """
+        with self._lock:
+            latest_file = self._find_latest_file()
+            if latest_file is None:
+                return None
+
+            stat = os.stat(latest_file)
+            file_stamp = (latest_file, stat.st_mtime_ns, stat.st_size)
+            if file_stamp != self._file_stamp:
+                with open(latest_file, 'rb') as f:
+                    data = f.read()
+                self.payload = {
+                    'file': latest_file,
+                    'etag': '"' + hashlib.sha1(data).hexdigest() + '"',
+                    'identity': data,
+                    'gzip': gzip.compress(data, compresslevel=6),
+                    'br': brotli.compress(data) if brotli else None
+                }
+                self._file_stamp = file_stamp
+
+            return self.payload
+
+
+latest_data_cache = LatestDataCache()
+
+
+class LiveClient:
+    """One SSE client socket, its county filter and the bytes it has not yet accepted"""
+
+    __slots__ = ('sock', 'counties', 'pending', 'lock')
+
+    def __init__(self, sock, counties):
+        self.sock = sock
+        self.counties = counties
+        self.pending = bytearray()
+        self.lock = threading.Lock()
+
+
+class LiveBroadcaster:
+    """
+    Fan-out of newly ingested sightings to Server-Sent Events clients
+
+    One thread watches the store's ingest sequence and encodes each change once per
+    distinct county filter. Client sockets are held here rather than by a connection
+    thread, so any number of open map tabs costs no threads or connection slots.
+    Sockets are non-blocking: whatever a slow client has not accepted waits in its
+    own buffer, and a client whose backlog would pass LIVE_CLIENT_BUFFER is dropped.
+    """
+
+    def __init__(self, store, poll_interval=LIVE_POLL_INTERVAL, keepalive=LIVE_KEEPALIVE,
+                 max_buffer=LIVE_CLIENT_BUFFER):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.keepalive = keepalive
+        self.max_buffer = max_buffer
+        self.seq = store.latest_seq()
+        self.clients = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_send = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='bird-map-live', daemon=True)
+        self._thread.start()
+
+    def add(self, sock, counties=None, last_seq=None):
+        """
+        Take over an SSE client socket whose response headers were already sent
+
+        Args:
+            sock: Client socket
+            counties: Optional county names the client wants (None for all)
+            last_seq: Last event ID the client saw; missed changes are replayed
+        """
+        counties = frozenset(name.lower() for name in counties) if counties else None
+        sock.setblocking(False)
+        client = LiveClient(sock, counties)
+        # Replay and registration happen under the lock so no change falls between them;
+        # the replay is only queued here and sent after the lock is released
+        with self._lock:
+            if last_seq is not None and last_seq < self.seq:
+                event = self._encode(self.store.change_feed(last_seq), counties, self.seq)
+                if event:
+                    client.pending += event
+            self.clients[sock] = client
+        self._send(client)
+
+    def owns(self, sock):
+        return sock in self.clients
+
+    def __len__(self):
+        return len(self.clients)
+
+    def _encode(self, feed, counties, seq):
+        rows = [raw for _, county, raw in feed if counties is None or (county or '').lower() in counties]
+        if not rows:
+            return None
+        return f"id: {seq}\nevent: observations\ndata: [{','.join(rows)}]\n\n".encode('utf-8')
+
+    def _send(self, client, data=b''):
+        """
+        Queue data for a client and write as much of its buffer as the socket takes
+
+        Returns:
+            bool: False if the client was dropped (closed, or too far behind)
+        """
+        with client.lock:
+            # A single event (such as a reconnect's replay) always fits an empty buffer
+            if data and client.pending and len(client.pending) + len(data) > self.max_buffer:
+                self._drop(client.sock)
+                return False
+            client.pending += data
+            try:
+                while client.pending:
+                    sent = client.sock.send(client.pending)
+                    del client.pending[:sent]
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._drop(client.sock)
+                return False
+        return True
+
+    def _drop(self, sock):
+        with self._lock:
+            self.clients.pop(sock, None)
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _run(self):
+        backlog = False
+        while not self._stop.wait(0.05 if backlog else self.poll_interval):
+            try:
+                seq = self.store.latest_seq()
+            except Exception as e:
+                print(f"Live feed error: {e}")
+                continue
+
+            feed = None
+            with self._lock:
+                if seq > self.seq:
+                    feed = self.store.change_feed(self.seq)
+                    self.seq = seq
+                clients = list(self.clients.values())
+
+            if feed is not None:
+                events = {}
+                for client in clients:
+                    if client.counties not in events:
+                        events[client.counties] = self._encode(feed, client.counties, seq)
+                    self._send(client, events[client.counties] or b'')
+                self._last_send = time.monotonic()
+            elif time.monotonic() - self._last_send >= self.keepalive:
+                # Comment line: keeps proxies from timing out and detects closed tabs
+                for client in clients:
+                    self._send(client, b': keepalive\n\n')
+                self._last_send = time.monotonic()
+            else:
+                # Keep draining buffers of clients that were behind
+                for client in clients:
+                    if client.pending:
+                        self._send(client)
+
+            backlog = any(client.pending for client in clients)
+
+    def close(self):
+        """Stop the broadcaster and disconnect every client"""
+        self._stop.set()
+        with self._lock:
+            socks = list(self.clients)
+        for sock in socks:
+            self._drop(sock)
+
+
+class BirdMapServer(http.server.ThreadingHTTPServer):
+    """HTTP server handling each connection on its own thread, up to max_connections at once"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    # Listen backlog; the default of 5 drops connection bursts, costing clients a 1 s SYN retry
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, max_connections=MAX_CONNECTIONS, store=None,
+                 history_sync_interval=HISTORY_SYNC_INTERVAL):
+        super().__init__(server_address, handler_class)
+        self.connection_slots = threading.BoundedSemaphore(max_connections)
+        self.store = store
+
+        # /api/stats responses, valid until the store's ingest sequence moves on
+        self.stats_cache = {}
+        self.stats_cache_seq = None
+        self.stats_cache_lock = threading.Lock()
+
+        # /api/clusters grids per (zoom, filters), oldest first, valid for one ingest sequence
+        self.cluster_cache = OrderedDict()
+        self.cluster_cache_seq = None
+        self.cluster_cache_lock = threading.Lock()
+
+        # History dumps on disk; new or changed ones are merged into the store at startup
+        # and every history_sync_interval seconds, never by a request
+        self.history_manifest = HistoryManifest()
+        self.history_lock = threading.Lock()
+        self.history_sync_interval = history_sync_interval
+        self._history_stop = threading.Event()
+        self._history_thread = None
+        if history_sync_interval:
+            self._history_thread = threading.Thread(target=self._sync_history_forever, name='bird-map-history',
+                                                    daemon=True)
+            self._history_thread.start()
+
+        # /api/nearby KD-tree over the store, rebuilt after ingests
+        self.nearby = NearbyIndex(store) if store is not None else None
+
+        self.live = LiveBroadcaster(store) if store is not None else None
+
+    def sync_history(self):
+        """
+        Refresh the history manifest and merge new or changed dumps into the store
+
+        Each dump is merged as of its mtime, so a stored sighting fetched after the
+        dump was written keeps its newer version.
+        """
+        with self.history_lock:
+            for filename in self.history_manifest.refresh():
+                if self.store is None:
+                    continue
+                try:
+                    fetched_at = os.path.getmtime(filename)
+                    with open(filename, 'r', encoding='utf-8') as f:
+                        self.store.upsert(json.load(f), fetched_at=fetched_at)
+                except (OSError, ValueError) as e:
+                    print(f"Skipping {filename}: {e}")
+
+    def _sync_history_forever(self):
+        while True:
+            try:
+                self.sync_history()
+            except Exception as e:
+                print(f"History sync error: {e}")
+            if self._history_stop.wait(self.history_sync_interval):
+                return
+
+    def process_request(self, request, client_address):
+        # At the limit, stop accepting until a connection closes (idle ones close after
+        # KEEPALIVE_TIMEOUT); new clients queue in the listen backlog meanwhile
+        self.connection_slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.connection_slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.connection_slots.release()
+
+    def shutdown_request(self, request):
+        # /api/live sockets stay open after their handler returns
+        if self.live is not None and self.live.owns(request):
+            return
+        super().shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._history_stop.set()
+        if self._history_thread is not None:
+            self._history_thread.join()
+        if self.live is not None:
+            self.live.close()
+
+
 class BirdMapHandler(http.server.SimpleHTTPRequestHandler):
     """Custom handler to serve bird data"""
 
+    # Keep-alive: browsers reuse one connection for the page, scripts and data
+    protocol_version = 'HTTP/1.1'
+
+    # Seconds a request may stall mid-read or mid-write; idle time between keep-alive
+    # requests is limited separately, by KEEPALIVE_TIMEOUT
+    timeout = 15
+
+    # Headers and body go out in separate writes; without TCP_NODELAY the body waits
+    # for the client's delayed ACK (~40 ms per keep-alive request)
+    disable_nagle_algorithm = True
+
+    _cache_headers = None
+
+    def handle(self):
+        """Serve requests until the client closes or stays idle for KEEPALIVE_TIMEOUT seconds"""
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self._await_next_request():
+            self.handle_one_request()
+
+    def _await_next_request(self):
+        """Wait for the next request's first byte; False if the client went away or idled out"""
+        self.connection.settimeout(KEEPALIVE_TIMEOUT)
+        try:
+            if not self.rfile.peek(1):
+                return False
+        except OSError:
+            return False
+        self.connection.settimeout(self.timeout)
+        return True
+
+    # Status and body size of the current response, for the request metrics
+    _status = None
+    _content_length = 0
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == 'content-length':
+            self._content_length = int(value)
+        super().send_header(keyword, value)
+
     def end_headers(self):
         # Enable CORS
         self.send_header('Access-Control-Allow-Origin', '*')
+        if self._cache_headers:
+            for name, value in self._cache_headers.items():
+                self.send_header(name, value)
+            self._cache_headers = None
         super().end_headers()
 
+    def send_head(self):
+        """Serve static files with ETag/Cache-Control, answering If-None-Match with 304"""
+        self._cache_headers = None
+        path = self.translate_path(self.path)
+
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            extension = os.path.splitext(path)[1].lower()
+            self._cache_headers = {
+                'ETag': etag,
+                'Cache-Control': STATIC_CACHE_CONTROL.get(extension, DEFAULT_CACHE_CONTROL)
+            }
+
+            if etag in self.headers.get('If-None-Match', ''):
+                self.send_response(304)
+                self.end_headers()
+                return None
+
+        return super().send_head()
+
     def do_GET(self):
         # Parse the URL
         parsed_path = urlparse(self.path)
+        route = parsed_path.path if parsed_path.path in API_ROUTES else 'static'
 
+        self._status = None
+        self._content_length = 0
+        start = time.perf_counter()
+        try:
+            self.route(parsed_path)
+        finally:
+            elapsed = time.perf_counter() - start
+            status = self._status or 0
+            HTTP_REQUEST_SECONDS.observe(elapsed, route=route, status=status)
+            HTTP_RESPONSE_BYTES.inc(self._content_length, route=route)
+            log_event('http_request', route=route, path=parsed_path.path, status=status,
+                      seconds=round(elapsed, 6), bytes=self._content_length)
+
+    def route(self, parsed_path):
+        """Dispatch a GET request to its handler"""
         # Special handler for getting latest bird data
         if parsed_path.path == '/get_latest_data.php':
             self.serve_latest_data()
+        elif parsed_path.path == '/api/observations':
+            self.serve_observations(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/api/stats':
+            self.serve_stats(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/api/clusters':
+            self.serve_clusters(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/api/history':
+            self.serve_history(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/api/history/manifest':
+            self.serve_history_manifest()
+        elif parsed_path.path == '/api/nearby':
+            self.serve_nearby(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/api/live':
+            self.serve_live(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/metrics':
+            self.serve_metrics(parse_qs(parsed_path.query))
         else:
             # Serve files normally
             super().do_GET()
@@ -34,41 +532,433 @@ class BirdMapHandler(http.server.SimpleHTTPRequestHandler):
     def serve_latest_data(self):
         """Serve the most recent bird data JSON file"""
         try:
-            # Find all JSON files
-            json_files = glob.glob('ny_rare_birds_*.json')
+            payload = latest_data_cache.get()
 
-            if not json_files:
+            if payload is None:
                 self.send_error(404, "No bird data files found")
                 return
 
-            # Sort by modification time, most recent first
-            json_files.sort(key=os.path.getmtime, reverse=True)
-            latest_file = json_files[0]
+            # Unchanged since the browser's last load: just confirm its copy
+            if payload['etag'] in self.headers.get('If-None-Match', ''):
+                self.send_response(304)
+                self.send_header('ETag', payload['etag'])
+                self.end_headers()
+                return
 
-            # Read and serve the file
-            with open(latest_file, 'r') as f:
-                data = f.read()
+            accepted = self.headers.get('Accept-Encoding', '')
+            if payload['br'] is not None and 'br' in accepted:
+                encoding = 'br'
+            elif 'gzip' in accepted:
+                encoding = 'gzip'
+            else:
+                encoding = 'identity'
+            data = payload[encoding]
 
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('ETag', payload['etag'])
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            if encoding != 'identity':
+                self.send_header('Content-Encoding', encoding)
             self.end_headers()
-            self.wfile.write(data.encode())
+            self.wfile.write(data)
 
-            print(f"Served data from: {latest_file}")
+            print(f"Served data from: {payload['file']} ({encoding})")
 
         except Exception as e:
             self.send_error(500, f"Error serving data: {str(e)}")
 
+    def send_json(self, body):
+        """Send a JSON response body (bytes), gzip-compressed when the client accepts it"""
+        compressed = len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if compressed:
+            body = gzip.compress(body, compresslevel=5)
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_observations(self, query):
+        """
+        Serve one filtered page of sightings from the observation store
+
+        Query parameters: species, county (comma-separated county or borough names),
+        nyc=1 (all five boroughs), since, until, bbox (min_lng,min_lat,max_lng,max_lat),
+        limit, cursor
+        """
+        if self.server.store is None:
+            self.send_error(503, "Observation store not available")
+            return
+
+        def param(name):
+            values = query.get(name)
+            return values[0] if values else None
+
+        try:
+            limit = min(int(param('limit') or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+            bbox = param('bbox')
+            if bbox:
+                bbox = [float(value) for value in bbox.split(',')]
+                if len(bbox) != 4:
+                    raise ValueError("bbox needs min_lng,min_lat,max_lng,max_lat")
+            county = param('county')
+            if county:
+                county = sorted(resolve_county_names(name for name in county.split(',') if name.strip()))
+            elif param('nyc') == '1':
+                county = NYC_COUNTIES
+
+            rows, next_cursor = self.server.store.page(
+                species=param('species'),
+                county=county,
+                since=param('since'),
+                until=param('until'),
+                bbox=bbox,
+                limit=max(limit, 1),
+                cursor=param('cursor')
+            )
+        except ValueError as e:
+            self.send_error(400, f"Bad query: {e}")
+            return
+        except Exception as e:
+            self.send_error(500, f"Error querying observations: {str(e)}")
+            return
+
+        # Stored rows are already JSON text; splice them in without re-encoding
+        body = (
+            '{"observations":[' + ','.join(rows) + '],'
+            '"count":' + str(len(rows)) + ','
+            '"next_cursor":' + json.dumps(next_cursor) + '}'
+        )
+        self.send_json(body.encode('utf-8'))
+
+    def serve_stats(self, query):
+        """
+        Serve aggregated statistics (species, county, day and hotspot counts, streaks)
+
+        Query parameters: since, until, county (comma-separated) or nyc=1, top
+        """
+        if self.server.store is None:
+            self.send_error(503, "Observation store not available")
+            return
+
+        def param(name):
+            values = query.get(name)
+            return values[0] if values else None
+
+        county = param('county')
+        if county:
+            county = tuple(sorted(resolve_county_names(name for name in county.split(',') if name.strip())))
+        elif param('nyc') == '1':
+            county = tuple(NYC_COUNTIES)
+
+        try:
+            top_n = int(param('top') or 10)
+        except ValueError:
+            self.send_error(400, "Bad query: top must be an integer")
+            return
+
+        server = self.server
+        key = (param('since'), param('until'), county, top_n)
+        try:
+            seq = server.store.latest_seq()
+            with server.stats_cache_lock:
+                if server.stats_cache_seq != seq:
+                    server.stats_cache = {}
+                    server.stats_cache_seq = seq
+                body = server.stats_cache.get(key)
+
+            if body is None:
+                rows = server.store.stats_rows(since=key[0], until=key[1], county=county)
+                body = json.dumps(compute_stats(rows, top_n=top_n)).encode('utf-8')
+                with server.stats_cache_lock:
+                    if server.stats_cache_seq == seq:
+                        server.stats_cache[key] = body
+        except Exception as e:
+            self.send_error(500, f"Error computing stats: {str(e)}")
+            return
+
+        self.send_json(body)
+
+    def serve_clusters(self, query):
+        """
+        Serve sightings pre-aggregated into map clusters for one zoom level
+
+        The whole grid for a zoom level and filter set is computed once per ingest and
+        cached; each request only picks the cells inside its viewport.
+        Query parameters: zoom (0-18), bbox (min_lng,min_lat,max_lng,max_lat), species,
+        county (comma-separated) or nyc=1, since, until
+        """
+        if self.server.store is None:
+            self.send_error(503, "Observation store not available")
+            return
+
+        def param(name):
+            values = query.get(name)
+            return values[0] if values else None
+
+        try:
+            zoom = min(max(int(param('zoom') or 11), 0), MAX_CLUSTER_ZOOM)
+            bbox = param('bbox')
+            if bbox:
+                bbox = [float(value) for value in bbox.split(',')]
+                if len(bbox) != 4:
+                    raise ValueError("bbox needs min_lng,min_lat,max_lng,max_lat")
+        except ValueError as e:
+            self.send_error(400, f"Bad query: {e}")
+            return
+
+        county = param('county')
+        if county:
+            county = tuple(sorted(resolve_county_names(name for name in county.split(',') if name.strip())))
+        elif param('nyc') == '1':
+            county = tuple(NYC_COUNTIES)
+
+        # A 256 px tile spans 360 / 2^zoom degrees of longitude
+        cell_size = 360 / 2 ** zoom * CLUSTER_CELL_PIXELS / 256
+
+        server = self.server
+        key = (zoom, param('species'), county, param('since'), param('until'))
+        try:
+            seq = server.store.latest_seq()
+            with server.cluster_cache_lock:
+                if server.cluster_cache_seq != seq:
+                    server.cluster_cache.clear()
+                    server.cluster_cache_seq = seq
+                clusters = server.cluster_cache.get(key)
+                if clusters is not None:
+                    server.cluster_cache.move_to_end(key)
+
+            if clusters is None:
+                clusters = server.store.grid_clusters(
+                    cell_size, species=key[1], county=county, since=key[3], until=key[4]
+                )
+                with server.cluster_cache_lock:
+                    if server.cluster_cache_seq == seq:
+                        server.cluster_cache[key] = clusters
+                        while len(server.cluster_cache) > CLUSTER_CACHE_SIZE:
+                            server.cluster_cache.popitem(last=False)
+        except Exception as e:
+            self.send_error(500, f"Error clustering observations: {str(e)}")
+            return
+
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = bbox
+            clusters = [
+                cluster for cluster in clusters
+                if min_lat <= cluster['lat'] <= max_lat and min_lng <= cluster['lng'] <= max_lng
+            ]
+
+        body = json.dumps({
+            'zoom': zoom,
+            'cell_size': cell_size,
+            'total': sum(cluster['count'] for cluster in clusters),
+            'clusters': clusters,
+        }, separators=(',', ':'))
+        self.send_json(body.encode('utf-8'))
+
+    def serve_history(self, query):
+        """
+        Serve the merged, deduplicated sighting history in one response
+
+        Every history dump is merged into the store (by the server's background sync),
+        so each sighting appears once however many dumps contain it. The response carries the store's ingest
+        sequence; passing it back as since= returns only sightings added or changed
+        after it. Query parameters: since (ingest sequence, or a YYYY-MM-DD date to
+        limit by observation date), county (comma-separated) or nyc=1
+        """
+        if self.server.store is None:
+            self.send_error(503, "Observation store not available")
+            return
+
+        since = query.get('since', [None])[0]
+        after_seq, since_date = 0, None
+        if since and since.isdigit():
+            after_seq = int(since)
+        elif since:
+            since_date = since
+
+        county = query.get('county', [None])[0]
+        if county:
+            county = resolve_county_names(name for name in county.split(',') if name.strip())
+        elif query.get('nyc', [None])[0] == '1':
+            county = NYC_COUNTIES
+
+        try:
+            seq = self.server.store.latest_seq()
+
+            # Nothing ingested since the browser's last copy of this exact query
+            etag = '"history-%d-%s"' % (seq, hashlib.sha1(self.path.encode('utf-8')).hexdigest()[:12])
+            if etag in self.headers.get('If-None-Match', ''):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            rows = self.server.store.history(after_seq, county=county, since=since_date)
+        except Exception as e:
+            self.send_error(500, f"Error reading history: {str(e)}")
+            return
+
+        # Stored rows are already JSON; splice them instead of decoding and re-encoding
+        body = (
+            f'{{"seq":{seq},"incremental":{json.dumps(after_seq > 0)},"count":{len(rows)},"observations":['
+        ).encode('utf-8') + ','.join(rows).encode('utf-8') + b']}'
+        self._cache_headers = {'ETag': etag}
+        self.send_json(body)
+
+    def serve_history_manifest(self):
+        """Serve the history manifest (file list with date ranges, row counts and hashes)"""
+        try:
+            with self.server.history_lock:
+                manifest = self.server.history_manifest.to_dict()
+        except Exception as e:
+            self.send_error(500, f"Error reading history manifest: {str(e)}")
+            return
+        self.send_json(json.dumps(manifest).encode('utf-8'))
+
+    def serve_nearby(self, query):
+        """
+        Serve the stored sightings nearest to a point, from an in-memory KD-tree
+
+        Query parameters: lat, lng, and either radius_km (everything within it,
+        nearest first, up to limit, default 500) or k (the k nearest, default 10); species,
+        county (comma-separated) or nyc=1, since
+        """
+        if self.server.nearby is None:
+            self.send_error(503, "Observation store not available")
+            return
+
+        def param(name):
+            values = query.get(name)
+            return values[0] if values else None
+
+        try:
+            lat, lng = float(param('lat')), float(param('lng'))
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+                raise ValueError("lat/lng out of range")
+            radius_km = param('radius_km')
+            radius_km = min(float(radius_km), MAX_NEARBY_RADIUS_KM) if radius_km else None
+            default_k = DEFAULT_NEARBY_K if radius_km is None else MAX_NEARBY_RESULTS
+            k = min(int(param('k') or param('limit') or default_k), MAX_NEARBY_RESULTS)
+        except (TypeError, ValueError) as e:
+            self.send_error(400, f"Bad query: {e}")
+            return
+
+        county = param('county')
+        if county:
+            counties = resolve_county_names(name for name in county.split(',') if name.strip())
+        elif param('nyc') == '1':
+            counties = NYC_COUNTIES
+        else:
+            counties = None
+
+        filters = {'since': param('since'), 'species': param('species'), 'counties': counties, 'decode': False}
+        try:
+            if radius_km is not None:
+                results = self.server.nearby.within(lat, lng, radius_km, limit=k, **filters)
+            else:
+                results = self.server.nearby.nearest(lat, lng, k, **filters)
+        except Exception as e:
+            self.send_error(500, f"Error searching nearby sightings: {str(e)}")
+            return
+
+        # Stored rows are JSON objects; splice the distance in instead of re-encoding them
+        rows = [
+            f'{{"distance_km":{distance:.3f}' + (',' + raw[1:] if raw != '{}' else '}')
+            for distance, raw in results
+        ]
+        body = (
+            f'{{"lat":{lat},"lng":{lng},"count":{len(rows)},"observations":[' + ','.join(rows) + ']}'
+        ).encode('utf-8')
+        self.send_json(body)
+
+    def serve_metrics(self, query):
+        """Serve this process's metrics in the Prometheus text format (format=json for JSON)"""
+        if query.get('format', [None])[0] == 'json':
+            self.send_json(json.dumps(REGISTRY.snapshot()).encode('utf-8'))
+            return
+
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_live(self, query):
+        """
+        Stream newly ingested sightings as Server-Sent Events
+
+        Each 'observations' event carries a JSON array of sightings and the store's
+        ingest sequence as its ID, so reconnecting browsers (Last-Event-ID) catch up.
+        Query parameters: county (comma-separated) or nyc=1
+        """
+        live = self.server.live
+        if live is None:
+            self.send_error(503, "Observation store not available")
+            return
+        if len(live) >= MAX_LIVE_CLIENTS:
+            self.send_error(503, "Too many live viewers")
+            return
+
+        county = query.get('county', [None])[0]
+        if county:
+            counties = resolve_county_names(name for name in county.split(',') if name.strip())
+        elif query.get('nyc', [None])[0] == '1':
+            counties = NYC_COUNTIES
+        else:
+            counties = None
+
+        last_seq = self.headers.get('Last-Event-ID') or query.get('last_id', [None])[0]
+        try:
+            last_seq = int(last_seq) if last_seq else None
+        except ValueError:
+            last_seq = None
+
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        self.wfile.write(b'retry: 5000\n\n')
+
+        # Hand the socket to the broadcaster and free this thread
+        self.close_connection = True
+        live.add(self.connection, counties, last_seq)
+
 
 def main():
     """Start the web server"""
-    with socketserver.TCPServer(("", PORT), BirdMapHandler) as httpd:
+    parser = argparse.ArgumentParser(description="Serve the NY rare bird map")
+    parser.add_argument('--port', type=int, default=PORT, help=f"Port to listen on (default: {PORT})")
+    parser.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS,
+                        help=f"Connections served at once, one thread each (default: {MAX_CONNECTIONS})")
+    parser.add_argument('--history-sync-interval', type=int, default=HISTORY_SYNC_INTERVAL,
+                        help=f"Seconds between merges of new history dumps into the store, 0 to disable "
+                             f"(default: {HISTORY_SYNC_INTERVAL})")
+    parser.add_argument('--db', default=STORE_FILE,
+                        help=f"Observation store backing the /api/ endpoints (default: {STORE_FILE})")
+    args = parser.parse_args()
+
+    store = ObservationStore(args.db, county_index=load_county_index())
+
+    with BirdMapServer(("", args.port), BirdMapHandler, max_connections=args.max_connections,
+                       store=store, history_sync_interval=args.history_sync_interval) as httpd:
         print("\n" + "="*70)
         print("🦅 NEW YORK RARE BIRD ALERT - WEB SERVER")
         print("="*70)
-        print(f"\n✅ Server running at: http://localhost:{PORT}")
+        print(f"\n✅ Server running at: http://localhost:{args.port} (up to {args.max_connections} connections)")
         print(f"\n📍 Open your browser and visit:")
-        print(f"   http://localhost:{PORT}/bird_map.html")
+        print(f"   http://localhost:{args.port}/bird_map.html")
         print(f"\n💡 The website will automatically load the latest bird data")
         print(f"\n🛑 Press Ctrl+C to stop the server")
         print("="*70 + "\n")
@@ -78,6 +968,8 @@ def main():
         except KeyboardInterrupt:
             print("\n\n👋 Server stopped. Goodbye!")
             return 0
+        finally:
+            store.close()
 
 
 if __name__ == "__main__":
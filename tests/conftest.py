@@ -0,0 +1,42 @@
+"""Shared fixtures: the repository root on sys.path, a local fake eBird API and bird map servers"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_ebird_api import FakeEBirdAPI, synthetic_observations  # noqa: E402
+from benchmarks.map_server import start_map_server, stop_map_server  # noqa: E402
+
+
+@pytest.fixture
+def observations():
+    """200 synthetic NYC-area observations, newest first"""
+    return synthetic_observations(200)
+
+
+@pytest.fixture
+def fake_api(observations):
+    """Fake eBird API serving `observations` on a free local port"""
+    server = FakeEBirdAPI(('127.0.0.1', 0), observations).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def server():
+    """Start BirdMapServer instances on free local ports: server(**options) -> running server"""
+    servers = []
+
+    def start(**options):
+        servers.append(start_map_server(**options))
+        return servers[-1]
+
+    yield start
+    for running in servers:
+        stop_map_server(running)
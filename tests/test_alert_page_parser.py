@@ -0,0 +1,77 @@
+import pytest
+
+from alert_page_parser import build_tree, extract_rows, parse_login_form
+from ebird_scraper import ALERT_FIELDS, ALERT_SELECTORS, extract_alerts_from_html
+
+
+ALERT_PAGE = """
+<html><body>
+<script>var Alert = "not a row";</script>
+<div class="ResultsList">
+  <div class="Observation Alert">
+    <a class="species-name" href="/species/snoowl1">Snowy Owl</a>
+    <span class="date">15 May 2026 07:12</span>
+    <span class="location">Jones Beach SP--West End</span>
+    <span class="observer">Ada Lovelace</span>
+  </div>
+  <div class="Observation Alert">
+    <span class="species">King<br>Rail</span>
+    <time>14 May 2026</time>
+    <a class="location">Marine Park<p>Salt Marsh</a>
+  </div>
+</div>
+</body></html>
+"""
+
+
+def test_rows_and_fields_follow_the_first_matching_selector():
+    result = extract_rows(ALERT_PAGE, ALERT_SELECTORS, ALERT_FIELDS)
+
+    assert result['selector'] == ALERT_SELECTORS[0]
+    first, second = [row['fields'] for row in result['rows']]
+    assert first == {'species': 'Snowy Owl', 'date': '15 May 2026 07:12',
+                     'location': 'Jones Beach SP--West End', 'observer': 'Ada Lovelace'}
+    # Block elements separate words; a stray unclosed <p> does not swallow the row
+    assert second == {'species': 'King Rail', 'date': '14 May 2026',
+                      'location': 'Marine Park Salt Marsh', 'observer': ''}
+
+
+def test_later_selectors_are_tried_when_earlier_ones_match_nothing():
+    html = "<table><tr class='alert-row'><td><span class='species'>Red Knot</span></td></tr></table>"
+    result = extract_rows(html, ALERT_SELECTORS, ALERT_FIELDS)
+    assert result['selector'] == ALERT_SELECTORS[1]
+    assert result['rows'][0]['raw_text'] == 'Red Knot'
+
+    assert extract_rows('<p>No alerts today</p>', ALERT_SELECTORS, ALERT_FIELDS) is None
+    assert extract_alerts_from_html('<p>No alerts today</p>') == []
+
+
+def test_hidden_text_is_skipped():
+    tree = build_tree("<div>Visible<script>hidden()</script><style>.x{}</style> text</div>")
+    assert tree.text() == 'Visible text'
+
+
+def test_unsupported_xpath_is_rejected():
+    with pytest.raises(ValueError):
+        extract_rows(ALERT_PAGE, ["//div[@id='x']"], {})
+
+
+def test_login_form_includes_hidden_and_checked_fields():
+    html = """
+    <form action="/cassso/login" method="post">
+      <input id="input_username" name="username">
+      <input id="input_password" name="password" type="password">
+      <input type="hidden" name="execution" value="e1s1">
+      <input type="checkbox" name="rememberMe" value="on" checked>
+      <input type="checkbox" name="newsletter" value="on">
+      <input type="submit" value="Sign in">
+    </form>
+    """
+    form = parse_login_form(html)
+    assert form == {
+        'action': '/cassso/login',
+        'fields': {'username': '', 'password': '', 'execution': 'e1s1', 'rememberMe': 'on'},
+        'username': 'username',
+        'password': 'password',
+    }
+    assert parse_login_form('<form><input name="q"></form>') is None
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+from async_fetcher import AsyncEBirdFetcher, NY_COUNTY_CODES, TokenBucket, fetch_ny_county_sweep, merge_observations
+from ebird_api_client import EBirdAPIClient
+
+
+@pytest.mark.parametrize('rate, capacity', [(0, None), (-1, None), (float('nan'), None), (5, 0), (5, 0.5)])
+def test_token_bucket_rejects_invalid_settings(rate, capacity):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, capacity)
+
+
+def test_token_bucket_allows_burst_then_sustained_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    start = time.monotonic()
+    asyncio.run(take(5))
+    assert time.monotonic() - start < 0.05
+
+    start = time.monotonic()
+    asyncio.run(take(10))
+    assert time.monotonic() - start >= 10 / 50 * 0.9
+
+
+def test_merge_observations_dedupes_and_sorts_newest_first():
+    older = {'subId': 'S1', 'speciesCode': 'snoowl1', 'obsDt': '2026-01-01 08:00'}
+    newer = {'subId': 'S2', 'speciesCode': 'snoowl1', 'obsDt': '2026-01-02 08:00'}
+    merged = merge_observations([[older, newer], [dict(older)]])
+    assert [obs['subId'] for obs in merged] == ['S2', 'S1']
+
+
+def test_county_sweep_fetches_every_county_once(fake_api, observations):
+    with EBirdAPIClient('test-key', base_url=fake_api.base_url) as client:
+        merged = fetch_ny_county_sweep(client, max_results=1000, requests_per_second=500, max_concurrency=8)
+
+    assert fake_api.requests == len(NY_COUNTY_CODES)
+    assert len(merged) == len({(obs['subId'], obs['speciesCode']) for obs in observations})
+
+
+class FlakyClient:
+    """Answers every region with one sighting, except the regions listed as down"""
+
+    def __init__(self, down):
+        self.down = set(down)
+
+    def get_recent_observations(self, region_code, days_back=14, notable_only=False, max_results=100,
+                                raise_errors=False):
+        if region_code in self.down:
+            if raise_errors:
+                raise ConnectionError(f"{region_code} unreachable")
+            return []
+        return [{'subId': f"S-{region_code}", 'speciesCode': 'snoowl1', 'obsDt': '2026-05-01 08:00'}]
+
+
+def test_failed_regions_are_reported_not_merged_as_empty(capsys):
+    client = FlakyClient(down=['US-NY-001', 'US-NY-005'])
+    merged = fetch_ny_county_sweep(client, requests_per_second=1000)
+
+    assert len(merged) == len(NY_COUNTY_CODES) - 2
+    assert 'US-NY-001, US-NY-005' in capsys.readouterr().out
+
+
+def test_failed_regions_are_recorded_on_the_fetcher():
+    fetcher = AsyncEBirdFetcher(FlakyClient(down=['US-NY-003']), requests_per_second=1000)
+    merged = asyncio.run(fetcher.get_recent_observations(['US-NY-001', 'US-NY-003']))
+
+    assert [obs['subId'] for obs in merged] == ['S-US-NY-001']
+    assert list(fetcher.failed_regions) == ['US-NY-003']
+    assert isinstance(fetcher.failed_regions['US-NY-003'], ConnectionError)
+
+
+def test_sweep_raises_when_every_region_fails():
+    with pytest.raises(RuntimeError):
+        fetch_ny_county_sweep(FlakyClient(down=NY_COUNTY_CODES), requests_per_second=1000)
@@ -0,0 +1,60 @@
+import http.client
+import json
+import math
+from collections import Counter
+
+import pytest
+
+from observation_store import ObservationStore
+
+
+@pytest.fixture
+def store(tmp_path, observations):
+    store = ObservationStore(str(tmp_path / 'store.db'))
+    store.upsert(observations)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize('cell_size', [0.01, 0.05, 0.3])
+def test_grid_matches_flooring_every_sighting(store, observations, cell_size):
+    expected = Counter((math.floor(obs['lat'] / cell_size), math.floor(obs['lng'] / cell_size))
+                       for obs in observations)
+    clusters = store.grid_clusters(cell_size)
+
+    assert sorted(cluster['count'] for cluster in clusters) == sorted(expected.values())
+    assert sum(cluster['count'] for cluster in clusters) == len(observations)
+    for cluster in clusters:
+        assert ('sighting' in cluster) == (cluster['count'] == 1)
+        assert cluster['first'] <= cluster['last']
+
+
+def test_filters_apply_before_grouping(store, observations):
+    owls = [obs for obs in observations if obs['speciesCode'] == 'snoowl1']
+    clusters = store.grid_clusters(1.0, species='Snowy Owl', county='Kings')
+    assert sum(cluster['count'] for cluster in clusters) == \
+        sum(1 for obs in owls if obs['subnational2Name'] == 'Kings')
+    assert all(cluster['species'] == 1 for cluster in clusters)
+
+
+def test_endpoint_caches_per_ingest_and_crops_to_the_viewport(store, observations, server):
+    httpd = server(store=store)
+    conn = http.client.HTTPConnection('127.0.0.1', httpd.server_address[1], timeout=5)
+
+    def clusters(query):
+        conn.request('GET', '/api/clusters?' + query)
+        return json.loads(conn.getresponse().read())['clusters']
+
+    try:
+        everything = clusters('zoom=10')
+        assert sum(cluster['count'] for cluster in everything) == len(observations)
+        assert len(httpd.cluster_cache) == 1
+
+        west = clusters('zoom=10&bbox=-74.3,40.4,-74.0,41.0')
+        assert west and all(cluster['lng'] <= -74.0 for cluster in west)
+        assert len(httpd.cluster_cache) == 1
+
+        store.upsert([dict(observations[0], subId='S-new')])
+        assert sum(cluster['count'] for cluster in clusters('zoom=10')) == len(observations) + 1
+    finally:
+        conn.close()
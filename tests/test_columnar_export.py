@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import pytest
+
+from columnar_export import save_to_parquet, to_record
+from county_index import load_county_index
+from observation import Observation
+
+RAW = {
+    'subId': 'S1', 'speciesCode': 'snoowl1', 'comName': 'Snowy Owl', 'obsDt': '2026-01-20',
+    'howMany': 'X', 'lat': '40.58', 'lng': '-73.83', 'subnational2Code': 'US-NY-081',
+    'subnational2Name': 'Queens', 'obsValid': True,
+}
+
+
+def test_raw_rows_and_observations_give_the_same_record():
+    county_index = load_county_index()
+    record = to_record(RAW, county_index)
+
+    assert record == to_record(Observation.from_api(RAW), county_index)
+    assert record['obs_dt'] == datetime(2026, 1, 20)
+    assert record['how_many'] is None
+    assert record['lat'] == 40.58 and record['county'] == 'Queens'
+
+
+def test_parquet_partitions_merge_newest_copy(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    root = str(tmp_path / 'history')
+    save_to_parquet([RAW, dict(RAW, subId='S2', obsDt='2026-01-21 07:15')], root)
+    written = save_to_parquet([dict(RAW, howMany=3)], root)
+
+    assert written == {'2026-01-20': 1}
+    rows = pq.read_table(f"{root}/obs_date=2026-01-20/part-0.parquet").to_pylist()
+    assert [row['how_many'] for row in rows] == [3]
@@ -0,0 +1,68 @@
+import pytest
+
+from county_index import CountyIndex, load_county_index, resolve_county_names
+
+
+@pytest.fixture(scope='module')
+def county_index():
+    return load_county_index()
+
+
+# Hotspots near the water's edge, where the simplified outlines are least accurate,
+# as eBird reports them on notable rows
+@pytest.mark.parametrize('lat, lng, code, name, expected', [
+    (40.5480, -74.1280, 'US-NY-085', 'Richmond', 'Richmond'),    # Great Kills Park
+    (40.5005, -74.2515, 'US-NY-085', 'Richmond', 'Richmond'),    # Conference House Park
+    (40.8755, -73.7895, 'US-NY-005', 'Bronx', 'Bronx'),          # Hunter Island
+    (40.7003, -73.9967, 'US-NY-047', 'Kings', 'Kings'),          # Brooklyn Bridge Park
+    (40.7620, -73.9500, 'US-NY-061', 'New York', 'New York'),    # Roosevelt Island
+    (40.6163, -73.8253, 'US-NY-081', 'Queens', 'Queens'),        # Jamaica Bay Wildlife Refuge
+])
+def test_ebird_county_fields_win_over_polygons(county_index, lat, lng, code, name, expected):
+    obs = {'lat': lat, 'lng': lng, 'subnational2Code': code, 'subnational2Name': name}
+    assert county_index.county_for(obs) == expected
+    assert county_index.county_for({'lat': lat, 'lng': lng, 'subnational2Code': code}) == expected
+
+
+def test_subnational2_name_is_used_without_a_known_code(county_index):
+    obs = {'lat': 42.65, 'lng': -73.75, 'subnational2Code': 'US-NY-001', 'subnational2Name': 'Albany'}
+    assert county_index.county_for(obs) == 'Albany'
+
+
+@pytest.mark.parametrize('lat, lng, expected', [
+    (40.7812, -73.9665, 'New York'),    # Central Park
+    (40.8722, -73.9259, 'New York'),    # Inwood Hill Park
+    (40.6602, -73.9690, 'Kings'),       # Prospect Park
+    (40.7027, -73.8597, 'Queens'),      # Forest Park
+    (40.7440, -73.7436, 'Queens'),      # Alley Pond Park
+    (40.8977, -73.8862, 'Bronx'),       # Van Cortlandt Park
+    (40.5888, -74.1416, 'Richmond'),    # High Rock Park
+])
+def test_rows_without_county_fields_are_placed_by_coordinates(county_index, lat, lng, expected):
+    assert county_index.county_for({'lat': lat, 'lng': lng}) == expected
+
+
+def test_points_outside_every_polygon(county_index):
+    assert county_index.county_for({'lat': 42.65, 'lng': -73.75}) is None
+    assert county_index.classify(None, -73.9) is None
+
+
+def test_polygon_holes_are_excluded():
+    square = [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]]
+    hole = [[1, 1], [3, 1], [3, 3], [1, 3], [1, 1]]
+    index = CountyIndex([{'properties': {'county': 'Test'},
+                          'geometry': {'type': 'Polygon', 'coordinates': [square, hole]}}], cell_size=1)
+    assert index.classify(0.5, 0.5) == 'Test'
+    assert index.classify(2, 2) is None
+    assert index.classify(5, 5) is None
+
+
+def test_resolve_county_names():
+    assert resolve_county_names(['Manhattan', ' brooklyn', 'Queens', 'Albany']) == \
+        {'New York', 'Kings', 'Queens', 'Albany'}
+
+
+def test_bounds_of_a_county_boundary(county_index):
+    min_lat, min_lng, max_lat, max_lng = county_index.bounds('US-NY-061')
+    assert min_lat < 40.7620 < max_lat and min_lng < -73.9500 < max_lng
+    assert county_index.bounds('US-NY-001') is None
@@ -0,0 +1,54 @@
+import pytest
+
+import delta_detector
+from delta_detector import SeenSet
+
+
+@pytest.fixture
+def today(monkeypatch):
+    day = [20000]
+    monkeypatch.setattr(delta_detector.time, 'time', lambda: day[0] * 86400 + 3600)
+    return day
+
+
+def test_detect_splits_new_updated_withdrawn(tmp_path, observations):
+    seen = SeenSet(str(tmp_path / 'seen.bin'))
+    first = seen.detect(observations[:10])
+    assert (len(first.new), len(first.updated), len(first.withdrawn), first.unchanged) == (10, 0, 0, 0)
+
+    reviewed = dict(observations[0], obsValid=True, obsReviewed=not observations[0]['obsReviewed'])
+    withdrawn = dict(observations[1], obsValid=False)
+    later = seen.detect([reviewed, withdrawn] + observations[2:12])
+
+    assert later.updated == [reviewed]
+    assert later.withdrawn == [withdrawn]
+    assert len(later.new) == 2 and later.unchanged == 8
+
+
+def test_sightings_first_seen_invalid_are_not_alerted(tmp_path):
+    seen = SeenSet(str(tmp_path / 'seen.bin'))
+    changes = seen.detect([{'subId': 'S1', 'speciesCode': 'snoowl1', 'obsValid': False}])
+    assert changes.new == [] and len(seen) == 1
+
+
+def test_save_and_load_round_trip(tmp_path, observations, today):
+    path = str(tmp_path / 'seen.bin')
+    seen = SeenSet(path)
+    seen.detect(observations)
+    seen.save()
+
+    loaded = SeenSet(path)
+    assert loaded.entries == seen.entries
+    assert loaded.detect(observations).unchanged == len(seen)
+
+
+def test_prune_forgets_sightings_not_seen_recently(tmp_path, observations, today):
+    seen = SeenSet(str(tmp_path / 'seen.bin'))
+    seen.detect(observations[:5])
+    today[0] += 8
+    seen.detect(observations[3:10])
+
+    assert seen.prune(max_age_days=7) == 3
+    assert len(seen) == 7
+    seen.save()
+    assert len(SeenSet(seen.path)) == 7
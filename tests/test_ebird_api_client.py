@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+import requests
+
+from ebird_api_client import EBirdAPIClient
+from response_cache import ResponseCache
+
+
+def test_fetches_reuse_the_pooled_session(fake_api):
+    with EBirdAPIClient('test-key', base_url=fake_api.base_url) as client:
+        first = client.get_notable_observations('US-NY', max_results=50)
+        second = client.get_notable_observations('US-NY', max_results=50)
+
+    assert len(first) == len(second) == 50
+    assert first[0].species_code == fake_api.observations[0]['speciesCode']
+    assert fake_api.requests == 2
+
+
+def test_context_manager_closes_session_and_cache(fake_api, tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    closed = []
+    with EBirdAPIClient('test-key', base_url=fake_api.base_url, cache=cache) as client:
+        monkeypatch.setattr(client.session, 'close', lambda: closed.append('session'))
+        client.get_notable_observations('US-NY', max_results=10)
+
+    assert closed == ['session']
+    with pytest.raises(sqlite3.ProgrammingError):
+        cache.lookup(f"{fake_api.base_url}/data/obs/US-NY/recent/notable", {})
+
+
+def test_request_errors_are_swallowed_unless_raise_errors(fake_api):
+    with EBirdAPIClient('test-key', base_url=f"{fake_api.base_url}/missing", max_retries=0) as client:
+        assert client.get_notable_observations('US-NY') == []
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get_notable_observations('US-NY', raise_errors=True)
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get_nearby_observations(40.7, -74.0, raise_errors=True)
@@ -0,0 +1,112 @@
+import glob
+import json
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import delta_detector
+from benchmarks.fake_ebird_api import synthetic_observations
+from delta_detector import SeenSet
+from ebird_api_client import EBirdAPIClient
+from ebird_daemon import PollingDaemon
+from observation_store import ObservationStore
+
+
+class NewSightingsClient:
+    """Stand-in client that reports two fresh sightings on every poll"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_notable_observations(self, region, days_back=7, max_results=100, raise_errors=False):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        today = datetime.now().strftime('%Y-%m-%d %H:%M')
+        return [dict(obs, subId=f"S{calls}-{i}", obsDt=today, obsValid=True)
+                for i, obs in enumerate(synthetic_observations(2, seed=calls))]
+
+
+@pytest.fixture
+def daemon_factory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ObservationStore(str(tmp_path / 'birds.db'))
+
+    def make(client=None, **options):
+        options.setdefault('health_port', None)
+        options.setdefault('seen', SeenSet(str(tmp_path / 'seen.bin')))
+        return PollingDaemon(client or NewSightingsClient(), ['US-NY-061', 'US-NY-047'], store, **options)
+
+    yield make
+    store.close()
+
+
+def test_live_snapshot_is_coalesced_and_outside_history(daemon_factory, monkeypatch):
+    daemon = daemon_factory(base_interval=0.01, min_interval=0.01, max_interval=0.02,
+                            publish_interval=0.3)
+    publishes = []
+    publish = daemon.publish_snapshot
+    monkeypatch.setattr(daemon, 'publish_snapshot', lambda: (publishes.append(time.monotonic()), publish()))
+
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    time.sleep(1.0)
+    daemon.stop()
+    thread.join(5)
+
+    polls = daemon.client.calls
+    assert polls > 20
+    assert 2 <= len(publishes) <= 6
+    assert all(b - a >= 0.29 for a, b in zip(publishes, publishes[1:-1]))
+
+    # The final publish on shutdown covers every poll
+    assert len(json.load(open(daemon.live_file))) == 2 * polls
+    assert open('ny_rare_birds_latest.txt').read().strip() == daemon.live_file
+    assert glob.glob('ny_rare_birds_*.json') == []
+    assert not glob.glob('history_manifest.json')
+
+
+def test_poll_prunes_seen_set_to_the_window(daemon_factory, monkeypatch):
+    daemon = daemon_factory(days_back=7)
+    now = time.time()
+    monkeypatch.setattr(delta_detector.time, 'time', lambda: now - 30 * 86400)
+    daemon.seen.detect([{'subId': 'S-old', 'speciesCode': 'snoowl1', 'obsValid': True}])
+    monkeypatch.setattr(delta_detector.time, 'time', lambda: now)
+
+    daemon.poll('US-NY-061')
+    assert len(daemon.seen) == 2
+    daemon.poll('US-NY-047')
+    assert len(SeenSet(daemon.seen.path)) == 4
+
+
+def test_unreachable_api_backs_off_and_reports_degraded(daemon_factory):
+    # A port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    with EBirdAPIClient('test-key', base_url=f"http://127.0.0.1:{port}/v2", max_retries=0) as client:
+        daemon = daemon_factory(client=client, base_interval=100, max_interval=1000)
+        daemon._poll_and_reschedule('US-NY-061')
+        daemon._poll_and_reschedule('US-NY-061')
+
+    state = daemon.regions['US-NY-061']
+    assert state.errors == state.consecutive_errors == 2
+    assert state.last_success is None
+    assert state.interval == 400
+    assert daemon.health()['status'] == 'degraded'
+    assert daemon.health()['stale_regions'] == ['US-NY-061']
+
+
+def test_new_rows_speed_up_polling_without_a_seen_set(daemon_factory):
+    daemon = daemon_factory(seen=None, base_interval=100, min_interval=10)
+    daemon._poll_and_reschedule('US-NY-061')
+
+    state = daemon.regions['US-NY-061']
+    assert state.last_changed == 2
+    assert state.interval == 50
+    assert daemon.health()['status'] == 'ok'
@@ -0,0 +1,83 @@
+import math
+
+import pytest
+
+from ebird_reference import ReferenceData, normalize_name
+
+
+TAXONOMY = [
+    {'speciesCode': 'bkcchi', 'comName': 'Black-capped Chickadee', 'sciName': 'Poecile atricapillus',
+     'taxonOrder': 29000, 'bandingCodes': ['BCCH'], 'category': 'species', 'extinct': False},
+    {'speciesCode': 'snoowl1', 'comName': 'Snowy Owl', 'sciName': 'Bubo scandiacus',
+     'taxonOrder': 12000, 'bandingCodes': ['SNOW'], 'category': 'species'},
+    {'speciesCode': 'snogoo', 'comName': 'Snow Goose', 'sciName': 'Anser caerulescens',
+     'taxonOrder': 300, 'bandingCodes': ['SNGO'], 'category': 'species'},
+]
+
+
+class ReferenceClient:
+    def __init__(self, version='2025'):
+        self.version = version
+        self.calls = []
+
+    def get_taxonomy_versions(self):
+        self.calls.append('versions')
+        return [{'authorityVer': 2024, 'latest': False}, {'authorityVer': self.version, 'latest': True}]
+
+    def get_taxonomy(self):
+        self.calls.append('taxonomy')
+        return TAXONOMY
+
+    def get_hotspots(self, region_code):
+        self.calls.append('hotspots')
+        return [{'locId': 'L109516', 'locName': 'Central Park', 'subnational2Code': 'US-NY-061',
+                 'lat': 40.78, 'lng': -73.97, 'numSpeciesAllTime': 290}]
+
+    def get_subregions(self, region_code):
+        return [{'code': 'US-NY-061', 'name': 'New York'}]
+
+
+@pytest.fixture
+def reference(tmp_path):
+    reference = ReferenceData(str(tmp_path / 'reference.json'))
+    reference.refresh(ReferenceClient())
+    return reference
+
+
+def test_lookups_by_any_name(reference):
+    for name in ('Black-capped Chickadee', 'black capped chickadee', 'poecile atricapillus', 'BCCH', 'bkcchi'):
+        assert reference.species_code(name) == 'bkcchi'
+    assert reference.species_code('Dodo') is None
+    assert normalize_name("Wilson’s  Phalarope") == 'wilsons phalarope'
+    assert 'extinct' not in reference.species('bkcchi')
+
+
+def test_taxonomic_sort_puts_unknown_species_last(reference):
+    observations = [{'speciesCode': code} for code in ('mystery', 'bkcchi', 'snogoo', 'snoowl1')]
+    assert [obs['speciesCode'] for obs in reference.sort_taxonomic(observations)] == \
+        ['snogoo', 'snoowl1', 'bkcchi', 'mystery']
+    assert reference.taxon_order('mystery') == math.inf
+
+
+def test_county_from_hotspot_then_feed(reference):
+    assert reference.county_for({'locId': 'L109516', 'subnational2Name': 'Kings'}) == 'New York'
+    assert reference.county_for({'locId': 'L1', 'subnational2Name': 'Kings'}) == 'Kings'
+
+
+def test_taxonomy_is_downloaded_again_only_for_a_new_version(reference, monkeypatch):
+    assert not reference.is_stale()
+    reloaded = ReferenceData(reference.path)
+    assert len(reloaded) == 3 and reloaded.taxonomy_version == '2025'
+
+    client = ReferenceClient()
+    assert reloaded.refresh(client) == []
+    assert client.calls == []
+
+    later = math.floor(reloaded.data['taxonomy_checked_at']) + 31 * 86400
+    monkeypatch.setattr('ebird_reference.time.time', lambda: later)
+    assert reloaded.refresh(client) == ['hotspots']
+    assert 'taxonomy' not in client.calls
+
+    monkeypatch.setattr('ebird_reference.time.time', lambda: later + 31 * 86400)
+    assert reloaded.refresh(ReferenceClient(version='2026')) == ['taxonomy', 'hotspots']
+    assert ReferenceData(reference.path).taxonomy_version == '2026'
@@ -0,0 +1,192 @@
+import json
+import os
+import stat
+from types import SimpleNamespace
+
+import pytest
+
+import ebird_scraper
+from ebird_scraper import ALERT_FIELDS, ALERT_SELECTORS, DriverPool, EBirdScraper, _alerts_from_rows
+
+ALERT_URL = "https://ebird.org/alert/summary?sid=SN35466"
+LOGIN_URL = "https://secure.birds.cornell.edu/cassso/login?service=https://ebird.org/login/cas"
+
+
+class StubWebDriverException(Exception):
+    pass
+
+
+# The real class when Selenium is installed, so the scraper's except clauses match
+WebDriverException = getattr(ebird_scraper, 'WebDriverException', StubWebDriverException)
+
+
+class StubDriver:
+    """
+    Just enough of a Chrome WebDriver: pages, a cookie jar checked against the current
+    domain like the real one, and a signed-in state decided by the 'EBIRD_SESSION' cookie
+    """
+
+    started = 0
+
+    def __init__(self, options=None):
+        StubDriver.started += 1
+        self.url = 'about:blank'
+        self.cookies = []
+        self.visits = []
+        self.dead = False
+        self.quit_calls = 0
+        self.scripts = []
+        self.script_result = None
+
+    @property
+    def current_url(self):
+        if self.dead:
+            raise WebDriverException('chrome not reachable')
+        return self.url
+
+    def signed_in(self):
+        return any(cookie['name'] == 'EBIRD_SESSION' and cookie['value'] == 'valid' for cookie in self.cookies)
+
+    def get(self, url):
+        self.visits.append(url)
+        self.url = LOGIN_URL if url == ALERT_URL and not self.signed_in() else url
+
+    def add_cookie(self, cookie):
+        domain = cookie['domain'].lstrip('.')
+        if not self.url.startswith(f"https://{domain}/"):
+            raise WebDriverException(f"invalid cookie domain for {self.url}")
+        self.cookies.append(dict(cookie))
+
+    def get_cookies(self):
+        return [dict(cookie) for cookie in self.cookies]
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        return self.script_result
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+@pytest.fixture
+def stub_chrome(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ebird_scraper, 'webdriver', SimpleNamespace(Chrome=StubDriver))
+    monkeypatch.setattr(ebird_scraper, 'chrome_options', lambda headless=True: None)
+    monkeypatch.setattr(ebird_scraper, 'WebDriverWait', lambda driver, timeout: None, raising=False)
+    monkeypatch.setattr(ebird_scraper, 'WebDriverException', WebDriverException, raising=False)
+    StubDriver.started = 0
+
+
+SESSION_COOKIES = [
+    {'name': 'EBIRD_SESSION', 'value': 'valid', 'domain': '.ebird.org', 'path': '/', 'secure': True,
+     'httpOnly': True, 'expiry': 1893456000.0},
+    {'name': 'CASTGC', 'value': 'ticket', 'domain': 'secure.birds.cornell.edu', 'path': '/cassso',
+     'secure': True, 'httpOnly': True},
+]
+
+
+def test_pool_reuses_live_drivers_and_replaces_dead_ones(stub_chrome):
+    with DriverPool(size=1) as pool:
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+
+        second = pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        assert len(pool) == 1 and second.quit_calls == 1
+
+        first.dead = True
+        replacement = pool.acquire()
+        assert replacement is not first and first.quit_calls == 1
+        pool.release(replacement)
+
+    assert StubDriver.started == 3
+    assert replacement.quit_calls == 1
+
+
+def test_released_driver_stays_signed_in_for_the_next_scraper(stub_chrome, capsys):
+    with DriverPool() as pool:
+        with EBirdScraper('user', 'pass', pool=pool, session_file=None) as scraper:
+            scraper.driver.cookies = [dict(cookie) for cookie in SESSION_COOKIES]
+            driver = scraper.driver
+
+        with EBirdScraper('user', 'pass', pool=pool, session_file=None) as scraper:
+            assert scraper.driver is driver
+            scraper.login()
+
+    assert StubDriver.started == 1
+    assert 'Already logged in' in capsys.readouterr().out
+
+
+def test_saved_cookies_restore_the_session_in_a_new_browser(stub_chrome, capsys):
+    with EBirdScraper('user', 'pass') as scraper:
+        scraper.driver.cookies = [dict(cookie) for cookie in SESSION_COOKIES]
+        scraper.save_session()
+
+    assert stat.S_IMODE(os.stat(ebird_scraper.SESSION_FILE).st_mode) == 0o600
+    assert json.load(open(ebird_scraper.SESSION_FILE)) == SESSION_COOKIES
+
+    with EBirdScraper('user', 'pass') as scraper:
+        driver = scraper.driver
+        scraper.login()
+
+    assert 'Login successful! (saved session)' in capsys.readouterr().out
+    # Each cookie is added from a page on its own domain, then the alert page is reopened
+    assert 'https://ebird.org/robots.txt' in driver.visits
+    assert 'https://secure.birds.cornell.edu/robots.txt' in driver.visits
+    assert driver.visits[-1] == ALERT_URL
+    assert {cookie['name'] for cookie in driver.cookies} == {'EBIRD_SESSION', 'CASTGC'}
+    assert type(next(c for c in driver.cookies if 'expiry' in c)['expiry']) is int
+
+
+def test_expired_or_unreadable_session_falls_back_to_the_login_form(stub_chrome):
+    with open(ebird_scraper.SESSION_FILE, 'w') as f:
+        json.dump([dict(SESSION_COOKIES[0], value='expired')], f)
+    with EBirdScraper('user', 'pass') as scraper:
+        assert scraper._restore_session() is False
+
+    with open(ebird_scraper.SESSION_FILE, 'w') as f:
+        f.write('{not json')
+    with EBirdScraper('user', 'pass') as scraper:
+        assert scraper._restore_session() is False
+        assert scraper.driver.visits == []
+
+
+# What EXTRACT_ALERTS_SCRIPT returns: the first matching selector and, per row, every
+# ALERT_FIELDS text ('' when missing) plus the row's full text
+SCRIPT_RESULT = {
+    'selector': ALERT_SELECTORS[0],
+    'rows': [
+        {'fields': {'species': 'Snowy Owl', 'date': '15 May 2026 07:12', 'location': 'Jones Beach SP--West End',
+                    'observer': 'Ada Lovelace'},
+         'raw_text': 'Snowy Owl 15 May 2026 07:12 Jones Beach SP--West End Ada Lovelace'},
+        {'fields': {'species': '', 'date': '', 'location': '', 'observer': ''},
+         'raw_text': 'King Rail - Marine Park Salt Marsh'},
+        {'fields': {'species': '', 'date': '', 'location': '', 'observer': ''}, 'raw_text': ''},
+    ],
+}
+
+
+def test_alerts_from_script_rows(capsys):
+    alerts = _alerts_from_rows(SCRIPT_RESULT)
+
+    assert len(alerts) == 2
+    assert alerts[0]['species'] == 'Snowy Owl' and alerts[0]['observer'] == 'Ada Lovelace'
+    assert alerts[0]['count'] == '' and 'raw_text' not in alerts[0]
+    assert alerts[1]['raw_text'] == 'King Rail - Marine Park Salt Marsh'
+    assert f"Found 3 alerts using selector: {ALERT_SELECTORS[0]}" in capsys.readouterr().out
+
+    assert _alerts_from_rows(None) is None
+    assert _alerts_from_rows({'selector': ALERT_SELECTORS[0], 'rows': []}) is None
+
+
+def test_batch_extraction_is_one_script_call(stub_chrome):
+    with EBirdScraper('user', 'pass', session_file=None) as scraper:
+        scraper.driver.script_result = SCRIPT_RESULT
+        alerts = scraper._extract_alerts_batch()
+        scripts = scraper.driver.scripts
+
+    assert [alert['species'] for alert in alerts] == ['Snowy Owl', '']
+    assert scripts == [(ebird_scraper.EXTRACT_ALERTS_SCRIPT, (ALERT_SELECTORS, ALERT_FIELDS))]
@@ -0,0 +1,153 @@
+import math
+import random
+import threading
+
+import pytest
+
+from county_index import CountyIndex
+from fetch_planner import FetchPlanner, fetch_complete
+
+
+class FakeRegionClient:
+    """
+    Client over a fixed set of sightings that truncates every answer at max_results,
+    newest first, the way eBird does
+    """
+
+    def __init__(self, observations, down=()):
+        self.observations = sorted(observations, key=lambda obs: obs['obsDt'], reverse=True)
+        self.down = set(down)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _answer(self, call, matches, max_results):
+        with self._lock:
+            self.calls.append(call)
+        return [dict(obs) for obs in matches][:max_results]
+
+    def get_recent_observations(self, region_code, days_back=7, notable_only=True, max_results=100,
+                                raise_errors=False):
+        if region_code in self.down:
+            raise ConnectionError(f"{region_code} unreachable")
+        matches = (obs for obs in self.observations if obs['subnational2Code'].startswith(region_code))
+        return self._answer(('region', region_code), matches, max_results)
+
+    def get_nearby_observations(self, lat, lng, distance_km=25, days_back=7, max_results=100, notable_only=True,
+                                raise_errors=False):
+        matches = (obs for obs in self.observations if distance(lat, lng, obs['lat'], obs['lng']) <= distance_km)
+        return self._answer(('geo', lat, lng, distance_km), matches, max_results)
+
+
+def distance(lat1, lng1, lat2, lng2):
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def sightings(county, count, lat, lng, spread, seed):
+    rng = random.Random(seed)
+    return [{
+        'subId': f"S{county}-{i}",
+        'speciesCode': 'snoowl1',
+        'obsDt': f"2026-05-{1 + i % 14:02d} {i % 24:02d}:00",
+        'lat': lat + rng.uniform(-spread, spread),
+        'lng': lng + rng.uniform(-spread, spread),
+        'subnational2Code': f"US-XX-{county}",
+    } for i in range(count)]
+
+
+@pytest.fixture
+def saturated_region():
+    # County 001 fits one response; county 002 has no subregions and needs geo tiles
+    observations = sightings('001', 15, 42.0, -75.0, 0.05, seed=1) + sightings('002', 90, 40.7, -74.0, 0.08, seed=2)
+    return FakeRegionClient(observations)
+
+
+def square(code, min_lat, min_lng, max_lat, max_lng):
+    ring = [[min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]]
+    return {'type': 'Feature', 'properties': {'county': code, 'county_code': code},
+            'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+
+
+# Boundaries of the test counties that have no subregions
+COUNTIES = CountyIndex([
+    square('US-XX-002', 40.55, -74.15, 40.85, -73.85),
+    square('US-XX-003', 40.55, -74.15, 41.65, -73.85),
+])
+
+
+def plan(client, **options):
+    options.setdefault('county_index', COUNTIES)
+    return FetchPlanner(client, max_results=20, subregions={'US-XX': ['US-XX-001', 'US-XX-002']},
+                        requests_per_second=1000, **options)
+
+
+def test_saturated_region_is_split_until_complete(saturated_region):
+    planner = plan(saturated_region)
+    observations = planner.fetch('US-XX')
+
+    assert len(observations) == 105
+    assert {obs['subId'] for obs in observations} == {obs['subId'] for obs in saturated_region.observations}
+    assert planner.truncated == []
+    assert planner.splits >= 3
+    assert planner.requests == len(saturated_region.calls)
+    assert ('region', 'US-XX-001') in saturated_region.calls
+    assert any(call[0] == 'geo' for call in saturated_region.calls)
+
+
+def test_request_cap_reports_incomplete_coverage(saturated_region, capsys):
+    planner = plan(saturated_region, max_requests=4)
+    observations = planner.fetch('US-XX')
+
+    assert planner.requests <= 4
+    assert planner.truncated
+    assert len(observations) < 105
+    assert 'coverage may be incomplete' in capsys.readouterr().out
+
+
+def test_unsaturated_region_takes_one_request():
+    client = FakeRegionClient(sightings('001', 15, 42.0, -75.0, 0.05, seed=1))
+    assert len(fetch_complete(client, 'US-XX', max_results=20, requests_per_second=1000)) == 15
+    assert client.calls == [('region', 'US-XX')]
+
+
+@pytest.fixture
+def two_clusters():
+    # The newest sightings sit in the south of county 003, the older ones ~90 km north,
+    # so the truncated first answer says nothing about the northern cluster
+    south = [dict(obs, obsDt='2026-05-14 08:00') for obs in sightings('003', 40, 40.7, -74.0, 0.02, seed=3)]
+    north = [dict(obs, subId=f"N{i}", obsDt='2026-05-01 08:00')
+             for i, obs in enumerate(sightings('003', 10, 41.5, -74.0, 0.02, seed=4))]
+    return FakeRegionClient(south + north)
+
+
+def test_county_boundary_covers_sightings_outside_the_sample(two_clusters):
+    planner = plan(two_clusters)
+    observations = planner.fetch('US-XX-003')
+
+    assert len(observations) == 50
+    assert planner.truncated == []
+
+
+def test_sample_extent_without_a_boundary_is_reported_incomplete(two_clusters, capsys):
+    planner = plan(two_clusters, county_index=None)
+    observations = planner.fetch('US-XX-003')
+
+    assert len(observations) == 40
+    assert [task.target for task in planner.truncated] == ['US-XX-003']
+    assert 'coverage may be incomplete' in capsys.readouterr().out
+
+
+def test_failed_requests_are_reported_not_treated_as_complete(capsys):
+    observations = sightings('001', 15, 42.0, -75.0, 0.05, seed=1) + sightings('002', 15, 40.7, -74.0, 0.08, seed=2)
+    client = FakeRegionClient(observations, down=['US-XX-001'])
+
+    planner = plan(client)
+    fetched = planner.fetch('US-XX')
+
+    assert len(fetched) < 30
+    assert [task.target for task in planner.failed] == ['US-XX-001']
+    assert planner.truncated == []
+    assert planner.requests == 3
+    assert 'queries failed; coverage is incomplete' in capsys.readouterr().out
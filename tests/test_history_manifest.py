@@ -0,0 +1,74 @@
+import http.client
+import json
+import os
+import time
+
+import pytest
+
+from history_manifest import HistoryManifest
+from observation_store import ObservationStore
+
+
+def write_dump(name, observations, age=0):
+    with open(name, 'w', encoding='utf-8') as f:
+        json.dump(observations, f)
+    if age:
+        stamp = time.time() - age
+        os.utime(name, (stamp, stamp))
+
+
+@pytest.fixture
+def history_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_refresh_reports_only_new_or_changed_files(history_dir, observations):
+    write_dump('ny_rare_birds_20260501_0730.json', observations[:50])
+    write_dump('ny_rare_birds_20260502_0730.json', observations[50:80])
+    manifest = HistoryManifest()
+    assert manifest.refresh() == ['ny_rare_birds_20260501_0730.json', 'ny_rare_birds_20260502_0730.json']
+    assert HistoryManifest().to_dict()['total_rows'] == 80
+
+    # Touched but identical files are not reported again
+    os.utime('ny_rare_birds_20260501_0730.json')
+    assert manifest.refresh() == []
+
+    write_dump('ny_rare_birds_20260502_0730.json', observations[50:90])
+    os.remove('ny_rare_birds_20260501_0730.json')
+    assert manifest.refresh() == ['ny_rare_birds_20260502_0730.json']
+    summary = manifest.to_dict()
+    assert [entry['file'] for entry in summary['files']] == ['ny_rare_birds_20260502_0730.json']
+    assert summary['total_rows'] == 40
+
+
+def test_sync_keeps_newer_store_rows_and_never_runs_per_request(history_dir, observations, server):
+    store = ObservationStore(str(history_dir / 'store.db'))
+    reviewed = [dict(obs, obsValid=True, obsReviewed=True) for obs in observations[:10]]
+    store.upsert(reviewed)
+    seq = store.latest_seq()
+
+    # An hour-old dump from before the reviews, plus one sighting the store lacks
+    stale = [dict(obs, obsValid=False, obsReviewed=False) for obs in observations[:11]]
+    write_dump('ny_rare_birds_20260515_0730.json', stale, age=3600)
+
+    httpd = server(store=store)
+    try:
+        httpd.sync_history()
+        assert store.count() == 11
+        assert [obs['subId'] for obs in store.changes_since(seq)] == [observations[10]['subId']]
+        assert all(obs['obsReviewed'] for obs in store.changes_since(0) if obs['subId'] != observations[10]['subId'])
+
+        # A dump written after startup is merged by the sync, not by /api/history
+        write_dump('ny_rare_birds_20260516_0730.json', observations[11:20])
+        conn = http.client.HTTPConnection('127.0.0.1', httpd.server_address[1], timeout=5)
+        conn.request('GET', '/api/history')
+        assert json.loads(conn.getresponse().read())['count'] == 11
+        conn.request('GET', '/api/history/manifest')
+        assert len(json.loads(conn.getresponse().read())['files']) == 1
+        conn.close()
+
+        httpd.sync_history()
+        assert store.count() == 20
+    finally:
+        store.close()
@@ -0,0 +1,86 @@
+import gzip
+import http.client
+import json
+import os
+
+import pytest
+
+import start_bird_website
+from ebird_api_client import update_latest_pointer
+from start_bird_website import LatestDataCache
+
+
+def write_dump(name, rows, mtime):
+    with open(name, 'w', encoding='utf-8') as f:
+        json.dump(rows, f)
+    os.utime(name, (mtime, mtime))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_dump('ny_rare_birds_20260514_0730.json', [{'subId': 'S1'}], 1_000_000)
+    write_dump('ny_rare_birds_20260515_0730.json', [{'subId': 'S2'}], 2_000_000)
+    return tmp_path
+
+
+def test_newest_file_without_a_pointer(data_dir):
+    payload = LatestDataCache().get()
+    assert payload['file'] == 'ny_rare_birds_20260515_0730.json'
+    assert json.loads(gzip.decompress(payload['gzip'])) == json.loads(payload['identity'])
+
+
+def test_pointer_wins_and_changes_are_picked_up(data_dir):
+    cache = LatestDataCache()
+    update_latest_pointer('ny_rare_birds_20260514_0730.json')
+    first = cache.get()
+    assert first['file'] == 'ny_rare_birds_20260514_0730.json'
+    assert cache.get() is first
+
+    write_dump('ny_rare_birds_20260514_0730.json', [{'subId': 'S1'}, {'subId': 'S3'}], 3_000_000)
+    second = cache.get()
+    assert second is not first and second['etag'] != first['etag']
+
+    # A pointer to a missing file falls back to the newest dump
+    update_latest_pointer('ny_rare_birds_gone.json')
+    assert cache.get()['file'] == 'ny_rare_birds_20260514_0730.json'
+
+
+
+def test_fallback_scans_the_configured_directory(data_dir, tmp_path_factory, monkeypatch):
+    monkeypatch.chdir(tmp_path_factory.mktemp('elsewhere'))
+    cache = LatestDataCache(directory=str(data_dir))
+    assert cache.get()['file'] == str(data_dir / 'ny_rare_birds_20260515_0730.json')
+
+
+def test_fallback_scan_is_reused_until_something_changes(data_dir, monkeypatch):
+    scans = []
+    real_glob = start_bird_website.glob.glob
+    monkeypatch.setattr(start_bird_website.glob, 'glob', lambda pattern: scans.append(pattern) or real_glob(pattern))
+
+    cache = LatestDataCache()
+    update_latest_pointer('ny_rare_birds_gone.json')
+    for _ in range(3):
+        assert cache.get()['file'] == 'ny_rare_birds_20260515_0730.json'
+    assert len(scans) == 1
+
+    update_latest_pointer('ny_rare_birds_also_gone.json')
+    cache.get()
+    assert len(scans) == 2
+
+
+def test_etag_revalidation_and_encoding(data_dir, monkeypatch, server):
+    monkeypatch.setattr(start_bird_website, 'latest_data_cache', LatestDataCache())
+    conn = http.client.HTTPConnection('127.0.0.1', server().server_address[1], timeout=5)
+    try:
+        conn.request('GET', '/get_latest_data.php', headers={'Accept-Encoding': 'gzip'})
+        response = conn.getresponse()
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert json.loads(gzip.decompress(response.read())) == [{'subId': 'S2'}]
+
+        conn.request('GET', '/get_latest_data.php', headers={'If-None-Match': response.getheader('ETag')})
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 304
+    finally:
+        conn.close()
@@ -0,0 +1,30 @@
+from metrics import Counter, Histogram, Registry, endpoint_label
+
+
+def test_mixed_label_types_render_and_snapshot():
+    registry = Registry()
+    requests = registry.register(Counter('requests_total', 'Requests', ['endpoint', 'status']))
+    requests.inc(endpoint='/obs', status=200)
+    requests.inc(endpoint='/obs', status='cache')
+    requests.inc(endpoint='/obs', status=200)
+
+    assert requests.value(endpoint='/obs', status=200) == 2
+    assert 'requests_total{endpoint="/obs",status="200"} 2' in registry.render()
+    assert {row['status']: row['value'] for row in registry.snapshot()['requests_total']} == {'200': 2, 'cache': 1}
+
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram('latency_seconds', 'Latency', ['route'], buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, route='/a')
+    lines = latency.render()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_endpoint_label_replaces_ids():
+    assert endpoint_label('https://api.ebird.org/v2/data/obs/US-NY-061/recent/notable?back=7') == \
+        '/data/obs/{id}/recent/notable'
@@ -0,0 +1,72 @@
+import json
+import tracemalloc
+
+from benchmarks.fake_ebird_api import synthetic_observations
+from observation import Observation, as_dict
+
+NOTABLE_FIELDS = {
+    'subnational1Code': 'US-NY', 'subnational1Name': 'New York', 'subnational2Code': 'US-NY-081',
+    'subnational2Name': 'Queens', 'countryCode': 'US', 'countryName': 'United States',
+    'obsId': 'OBS1', 'checklistId': 'CL1', 'presenceNoted': False, 'firstName': 'Ann',
+    'lastName': 'Lee', 'hasComments': True, 'hasRichMedia': False, 'evidence': 'P',
+}
+
+
+def notable_rows(count):
+    rows = synthetic_observations(count)
+    for i, row in enumerate(rows):
+        row.update(NOTABLE_FIELDS, obsId=f"OBS{i}", checklistId=f"CL{i}")
+    # Decode from text like a real response, so no strings are shared up front
+    return json.loads(json.dumps(rows))
+
+
+def test_round_trip_and_typed_fields():
+    row = dict(notable_rows(1)[0], howMany='X', obsDt='2026-01-20', futureField=1)
+    obs = Observation.from_api(row)
+
+    assert obs.to_dict() == row
+    assert obs.how_many is None and obs.obs_dt_text == '2026-01-20'
+    assert obs.subnational2_code == 'US-NY-081' and obs.get('subnational2Name') == 'Queens'
+    assert obs.extra == {'futureField': 1, 'howMany': 'X'}
+    assert as_dict(obs) == obs.to_dict()
+
+
+def test_uncounted_sightings_keep_their_x():
+    row = dict(notable_rows(1)[0], howMany='X')
+    obs = Observation.from_api(row)
+
+    assert obs.how_many is None
+    assert obs.get('howMany') == obs['howMany'] == 'X'
+    assert obs.to_dict()['howMany'] == 'X'
+    assert obs.to_formatted()['how_many'] == 'X'
+    assert Observation.from_api(dict(row, howMany=3)).to_formatted()['how_many'] == 3
+    assert Observation.from_api({k: v for k, v in row.items() if k != 'howMany'}).to_formatted()['how_many'] == ''
+
+
+def test_notable_rows_need_no_extra_dict():
+    assert all(Observation.from_api(row).extra is None for row in notable_rows(20))
+
+
+def test_repeated_strings_are_shared():
+    first, second = (Observation.from_api(row) for row in notable_rows(2))
+    assert first.country_name is second.country_name
+    assert first.subnational1_name is second.subnational1_name
+
+
+def test_observations_use_much_less_memory_than_dicts():
+    text = json.dumps(notable_rows(5000))
+
+    tracemalloc.start()
+    try:
+        dicts = json.loads(text)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        del dicts
+
+        base = tracemalloc.get_traced_memory()[0]
+        observations = [Observation.from_api(row) for row in json.loads(text)]
+        observation_bytes = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+
+    assert len(observations) == 5000
+    assert observation_bytes < dict_bytes * 0.5
@@ -0,0 +1,37 @@
+from observation import Observation
+from observation_stats import compute_stats, summarize_observations
+from observation_store import ObservationStore
+
+
+def row(species, day, loc='L1', county='Kings'):
+    return (species, species.title(), loc, f"Hotspot {loc}", county, f"{day} 07:00")
+
+
+def test_counts_and_streaks():
+    rows = [row('snoowl1', day) for day in ('2026-05-10', '2026-05-11', '2026-05-12', '2026-05-14', '2026-05-15')]
+    rows += [row('redkno', '2026-05-15', loc='L2', county=None), row('redkno', '2026-05-15', loc='L2')]
+    stats = compute_stats(rows, top_n=1)
+
+    assert stats['total'] == 7 and stats['unique_species'] == 2
+    assert stats['top_species'] == [{'species_code': 'snoowl1', 'name': 'Snoowl1', 'count': 5}]
+    assert stats['top_hotspots'] == [{'loc_id': 'L1', 'name': 'Hotspot L1', 'count': 5}]
+    assert stats['by_county'] == {'Kings': 6, 'Unknown': 1}
+    assert stats['by_day']['2026-05-15'] == 3
+
+    owl = stats['species']['snoowl1']
+    assert (owl['longest_streak'], owl['current_streak'], owl['days_reported']) == (3, 2, 5)
+    assert (owl['first_seen'], owl['last_seen']) == ('2026-05-10 07:00', '2026-05-15 07:00')
+
+
+def test_same_answer_from_dicts_observations_and_the_store(tmp_path, observations):
+    expected = summarize_observations(observations)
+    assert summarize_observations([Observation.from_api(obs) for obs in observations]) == expected
+
+    with ObservationStore(str(tmp_path / 'store.db')) as store:
+        store.upsert(observations)
+        assert compute_stats(store.stats_rows()) == expected
+
+
+def test_empty_batch():
+    stats = compute_stats([])
+    assert stats['total'] == 0 and stats['species'] == {} and stats['by_day'] == {}
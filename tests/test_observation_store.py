@@ -0,0 +1,103 @@
+import json
+import threading
+
+import pytest
+
+from benchmarks.fake_ebird_api import synthetic_observations
+from observation_store import ObservationStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ObservationStore(str(tmp_path / 'store.db'))
+    yield store
+    store.close()
+
+
+def test_upsert_only_rewrites_changed_sightings(store, observations):
+    assert store.upsert(observations) == {'inserted': 200, 'updated': 0, 'unchanged': 0}
+    seq = store.latest_seq()
+
+    changed = dict(observations[0], howMany=99)
+    assert store.upsert([changed] + observations[1:]) == {'inserted': 0, 'updated': 1, 'unchanged': 199}
+    assert store.latest_seq() == seq + 1
+    assert [obs['howMany'] for obs in store.changes_since(seq)] == [99]
+
+
+def test_older_batch_does_not_revert_a_newer_sighting(store, observations):
+    reviewed = dict(observations[0], obsValid=True, obsReviewed=True)
+    store.upsert([reviewed], fetched_at=2000)
+    seq = store.latest_seq()
+
+    # A dump written before the review was fetched
+    pending = dict(observations[0], obsValid=False, obsReviewed=False)
+    assert store.upsert([pending], fetched_at=1000) == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+    assert store.latest_seq() == seq
+    assert store.changes_since(0)[0]['obsReviewed'] is True
+
+    withdrawn = dict(observations[0], obsValid=False, obsReviewed=True)
+    assert store.upsert([withdrawn], fetched_at=3000)['updated'] == 1
+    assert store.changes_since(seq)[0]['obsValid'] is False
+
+
+def test_pages_cover_every_sighting_exactly_once(store):
+    # Many sightings share an obsDt, so the cursor has to break ties on subId/speciesCode
+    observations = synthetic_observations(503)
+    for i, obs in enumerate(observations):
+        obs['obsDt'] = f"2026-05-{1 + i % 3:02d} 08:00"
+    store.upsert(observations)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = store.page(limit=50, cursor=cursor)
+        seen.extend(rows)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 11
+    assert len(seen) == len(set(seen)) == 503
+
+
+def test_pages_apply_filters_and_stay_newest_first(store, observations):
+    store.upsert(observations)
+    expected = [obs for obs in observations
+                if obs['subnational2Name'] == 'Kings' and obs['speciesCode'] == 'snoowl1']
+
+    first, cursor = store.page(species='snowy owl', county='kings', limit=1)
+    assert cursor is not None
+    rest, _ = store.page(species='snoowl1', county=['KINGS'], limit=1000, cursor=cursor)
+    dates = [json.loads(raw)['obsDt'] for raw in first + rest]
+
+    assert len(dates) == len(expected)
+    assert dates == sorted(dates, reverse=True)
+
+
+def test_invalid_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.page(cursor='not-a-cursor')
+
+
+def test_concurrent_writers_never_share_an_ingest_sequence(tmp_path):
+    # Separate connections, like the daemon, run_ny_alerts and the website on one file
+    path = str(tmp_path / 'shared.db')
+    stores = [ObservationStore(path) for _ in range(3)]
+    observations = synthetic_observations(3 * 40 * 5)
+    barrier = threading.Barrier(len(stores))
+
+    def ingest(n, store):
+        barrier.wait()
+        for batch in range(40):
+            start = (n * 40 + batch) * 5
+            store.upsert(observations[start:start + 5])
+
+    threads = [threading.Thread(target=ingest, args=(n, store)) for n, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    batches = stores[0]._conn.execute("SELECT COUNT(DISTINCT seq), MAX(seq) FROM observations").fetchone()
+    for store in stores:
+        store.close()
+    assert batches == (120, 120)
@@ -0,0 +1,46 @@
+import csv
+import json
+
+import pytest
+
+from ebird_api_client import EBirdAPIClient
+from observation import Observation
+from observation_writer import FORMATTED_FIELDNAMES, ObservationWriter
+
+
+def test_json_and_ndjson_round_trip(tmp_path, observations):
+    with ObservationWriter(str(tmp_path / 'rows.json'), 'json') as writer:
+        assert writer.write_many(iter(observations)) == 200
+    assert json.loads((tmp_path / 'rows.json').read_text()) == observations
+
+    with ObservationWriter(str(tmp_path / 'rows.ndjson')) as writer:
+        writer.write_many(Observation.from_api(obs) for obs in observations[:3])
+    lines = (tmp_path / 'rows.ndjson').read_text().splitlines()
+    assert [json.loads(line) for line in lines] == observations[:3]
+
+
+def test_empty_json_is_a_valid_array(tmp_path):
+    with ObservationWriter(str(tmp_path / 'empty.json'), 'json'):
+        pass
+    assert json.loads((tmp_path / 'empty.json').read_text()) == []
+
+
+def test_csv_uses_the_fixed_schema(tmp_path, observations):
+    client = EBirdAPIClient('test-key')
+    try:
+        with ObservationWriter(str(tmp_path / 'rows.csv'), 'csv', formatter=client.format_observation) as writer:
+            writer.write_many(observations[:5])
+    finally:
+        client.close()
+
+    with open(tmp_path / 'rows.csv', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == FORMATTED_FIELDNAMES
+    assert [row['species_code'] for row in rows] == [obs['speciesCode'] for obs in observations[:5]]
+
+
+@pytest.mark.parametrize('fmt, formatter', [('xml', None), ('csv', None)])
+def test_bad_arguments_are_rejected(tmp_path, fmt, formatter):
+    with pytest.raises(ValueError):
+        ObservationWriter(str(tmp_path / 'rows'), fmt, formatter)
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import response_cache
+from ebird_api_client import EBirdAPIClient
+from response_cache import ResponseCache
+
+ENDPOINT = 'https://api.ebird.org/v2/data/obs/US-NY/recent/notable'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'), max_bytes=250)
+    yield cache
+    cache.close()
+
+
+def test_entries_are_fresh_until_their_ttl(cache, clock):
+    cache.store(ENDPOINT, {'back': 7}, b'[]', etag='"v1"')
+
+    assert cache.lookup(ENDPOINT, {'back': 7}).fresh
+    clock[0] += cache.ttl_for(ENDPOINT) + 1
+    entry = cache.lookup(ENDPOINT, {'back': 7})
+    assert not entry.fresh and entry.etag == '"v1"'
+    assert cache.lookup(ENDPOINT, {'back': 8}) is None
+
+
+def test_mark_revalidated_restarts_the_ttl(cache, clock):
+    cache.store(ENDPOINT, None, b'[]')
+    clock[0] += cache.ttl_for(ENDPOINT) + 1
+    cache.mark_revalidated(cache.lookup(ENDPOINT).key)
+    assert cache.lookup(ENDPOINT).fresh
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes(cache, clock):
+    for name in ('a', 'b', 'c'):
+        cache.store(ENDPOINT, {'r': name}, b'x' * 100)
+        clock[0] += 1
+    # 'a' was evicted to fit 'c'; touching 'b' makes 'c' the next victim
+    assert cache.lookup(ENDPOINT, {'r': 'a'}) is None
+    cache.lookup(ENDPOINT, {'r': 'b'})
+    clock[0] += 1
+    cache.store(ENDPOINT, {'r': 'd'}, b'x' * 100)
+
+    assert cache.lookup(ENDPOINT, {'r': 'b'}) is not None
+    assert cache.lookup(ENDPOINT, {'r': 'c'}) is None
+
+
+def test_client_serves_fresh_hits_and_revalidates_stale_entries(fake_api, tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'), ttls=[('/data/obs/', 0)])
+    with EBirdAPIClient('test-key', base_url=fake_api.base_url, cache=cache) as client:
+        first = client.get_notable_observations('US-NY', max_results=20)
+        second = client.get_notable_observations('US-NY', max_results=20)
+        assert cache.revalidations == 1
+        assert [obs.sub_id for obs in first] == [obs.sub_id for obs in second]
+
+        cache.ttls = [('/data/obs/', 3600)]
+        client.get_notable_observations('US-NY', max_results=20)
+
+    assert fake_api.requests == 2
+    assert json.loads(fake_api.body_for(20)[0])[0]['subId'] == first[0].sub_id
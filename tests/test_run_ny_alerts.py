@@ -0,0 +1,55 @@
+import glob
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import run_ny_alerts
+from benchmarks.fake_ebird_api import FakeEBirdAPI, synthetic_observations
+from ebird_api_client import EBirdAPIClient
+
+
+@pytest.fixture
+def alerts_dir(tmp_path, monkeypatch):
+    """Working directory with a config.json and a fake API below the split threshold"""
+    server = FakeEBirdAPI(('127.0.0.1', 0), synthetic_observations(60)).start()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'config.json').write_text(json.dumps({'ebird_api_key': 'test-key'}))
+    monkeypatch.setattr(run_ny_alerts, 'EBirdAPIClient',
+                        lambda api_key, **options: EBirdAPIClient(api_key, base_url=server.base_url, **options))
+
+    # One run per simulated minute, so timestamped file names never collide
+    clock = [datetime(2026, 5, 15, 18, 0)]
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            clock[0] += timedelta(minutes=1)
+            return clock[0]
+
+    monkeypatch.setattr(run_ny_alerts, 'datetime', Clock)
+    yield tmp_path, server
+    server.shutdown()
+    server.server_close()
+
+
+def test_every_run_publishes_the_full_window(alerts_dir, capsys):
+    tmp_path, server = alerts_dir
+    assert run_ny_alerts.main() == 0
+    first_pointer = (tmp_path / 'ny_rare_birds_latest.txt').read_text()
+
+    assert run_ny_alerts.main() == 0
+    second_pointer = (tmp_path / 'ny_rare_birds_latest.txt').read_text()
+
+    assert first_pointer != second_pointer
+    assert len(json.loads((tmp_path / second_pointer).read_text())) == 60
+    assert len(glob.glob('ny_rare_birds_*.csv')) == 2
+    manifest = json.loads((tmp_path / 'history_manifest.json').read_text())
+    assert sorted(entry['file'] for entry in manifest['files']) == sorted(glob.glob('ny_rare_birds_2*.json'))
+
+    # Only the first run had anything new to alert on
+    new_files = glob.glob('ny_new_rarities_*.json')
+    assert len(new_files) == 1
+    assert len(json.loads((tmp_path / new_files[0]).read_text())) == \
+        sum(1 for obs in server.observations if obs['obsValid'])
+    assert 'No new rare birds since the last run.' in capsys.readouterr().out
@@ -0,0 +1,100 @@
+import http.client
+import json
+import math
+import random
+
+import pytest
+
+from observation_store import ObservationStore
+from spatial_index import EARTH_RADIUS_KM, KDTree, NearbyIndex
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+@pytest.fixture(params=[(40.7, -74.0, 1.0), (0.0, 179.5, 2.0), (89.0, 0.0, 0.9)],
+                ids=['nyc', 'antimeridian', 'pole'])
+def points(request):
+    lat, lng, spread = request.param
+    rng = random.Random(7)
+    points = []
+    for _ in range(2000):
+        point_lng = (lng + rng.uniform(-spread, spread) + 180) % 360 - 180
+        points.append((max(-90.0, min(90.0, lat + rng.uniform(-spread, spread))), point_lng))
+    return request.param, points
+
+
+def brute_force(points, lat, lng):
+    return sorted((haversine(lat, lng, *point), i) for i, point in enumerate(points))
+
+
+def distances(results):
+    return [round(distance, 6) for distance, _ in results]
+
+
+def test_within_matches_brute_force(points):
+    (lat, lng, _), points = points
+    tree = KDTree(points, list(range(len(points))))
+    for radius_km in (0.5, 5, 40, 200):
+        expected = [i for distance, i in brute_force(points, lat, lng) if distance <= radius_km]
+        found = tree.within(lat, lng, radius_km)
+        assert sorted(i for _, i in found) == sorted(expected)
+        assert distances(found) == sorted(distances(found))
+        assert all(abs(distance - haversine(lat, lng, *points[i])) < 1e-6 for distance, i in found)
+
+
+def test_nearest_matches_brute_force(points):
+    (lat, lng, _), points = points
+    tree = KDTree(points, list(range(len(points))))
+    ranked = brute_force(points, lat, lng)
+    for k in (1, 10, 257):
+        assert distances(tree.nearest(lat, lng, k)) == distances(ranked[:k])
+
+    even = tree.nearest(lat, lng, 10, predicate=lambda i: i % 2 == 0)
+    assert all(i % 2 == 0 for _, i in even)
+    assert distances(even) == distances([pair for pair in ranked if pair[1] % 2 == 0][:10])
+
+    capped = tree.nearest(lat, lng, 500, max_distance_km=20)
+    assert distances(capped) == distances([pair for pair in ranked if pair[0] <= 20][:500])
+
+
+def test_empty_tree():
+    tree = KDTree([], [])
+    assert tree.within(40.7, -74.0, 10) == [] and tree.nearest(40.7, -74.0) == []
+
+
+def test_index_follows_the_store_and_serves_nearby(tmp_path, observations, server):
+    store = ObservationStore(str(tmp_path / 'store.db'))
+    store.upsert(observations[:100])
+    index = NearbyIndex(store, check_interval=0)
+    assert len(index) == 100
+    store.upsert(observations[100:])
+    assert len(index) == 200
+
+    lat, lng = 40.7, -74.0
+    expected = sorted(observations, key=lambda obs: haversine(lat, lng, obs['lat'], obs['lng']))[:5]
+    assert [obs['subId'] for _, obs in index.nearest(lat, lng, 5)] == [obs['subId'] for obs in expected]
+
+    httpd = server(store=store)
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', httpd.server_address[1], timeout=5)
+        conn.request('GET', f'/api/nearby?lat={lat}&lng={lng}&k=5')
+        body = json.loads(conn.getresponse().read())
+        assert [obs['subId'] for obs in body['observations']] == [obs['subId'] for obs in expected]
+        assert body['observations'][0]['distance_km'] <= body['observations'][-1]['distance_km']
+
+        conn.request('GET', f'/api/nearby?lat={lat}&lng={lng}&radius_km=3')
+        body = json.loads(conn.getresponse().read())
+        assert body['count'] == sum(1 for obs in observations if haversine(lat, lng, obs['lat'], obs['lng']) <= 3)
+
+        conn.request('GET', '/api/nearby?lat=95&lng=0')
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 400
+        conn.close()
+    finally:
+        store.close()
@@ -0,0 +1,121 @@
+import http.client
+import socket
+import time
+
+import pytest
+
+import start_bird_website
+
+
+@pytest.fixture
+def serve(server, monkeypatch, tmp_path):
+    monkeypatch.setattr(start_bird_website, 'KEEPALIVE_TIMEOUT', 0.5)
+    (tmp_path / 'bird_map.html').write_text('<html></html>')
+    monkeypatch.chdir(tmp_path)
+    return lambda **options: server(**options).server_address[1]
+
+
+def get(conn, path='/bird_map.html'):
+    conn.request('GET', path)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def open_idle_connections(port, count):
+    """Keep-alive connections that made one request and then went quiet"""
+    connections = []
+    for _ in range(count):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        assert get(conn) == 200
+        connections.append(conn)
+    return connections
+
+
+def test_idle_keepalive_connections_do_not_delay_new_clients(serve):
+    port = serve()
+    idle = open_idle_connections(port, 17)
+
+    start = time.monotonic()
+    assert get(http.client.HTTPConnection('127.0.0.1', port, timeout=10)) == 200
+    assert time.monotonic() - start < 0.25
+
+    # The held connections are still usable within the idle timeout
+    assert get(idle[0]) == 200
+
+
+def test_connection_limit_waits_at_most_the_idle_timeout(serve):
+    port = serve(max_connections=2)
+    open_idle_connections(port, 2)
+
+    start = time.monotonic()
+    assert get(http.client.HTTPConnection('127.0.0.1', port, timeout=10)) == 200
+    assert time.monotonic() - start < start_bird_website.KEEPALIVE_TIMEOUT + 1
+
+
+def test_idle_connections_are_closed_after_the_timeout(serve):
+    port = serve()
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    sock.sendall(b'GET /bird_map.html HTTP/1.1\r\nHost: localhost\r\n\r\n')
+
+    data = b''
+    start = time.monotonic()
+    while chunk := sock.recv(65536):
+        data += chunk
+    assert data.startswith(b'HTTP/1.1 200')
+    assert time.monotonic() - start < start_bird_website.KEEPALIVE_TIMEOUT + 1
+
+
+@pytest.fixture
+def live(tmp_path):
+    from observation_store import ObservationStore
+    store = ObservationStore(str(tmp_path / 'live.db'))
+    broadcaster = start_bird_website.LiveBroadcaster(store, poll_interval=0.05, max_buffer=64 * 1024)
+    yield store, broadcaster
+    broadcaster.close()
+    store.close()
+
+
+def read_event(sock, timeout=2):
+    sock.settimeout(timeout)
+    data = b''
+    while not data.endswith(b'\n\n'):
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError('live stream closed')
+        data += chunk
+    return data
+
+
+def test_stalled_live_client_is_dropped_without_delaying_others(live):
+    from benchmarks.fake_ebird_api import synthetic_observations
+    store, broadcaster = live
+
+    stalled, stalled_peer = socket.socketpair()
+    stalled.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    broadcaster.add(stalled)
+    batches = [synthetic_observations(300, seed=seed) for seed in range(6)]
+    for seed, batch in enumerate(batches):
+        for obs in batch:
+            obs['subId'] += f"-{seed}"
+
+    healthy, healthy_peer = socket.socketpair()
+    broadcaster.add(healthy)
+    for batch in batches:
+        store.upsert(batch)
+        started = time.monotonic()
+        assert b'event: observations' in read_event(healthy_peer)
+        assert time.monotonic() - started < 1
+
+    # The stalled peer never reads: its buffer overflows and it is disconnected
+    assert not broadcaster.owns(stalled)
+    assert broadcaster.owns(healthy)
+
+    # Adding a client never waits on anyone else
+    started = time.monotonic()
+    late, late_peer = socket.socketpair()
+    broadcaster.add(late, last_seq=0)
+    assert time.monotonic() - started < 0.5
+    assert read_event(late_peer).startswith(b'id: ')
+    for sock in (stalled_peer, healthy_peer, late_peer):
+        sock.close()